@@ -0,0 +1,140 @@
+"""Command line entry points for the AI Engine.
+
+    python -m app.cli process-ndjson notes.ndjson -o results.ndjson
+    python -m app.cli rebuild-stats
+    python -m app.cli reindex
+    python -m app.cli compact --ttl-days 30
+    python -m app.cli upgrade-schema
+"""
+import argparse
+import sys
+from app.config import settings
+
+
+def process_ndjson(args: argparse.Namespace) -> int:
+    from app.services.ndjson_stream import encode_lines, iter_line_chunks, process_ndjson_chunk
+    from app.services.persistence import persist_records, write_behind
+
+    if args.persist:
+        from app.database import upgrade_schema
+        upgrade_schema()
+
+    source = sys.stdin.buffer if args.input == "-" else open(args.input, "rb")
+    target = sys.stdout.buffer if args.output == "-" else open(args.output, "wb")
+    failed = 0
+    if args.persist and settings.PERSISTENCE_MODE == "write_behind":
+        write_behind.start()
+    try:
+        for chunk in iter_line_chunks(source, args.chunk_size, settings.STREAM_MAX_LINE_BYTES):
+            outputs, records, _ = process_ndjson_chunk(chunk, settings.NLP_BATCH_SIZE)
+            if args.persist:
+                persist_records(records)
+            target.write(encode_lines(outputs))
+            target.flush()
+            failed += sum(1 for output in outputs if output["status"] != "success")
+    finally:
+        write_behind.stop()
+        if source is not sys.stdin.buffer:
+            source.close()
+        if target is not sys.stdout.buffer:
+            target.close()
+    return 1 if failed else 0
+
+
+def rebuild_stats(args: argparse.Namespace) -> int:
+    from app.database import SessionLocal, upgrade_schema
+    from app.services.stats import rebuild_stats as rebuild
+
+    upgrade_schema()
+    db = SessionLocal()
+    try:
+        total = rebuild(db, args.batch_size)
+    finally:
+        db.close()
+    print(f"Rebuilt processing stats from {total} notes")
+    return 0
+
+
+def reindex(args: argparse.Namespace) -> int:
+    from app.database import SessionLocal, upgrade_schema
+    from app.services.search import reindex as rebuild_terms
+
+    upgrade_schema()
+    db = SessionLocal()
+    try:
+        total = rebuild_terms(db, args.batch_size)
+    finally:
+        db.close()
+    print(f"Rebuilt the entity term index with {total} terms")
+    return 0
+
+
+def compact(args: argparse.Namespace) -> int:
+    from app.database import SessionLocal, upgrade_schema
+    from app.services.storage import compact as compact_storage
+
+    upgrade_schema()
+    db = SessionLocal()
+    try:
+        result = compact_storage(db, args.storage, args.ttl_days, args.batch_size)
+    finally:
+        db.close()
+    print(
+        f"Dropped the text of {result['expired']} notes, rewrote {result['converted']} "
+        f"as '{args.storage}' and deleted {result['blobs_deleted']} unreferenced blobs "
+        f"({result['blobs_kept']} referenced again meanwhile)"
+    )
+    return 0
+
+
+def upgrade_schema(args: argparse.Namespace) -> int:
+    from app.database import upgrade_schema as upgrade
+
+    statements = upgrade()
+    for ddl in statements:
+        print(ddl)
+    print(f"Schema up to date ({len(statements)} columns added)")
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="Medical Notes NLP AI Engine")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    ndjson = commands.add_parser("process-ndjson", help="Process newline-delimited JSON notes")
+    ndjson.add_argument("input", nargs="?", default="-", help="NDJSON file, '-' for stdin")
+    ndjson.add_argument("-o", "--output", default="-", help="NDJSON results file, '-' for stdout")
+    ndjson.add_argument("--chunk-size", type=int, default=settings.STREAM_CHUNK_SIZE)
+    ndjson.add_argument("--no-persist", dest="persist", action="store_false",
+                        help="Do not store MedicalNoteProcessing rows")
+    ndjson.set_defaults(handler=process_ndjson)
+
+    stats = commands.add_parser("rebuild-stats", help="Recompute the /stats buckets from stored notes")
+    stats.add_argument("--batch-size", type=int, default=10000, help="rows fetched per round trip")
+    stats.set_defaults(handler=rebuild_stats)
+
+    index = commands.add_parser("reindex", help="Create missing indexes and rebuild the entity term index")
+    index.add_argument("--batch-size", type=int, default=10000, help="rows fetched per round trip")
+    index.set_defaults(handler=reindex)
+
+    storage = commands.add_parser("compact", help="Apply the raw text storage policy to stored notes")
+    storage.add_argument("--storage", default=settings.RAW_TEXT_STORAGE, choices=["full", "none", "compressed", "blob"],
+                         help="how the remaining texts are stored")
+    storage.add_argument("--ttl-days", type=int, default=settings.RAW_TEXT_TTL_DAYS,
+                         help="drop the text of notes processed longer ago")
+    storage.add_argument("--batch-size", type=int, default=1000, help="rows rewritten per commit")
+    storage.set_defaults(handler=compact)
+
+    schema = commands.add_parser("upgrade-schema", help="Add missing tables, columns and indexes (also run at startup)")
+    schema.set_defaults(handler=upgrade_schema)
+
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
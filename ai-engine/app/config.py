@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import List, Optional
 
 
 class Settings(BaseSettings):
@@ -7,6 +7,65 @@ class Settings(BaseSettings):
     DATABASE_URL: Optional[str] = None
     LARAVEL_GATEWAY_URL: str = "http://localhost:8000"
     LOG_LEVEL: str = "INFO"
+    SERVER_HOST: str = "0.0.0.0"
+    SERVER_PORT: int = 8001
+    SERVER_WORKERS: int = 1
+    SERVER_MAX_REQUESTS: int = 10000
+    SERVER_MAX_REQUESTS_JITTER: int = 1000
+    SERVER_TIMEOUT: int = 120
+    SERVER_GRACEFUL_TIMEOUT: int = 30
+    SERVER_KEEPALIVE: int = 5
+    NLP_PRELOAD_LANGUAGES: List[str] = []
+    NLP_EXCLUDED_COMPONENTS: List[str] = ["parser", "lemmatizer", "attribute_ruler", "tagger", "morphologizer", "senter"]
+    NLP_BATCH_SIZE: int = 64
+    NLP_N_PROCESS: int = 1
+    LANGID_PREFIX_CHARS: int = 256
+    LANGID_MIN_CONFIDENCE: float = 0.8
+    LANGID_FALLBACK: str = "default"
+    LANGID_DEFAULT_LANGUAGE: str = "en"
+    NLP_CHUNK_MAX_CHARS: int = 20000
+    NLP_CHUNK_OVERLAP_CHARS: int = 200
+    NLP_CHUNK_BATCH_SIZE: int = 8
+    NLP_CHUNK_N_PROCESS: int = 1
+    NLP_EXTRACTION_BACKEND: str = "regex"
+    GAZETTEER_DIR: Optional[str] = None
+    GAZETTEER_CACHE_DIR: Optional[str] = None
+    BATCH_MAX_NOTES: int = 1000
+    STREAM_CHUNK_SIZE: int = 32
+    STREAM_MAX_LINE_BYTES: int = 5 * 1024 * 1024
+    STREAM_SLOT_WAIT_SECONDS: float = 30.0
+    EXECUTOR_BACKEND: str = "thread"
+    EXECUTOR_WORKERS: Optional[int] = None
+    EXECUTOR_MAX_QUEUE: int = 64
+    ADMISSION_ENABLED: bool = True
+    ADMISSION_INITIAL_LIMIT: int = 16
+    ADMISSION_MIN_LIMIT: int = 2
+    ADMISSION_MAX_LIMIT: int = 256
+    ADMISSION_TARGET_LATENCY_MS: float = 2000
+    ADMISSION_BACKOFF: float = 0.9
+    ADMISSION_DEFAULT_TIMEOUT_MS: Optional[int] = None
+    # "memory" (this process only) or "database" (shared by every server worker)
+    JOB_BACKEND: str = "memory"
+    JOB_WORKERS: int = 2
+    JOB_CHUNK_SIZE: int = 32
+    JOB_MAX_NOTES: int = 10000
+    JOB_MAX_PENDING: int = 1000
+    JOB_MAX_WAIT_SECONDS: float = 60
+    JOB_RETENTION_SECONDS: float = 3600
+    PERSISTENCE_MODE: str = "sync"
+    WRITE_BEHIND_MAX_BATCH: int = 500
+    WRITE_BEHIND_FLUSH_INTERVAL_SECONDS: float = 1.0
+    WRITE_BEHIND_MAX_PENDING: int = 10000
+    WRITE_BEHIND_MAX_ATTEMPTS: int = 8
+    RESULT_CACHE_ENABLED: bool = True
+    RESULT_CACHE_MAX_ENTRIES: int = 10000
+    RESULT_CACHE_TTL_SECONDS: float = 3600
+    RESULT_CACHE_URL: Optional[str] = None
+    RAW_TEXT_STORAGE: str = "full"
+    RAW_TEXT_TTL_DAYS: Optional[int] = None
+    INCREMENTAL_ENABLED: bool = True
+    INCREMENTAL_MAX_NOTES: int = 10000
+    INCREMENTAL_TTL_SECONDS: float = 86400
     
     class Config:
         env_file = ".env"
@@ -1,8 +1,12 @@
-from sqlalchemy import create_engine
+import logging
+from typing import List
+from sqlalchemy import create_engine, inspect, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.config import settings
 
+logger = logging.getLogger(__name__)
+
 engine = create_engine(
     settings.DATABASE_URL or "sqlite:///./medical_notes.db",
     echo=False,
@@ -19,4 +23,50 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+def upgrade_schema(bind=None) -> List[str]:
+    """Create missing tables, then add the columns and indexes the models
+    define but existing tables lack: ``create_all`` leaves existing tables
+    alone, and inserts into a table missing a column fail. Only adds (new
+    columns are nullable, with their foreign key, which is also added to
+    columns that lack it); returns the DDL it ran."""
+    import app.models  # noqa: F401  (registers every table on Base.metadata)
+
+    bind = bind or engine
+    Base.metadata.create_all(bind=bind)
+    statements = []
+    constraints = []
+    inspector = inspect(bind)
+    for table in Base.metadata.sorted_tables:
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        constrained = {name for key in inspector.get_foreign_keys(table.name) for name in key["constrained_columns"]}
+        for column in table.columns:
+            references = [
+                f"REFERENCES {foreign_key.column.table.name} ({foreign_key.column.name})"
+                for foreign_key in column.foreign_keys
+            ]
+            if column.name not in existing:
+                ddl = f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column.type.compile(dialect=bind.dialect)}"
+                statements.append(" ".join([ddl] + references))
+            elif references and column.name not in constrained and bind.dialect.name != "sqlite":
+                # Column added by hand without its foreign key; SQLite
+                # cannot add a constraint to an existing table.
+                constraints.append(f"ALTER TABLE {table.name} ADD FOREIGN KEY ({column.name}) {references[0]}")
+    with bind.begin() as connection:
+        for ddl in statements:
+            logger.warning(f"Upgrading schema: {ddl}")
+            connection.execute(text(ddl))
+    for ddl in constraints:
+        logger.warning(f"Upgrading schema: {ddl}")
+        try:
+            with bind.begin() as connection:
+                connection.execute(text(ddl))
+            statements.append(ddl)
+        except Exception:
+            logger.exception(f"Could not add the foreign key ({ddl}): some rows reference a missing row")
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=bind, checkfirst=True)
+    return statements
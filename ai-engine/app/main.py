@@ -4,8 +4,12 @@ from fastapi.responses import JSONResponse
 from contextlib import asynccontextmanager
 import logging
 from app.config import settings
-from app.routers import medical_notes, health
-from app.database import engine, Base
+from app.routers import medical_notes, health, jobs, metrics
+from app.database import upgrade_schema
+from app.services.executor import processing_executor
+from app.services.job_queue import job_queue
+from app.services.nlp_processor import nlp_processor
+from app.services.persistence import write_behind
 
 logging.basicConfig(level=getattr(logging, settings.LOG_LEVEL))
 logger = logging.getLogger(__name__)
@@ -14,9 +18,17 @@ logger = logging.getLogger(__name__)
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logger.info("Starting AI Engine...")
-    Base.metadata.create_all(bind=engine)
+    upgrade_schema()
+    nlp_processor.preload()
+    processing_executor.start()
+    job_queue.start()
+    if settings.PERSISTENCE_MODE == "write_behind":
+        write_behind.start()
     yield
     logger.info("Shutting down AI Engine...")
+    await job_queue.stop()
+    processing_executor.shutdown()
+    write_behind.stop()
 
 app = FastAPI(
     title="Medical Notes NLP API - AI Engine",
@@ -35,9 +47,12 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(metrics.RequestTimingMiddleware)
 
 app.include_router(health.router, prefix="/health", tags=["Health"])
 app.include_router(medical_notes.router, prefix="/api/v1", tags=["Medical Notes"])
+app.include_router(jobs.router, prefix="/api/v1", tags=["Jobs"])
+app.include_router(metrics.router, tags=["Metrics"])
 
 
 @app.exception_handler(Exception)
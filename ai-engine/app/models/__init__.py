@@ -1 +1,5 @@
-from .medical_note import MedicalNoteProcessing
\ No newline at end of file
+from .medical_note import MedicalNoteProcessing
+from .processing_stats import ProcessingStatsBucket
+from .entity_term import EntityTerm
+from .note_blob import NoteBlob
+from .job import JobRecord
@@ -0,0 +1,14 @@
+from sqlalchemy import Column, ForeignKey, String
+from app.database import Base
+
+
+class EntityTerm(Base):
+    """Inverted index of the extracted entities: one row per normalized term
+    of each ``MedicalNoteProcessing``, for ``/search`` entity filters."""
+    __tablename__ = "entity_terms"
+
+    term = Column(String(255), primary_key=True)
+    entity_type = Column(String(32), primary_key=True)
+    note_id = Column(
+        String, ForeignKey("medical_note_processings.id", ondelete="CASCADE"), primary_key=True, index=True
+    )
@@ -0,0 +1,28 @@
+from sqlalchemy import Boolean, Column, DateTime, Index, Integer, JSON, String, Text
+from datetime import datetime
+from app.database import Base
+
+
+class JobRecord(Base):
+    """Background job of ``JOB_BACKEND=database``, shared by every server process."""
+    __tablename__ = "jobs"
+    # Next queued job: highest priority first, then submission order.
+    __table_args__ = (
+        Index("ix_jobs_status_priority_created_at", "status", "priority", "created_at"),
+    )
+
+    id = Column(String(32), primary_key=True)
+    status = Column(String(16), nullable=False)
+    priority = Column(Integer, nullable=False)
+    notes = Column(JSON)
+    persist = Column(Boolean, nullable=False)
+    debug = Column(Boolean, nullable=False)
+    response_format = Column(String(16), nullable=False)
+    total = Column(Integer, nullable=False)
+    processed = Column(Integer, nullable=False, default=0)
+    results = Column(JSON)
+    error = Column(Text)
+    cancel_requested = Column(Boolean, nullable=False, default=False)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, JSON, Text
+from sqlalchemy import Column, String, DateTime, ForeignKey, Index, JSON, LargeBinary, Text
 from datetime import datetime
 from app.database import Base
 import uuid
@@ -6,12 +6,22 @@ import uuid
 
 class MedicalNoteProcessing(Base):
     __tablename__ = "medical_note_processings"
+    # Newest-first keyset pagination of /search, alone or after an equality filter.
+    __table_args__ = (
+        Index("ix_medical_note_processings_processed_at_id", "processed_at", "id"),
+        Index("ix_medical_note_processings_risk_processed_at_id", "risk_classification", "processed_at", "id"),
+        Index("ix_medical_note_processings_language_processed_at_id", "language_detected", "processed_at", "id"),
+    )
 
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     note_hash = Column(String, index=True)
     entities = Column(JSON)
     risk_classification = Column(String)
     confidence_score = Column(JSON)
+    # The masked text is kept in at most one of these, per RAW_TEXT_STORAGE.
     raw_text = Column(Text)
+    raw_text_compressed = Column(LargeBinary)
+    raw_text_sha256 = Column(String(64), ForeignKey("note_blobs.sha256"), index=True)
+    language_detected = Column(String)
     processed_at = Column(DateTime, default=datetime.utcnow)
     processing_time_ms = Column(String)
\ No newline at end of file
@@ -0,0 +1,14 @@
+from sqlalchemy import Column, String, DateTime, Integer, LargeBinary
+from datetime import datetime
+from app.database import Base
+
+
+class NoteBlob(Base):
+    """Compressed masked note text shared by every processing of the same
+    text, addressed by its sha256 (``RAW_TEXT_STORAGE=blob``)."""
+    __tablename__ = "note_blobs"
+
+    sha256 = Column(String(64), primary_key=True)
+    data = Column(LargeBinary, nullable=False)
+    size = Column(Integer, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
@@ -0,0 +1,17 @@
+from sqlalchemy import Column, String, DateTime, BigInteger
+from app.database import Base
+
+
+class ProcessingStatsBucket(Base):
+    """Number of processed notes per time bucket, language and risk level.
+
+    ``granularity`` is ``"hour"``, ``"day"`` or ``"all"``; the ``"all"`` rows
+    use a fixed ``bucket_start`` and hold the running totals.
+    """
+    __tablename__ = "processing_stats_buckets"
+
+    granularity = Column(String, primary_key=True)
+    bucket_start = Column(DateTime, primary_key=True)
+    language = Column(String, primary_key=True)
+    risk_classification = Column(String, primary_key=True)
+    count = Column(BigInteger, nullable=False, default=0)
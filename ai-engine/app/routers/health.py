@@ -15,10 +15,18 @@ async def health_check():
 async def readiness_check():
     try:
         from app.services.nlp_processor import nlp_processor
+        from app.services.admission import admission_controller
+        from app.config import settings
+        models = nlp_processor.model_status()
+        pending = [
+            language for language in settings.NLP_PRELOAD_LANGUAGES
+            if not models.get(language, {}).get("loaded")
+        ]
         return {
-            "status": "ready",
+            "status": "not_ready" if pending else "ready",
             "service": "ai-engine",
-            "nlp_models": "loaded",
+            "nlp_models": models,
+            "admission": admission_controller.state(),
             "timestamp": datetime.utcnow().isoformat()
         }
     except Exception as e:
@@ -26,4 +34,4 @@ async def readiness_check():
             "status": "not_ready",
             "error": str(e),
             "timestamp": datetime.utcnow().isoformat()
-        }
\ No newline at end of file
+        }
@@ -0,0 +1,75 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from pydantic import BaseModel, Field
+from typing import List
+from app.schemas import MedicalNoteRequest
+from app.services.job_queue import Job, JobQueueFull, job_queue
+from app.services.serialization import FastJSONResponse
+from app.config import settings
+
+
+def require_shared_jobs() -> None:
+    """Jobs held in one worker's memory would answer 404 on the others."""
+    if settings.SERVER_WORKERS > 1 and not job_queue.backend.shared:
+        raise HTTPException(
+            status_code=503,
+            detail=f"Background jobs need JOB_BACKEND=database with SERVER_WORKERS={settings.SERVER_WORKERS}"
+        )
+
+
+router = APIRouter(dependencies=[Depends(require_shared_jobs)])
+
+class JobRequest(BaseModel):
+    notes: List[MedicalNoteRequest] = Field(..., min_length=1, description="Medical notes to process")
+    priority: int = Field(5, ge=0, le=9, description="Higher priority jobs are started first")
+    persist: bool = Field(True, description="Store the processing records")
+    debug: bool = Field(False, description="Return per-stage timings under results[].timings_ms")
+    response_format: str = Field("default", pattern="^(default|compact)$",
+                                 description="'compact' returns entity_spans as columns")
+
+
+def _get_job(job_id: str) -> Job:
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    return job
+
+
+@router.post("/jobs", status_code=202)
+async def submit_job(request: JobRequest):
+    """Queue a batch of notes and return its job id right away; poll
+    ``GET /jobs/{job_id}`` for progress and results."""
+    if len(request.notes) > settings.JOB_MAX_NOTES:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Job too large: {len(request.notes)} notes (max {settings.JOB_MAX_NOTES})"
+        )
+    try:
+        job = job_queue.submit(
+            request.notes, request.priority, request.persist, request.debug, request.response_format
+        )
+    except JobQueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "5"})
+
+    return FastJSONResponse(
+        {"status": "accepted", "job": job.to_dict(include_results=False)},
+        status_code=202,
+        headers={"Location": f"/api/v1/jobs/{job.id}"}
+    )
+
+@router.get("/jobs/{job_id}")
+async def get_job(
+    job_id: str,
+    wait: float = Query(0, ge=0, description="Seconds to wait for the job to finish (long-poll)"),
+    include_results: bool = Query(True, description="Include the results processed so far")
+):
+    job = await job_queue.wait(_get_job(job_id), min(wait, settings.JOB_MAX_WAIT_SECONDS))
+    return FastJSONResponse({"status": "success", "job": job.to_dict(include_results)})
+
+@router.delete("/jobs/{job_id}")
+async def cancel_job(job_id: str):
+    """Cancel a job. A running job stops before its next chunk and keeps the results it has."""
+    job = _get_job(job_id)
+    if job.finished:
+        raise HTTPException(status_code=409, detail=f"Job already {job.status}: {job_id}")
+    job = job_queue.cancel(job)
+    return FastJSONResponse({"status": "success", "job": job.to_dict(include_results=False)})
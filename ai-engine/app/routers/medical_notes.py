@@ -1,104 +1,231 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Header, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Optional, List
+import time
 from datetime import datetime
-import hashlib
-from app.services.nlp_processor import nlp_processor
-from app.services.data_masking import data_masking_service
+from app.schemas import MedicalNoteBatchResponse, MedicalNoteRequest, MedicalNoteResponse
+from app.services.pipeline import analyze_note, analyze_batch, build_response_data, note_hash
+from app.services.persistence import build_record, persist_records, persistence_stats
+from app.services.ndjson_stream import aiter_line_chunks, encode_lines, error_lines, process_ndjson_chunk
+from app.services.executor import processing_executor, ExecutorSaturated
+from app.services.admission import AdmissionRejected, DeadlineExceeded, admission_controller, request_deadline
+from app.services.job_queue import job_queue
+from app.services.result_cache import result_cache
+from app.services.incremental import segment_store
+from app.services.stats import get_stats
+from app.services.search import search_notes
+from app.services.metrics import observe_analysis, stage_duration, stage_timer
+from app.services.serialization import FastJSONResponse
 from app.database import get_db
 from sqlalchemy.orm import Session
-from app.models.medical_note import MedicalNoteProcessing
+from app.config import settings
 
 router = APIRouter()
 
-class MedicalNoteRequest(BaseModel):
-    medical_note: str = Field(..., min_length=10, description="Medical note text to process")
-    skip_masking: bool = Field(default=False, description="Skip data masking (not recommended)")
-    note_hash: Optional[str] = Field(None, description="Optional hash for tracking")
+class MedicalNoteBatchRequest(BaseModel):
+    notes: List[MedicalNoteRequest] = Field(..., min_length=1, description="Medical notes to process")
+    batch_size: Optional[int] = Field(None, ge=1, le=1000, description="spaCy nlp.pipe batch size")
 
-class MedicalNoteResponse(BaseModel):
-    status: str
-    data: dict
-    processed_at: datetime
 
-@router.post("/process", response_model=MedicalNoteResponse)
+@router.post("/process", response_model=MedicalNoteResponse, response_class=FastJSONResponse)
 async def process_medical_note(
     request: MedicalNoteRequest,
+    debug: bool = Query(False, description="Return per-stage timings under data.timings_ms"),
+    response_format: str = Query("default", pattern="^(default|compact)$",
+                                 description="'compact' returns entity_spans as columns"),
+    x_request_timeout_ms: Optional[int] = Header(None, ge=1, description="Time budget in milliseconds; "
+                                                 "the note is dropped with 503 if not parsed by then"),
     db: Session = Depends(get_db)
 ):
+    start_time = time.perf_counter()
+    deadline = request_deadline(x_request_timeout_ms)
     try:
-        if not request.skip_masking:
-            de_identified = data_masking_service.de_identify(request.medical_note)
+        async with admission_controller.admit():
+            de_identified, nlp_result = await processing_executor.run(
+                analyze_note, request.medical_note, request.skip_masking, request.note_id, deadline
+            )
             text_to_process = de_identified["masked_text"]
-        else:
-            text_to_process = request.medical_note
-            de_identified = {"masked_text": request.medical_note, "removed_entities": {}}
-        
-        nlp_result = nlp_processor.process(text_to_process)
+            timings = nlp_result["timings_ms"]
         
-        note_hash = request.note_hash or hashlib.sha256(
-            request.medical_note.encode()
-        ).hexdigest()[:16]
+            record_hash = note_hash(request.medical_note, request.note_hash)
         
-        response_data = {
-            "entities": nlp_result["entities"],
-            "risk_classification": nlp_result["risk_classification"],
-            "confidence_score": nlp_result["confidence_score"],
-            "processing_time_ms": nlp_result["processing_time_ms"],
-            "language_detected": nlp_result["language_detected"],
-            "note_hash": note_hash,
-            "masking_applied": not request.skip_masking,
-            "removed_entities": de_identified.get("removed_entities", {})
-        }
+            with stage_timer(timings, "persistence"):
+                await run_in_threadpool(persist_records, [build_record(text_to_process, nlp_result, record_hash)], db)
         
-        try:
-            processing_record = MedicalNoteProcessing(
-                note_hash=note_hash,
-                entities=nlp_result["entities"],
-                risk_classification=nlp_result["risk_classification"],
-                confidence_score=nlp_result["confidence_score"],
-                raw_text=text_to_process,
-                processing_time_ms=str(nlp_result["processing_time_ms"])
+            observe_analysis(nlp_result["language_detected"], len(request.medical_note.encode()), timings,
+                             nlp_result["cache_lookup"], nlp_result.get("segments"))
+            response_data = build_response_data(
+                de_identified, nlp_result, record_hash, request.skip_masking, debug, response_format
             )
-            db.add(processing_record)
-            db.commit()
-        except Exception as e:
-            print(f"Error storing processing record: {e}")
-            db.rollback()
+            if debug:
+                response_data["timings_ms"]["request"] = round((time.perf_counter() - start_time) * 1000, 3)
         
-        return MedicalNoteResponse(
-            status="success",
-            data=response_data,
-            processed_at=datetime.utcnow()
-        )
+            return FastJSONResponse({
+                "status": "success",
+                "data": response_data,
+                "processed_at": datetime.utcnow().isoformat()
+            })
     
+    except AdmissionRejected as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+    except DeadlineExceeded as e:
+        raise HTTPException(
+            status_code=503, detail=str(e), headers={"Retry-After": str(admission_controller.retry_after())}
+        )
+    except ExecutorSaturated as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "1"})
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"Error processing medical note: {str(e)}"
         )
 
-@router.get("/stats")
-async def get_processing_stats(db: Session = Depends(get_db)):
+@router.post("/process/batch", response_model=MedicalNoteBatchResponse, response_class=FastJSONResponse)
+async def process_medical_note_batch(
+    request: MedicalNoteBatchRequest,
+    debug: bool = Query(False, description="Return per-stage timings under data[].timings_ms"),
+    response_format: str = Query("default", pattern="^(default|compact)$",
+                                 description="'compact' returns entity_spans as columns"),
+    db: Session = Depends(get_db)
+):
+    if len(request.notes) > settings.BATCH_MAX_NOTES:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large: {len(request.notes)} notes (max {settings.BATCH_MAX_NOTES})"
+        )
+    
     try:
-        total_processed = db.query(MedicalNoteProcessing).count()
+        results = await processing_executor.run(
+            analyze_batch,
+            [(note.medical_note, note.skip_masking) for note in request.notes],
+            request.batch_size or settings.NLP_BATCH_SIZE,
+            settings.NLP_N_PROCESS,
+            [note.note_id for note in request.notes]
+        )
+        
+        response_data = []
+        records = []
+        for note, (de_identified, nlp_result) in zip(request.notes, results):
+            record_hash = note_hash(note.medical_note, note.note_hash)
+            response_data.append(build_response_data(
+                de_identified, nlp_result, record_hash, note.skip_masking, debug, response_format
+            ))
+            observe_analysis(nlp_result["language_detected"], len(note.medical_note.encode()), nlp_result["timings_ms"],
+                             nlp_result["cache_lookup"], nlp_result.get("segments"))
+            records.append(build_record(de_identified["masked_text"], nlp_result, record_hash))
         
-        risk_counts = {}
-        for risk_level in ["low", "moderate", "high", "critical"]:
-            count = db.query(MedicalNoteProcessing).filter(
-                MedicalNoteProcessing.risk_classification == risk_level
-            ).count()
-            risk_counts[risk_level] = count
+        if records:
+            persist_start = time.perf_counter()
+            await run_in_threadpool(persist_records, records, db)
+            stage_duration.observe(time.perf_counter() - persist_start, "persistence")
+        
+        return FastJSONResponse({
+            "status": "success",
+            "count": len(response_data),
+            "data": response_data,
+            "processed_at": datetime.utcnow().isoformat()
+        })
+    
+    except ExecutorSaturated as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "1"})
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error processing medical note batch: {str(e)}"
+        )
+
+class _DuplexStreamingResponse(StreamingResponse):
+    """StreamingResponse that does not listen for ``http.disconnect`` while
+    streaming: that listener consumes ``receive()`` messages, which here still
+    carry the request body the generator is reading."""
+    
+    async def __call__(self, scope, receive, send):
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+@router.post("/process/stream")
+async def process_medical_note_stream(
+    request: Request,
+    persist: bool = True,
+    debug: bool = False,
+    response_format: str = Query("default", pattern="^(default|compact)$")
+):
+    """Process newline-delimited JSON notes (one ``MedicalNoteRequest`` per line)
+    from a streamed body, writing one NDJSON result line per input line as
+    each chunk of ``STREAM_CHUNK_SIZE`` notes finishes. If no executor slot
+    frees up within ``STREAM_SLOT_WAIT_SECONDS``, the current chunk's lines
+    are answered with errors and the stream ends."""
+    async def results():
+        chunks = aiter_line_chunks(request.stream(), settings.STREAM_CHUNK_SIZE, settings.STREAM_MAX_LINE_BYTES)
+        async for chunk in chunks:
+            try:
+                outputs, records, samples = await processing_executor.run(
+                    process_ndjson_chunk, chunk, settings.NLP_BATCH_SIZE, debug, response_format,
+                    wait=settings.STREAM_SLOT_WAIT_SECONDS
+                )
+            except ExecutorSaturated as e:
+                yield encode_lines(error_lines(chunk, f"Server over capacity, stream stopped: {str(e)}"))
+                return
+            for sample in samples:
+                observe_analysis(*sample)
+            if persist and records:
+                persist_start = time.perf_counter()
+                await run_in_threadpool(persist_records, records)
+                stage_duration.observe(time.perf_counter() - persist_start, "persistence")
+            yield encode_lines(outputs)
+    
+    return _DuplexStreamingResponse(results(), media_type="application/x-ndjson")
+
+@router.get("/stats")
+async def get_processing_stats(
+    granularity: Optional[str] = Query(None, pattern="^(hour|day)$"),
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    db: Session = Depends(get_db)
+):
+    try:
+        statistics = get_stats(db, granularity, since, until)
         
         return {
             "status": "success",
-            "statistics": {
-                "total_processed": total_processed,
-                "by_risk_classification": risk_counts
-            }
+            "statistics": statistics,
+            "cache": result_cache.stats(),
+            "persistence": persistence_stats(),
+            "jobs": job_queue.stats(),
+            "incremental": segment_store.stats()
         }
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"Error retrieving statistics: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+@router.get("/search")
+async def search_processing_results(
+    risk_classification: Optional[List[str]] = Query(None, description="Any of these risk levels"),
+    language: Optional[List[str]] = Query(None, description="Any of these languages"),
+    processed_from: Optional[datetime] = Query(None, description="Processed at or after"),
+    processed_to: Optional[datetime] = Query(None, description="Processed before"),
+    entity: Optional[List[str]] = Query(None, description="Entity terms that must all be present"),
+    entity_type: Optional[str] = Query(None, pattern="^(symptoms|medications|diagnoses)$"),
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    db: Session = Depends(get_db)
+):
+    """Stored processing results matching every filter, newest first, keyset-paginated."""
+    try:
+        page = await run_in_threadpool(
+            search_notes, db, risk_classification, language, processed_from, processed_to,
+            entity, entity_type, limit, cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error searching processing results: {str(e)}"
+        )
+    return FastJSONResponse({"status": "success", **page})
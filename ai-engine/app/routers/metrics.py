@@ -0,0 +1,96 @@
+import time
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from app.services.admission import admission_controller
+from app.services.executor import processing_executor
+from app.services import persistence
+from app.services.incremental import segment_store
+from app.services.job_queue import job_queue
+from app.services.metrics import Counter, Gauge, registry, request_duration
+from app.services.persistence import write_behind
+from app.services.result_cache import result_cache
+
+router = APIRouter()
+
+registry.register(Gauge(
+    "ai_engine_admission_limit", "Adaptive concurrency limit of /process",
+    lambda: int(admission_controller.limit)
+))
+registry.register(Gauge(
+    "ai_engine_admission_in_flight", "/process requests in flight",
+    lambda: admission_controller.in_flight
+))
+registry.register(Counter(
+    "ai_engine_admission_requests",
+    "/process requests admitted, rejected, dropped past their deadline or shed by a full executor",
+    lambda: {
+        ("admitted",): admission_controller.admitted,
+        ("rejected",): admission_controller.rejected,
+        ("dropped",): admission_controller.dropped,
+        ("overloaded",): admission_controller.overloaded
+    }, ["state"]
+))
+registry.register(Gauge(
+    "ai_engine_executor_in_flight", "Jobs running or queued on the processing executor",
+    lambda: processing_executor.in_flight
+))
+registry.register(Gauge(
+    "ai_engine_executor_queue_depth", "Jobs waiting for a processing executor worker",
+    lambda: processing_executor.queue_depth
+))
+registry.register(Gauge(
+    "ai_engine_jobs", "Background jobs waiting for or held by a job worker",
+    lambda: {("queued",): job_queue.backend.pending(), ("running",): job_queue.running}, ["state"]
+))
+registry.register(Counter(
+    "ai_engine_jobs_finished", "Background jobs completed or failed",
+    lambda: {("completed",): job_queue.completed, ("failed",): job_queue.failed}, ["status"]
+))
+registry.register(Gauge(
+    "ai_engine_result_cache_hit_rate", "Result cache hit rate since start",
+    lambda: result_cache.stats()["hit_rate"]
+))
+registry.register(Counter(
+    "ai_engine_result_cache_lookups", "Result cache lookups",
+    lambda: {("hit",): result_cache.hits, ("miss",): result_cache.misses}, ["result"]
+))
+registry.register(Counter(
+    "ai_engine_incremental_segments", "Note segments parsed or reused from a previous version",
+    lambda: {("processed",): segment_store.processed, ("reused",): segment_store.reused}, ["result"]
+))
+registry.register(Gauge(
+    "ai_engine_write_behind_pending", "Processing records waiting for a write-behind flush",
+    lambda: write_behind.pending
+))
+registry.register(Counter(
+    "ai_engine_write_behind_records", "Processing records written or dropped by the write-behind buffer",
+    lambda: {("flushed",): write_behind.flushed, ("dropped",): write_behind.dropped}, ["result"]
+))
+registry.register(Counter(
+    "ai_engine_persistence_failed_records", "Processing records lost to a failed synchronous insert",
+    lambda: persistence.failed_records
+))
+
+
+class RequestTimingMiddleware:
+    """ASGI middleware observing the full duration of every HTTP request,
+    streamed responses and serialization included, labelled by route path."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        start_time = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            route = scope.get("route")
+            request_duration.observe(time.perf_counter() - start_time, getattr(route, "path", "unmatched"))
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
@@ -1,5 +1,6 @@
 from pydantic import BaseModel, Field
-from typing import List
+from typing import Dict, List, Optional, Union
+from datetime import datetime
 
 class AnalysisRequest(BaseModel):
     text: str = Field(..., min_length=10, description="O texto médico para analisar")
@@ -13,4 +14,60 @@ class Entity(BaseModel):
 class AnalysisResponse(BaseModel):
     status: str
     entities: List[Entity]
-    risk_score: str = "TBD"
\ No newline at end of file
+    risk_score: str = "TBD"
+
+class MedicalNoteRequest(BaseModel):
+    medical_note: str = Field(..., min_length=10, description="Medical note text to process")
+    skip_masking: bool = Field(default=False, description="Skip data masking (not recommended)")
+    note_hash: Optional[str] = Field(None, description="Optional hash for tracking")
+    note_id: Optional[str] = Field(None, max_length=128,
+                                   description="Stable id of an edited note; only changed paragraphs are re-processed")
+
+class ExtractedEntities(BaseModel):
+    symptoms: List[str]
+    medications: List[str]
+    diagnoses: List[str]
+
+class CompactEntitySpans(BaseModel):
+    labels: List[str]
+    start: List[int]
+    end: List[int]
+    label: List[int]
+
+class RemovedPII(BaseModel):
+    cpfs: List[str] = []
+    ssns: List[str] = []
+    emails: List[str] = []
+    phones: List[str] = []
+    dates: List[str] = []
+
+class RemovedEntities(BaseModel):
+    names: List[str] = []
+    pii: RemovedPII = RemovedPII()
+
+class MedicalNoteResult(BaseModel):
+    entities: ExtractedEntities
+    risk_classification: str
+    confidence_score: Dict[str, float]
+    processing_time_ms: float
+    language_detected: str
+    language_confidence: Optional[float] = None
+    note_hash: str
+    masking_applied: bool
+    removed_entities: RemovedEntities
+    cache_hit: bool
+    entity_spans: Union[List[Entity], CompactEntitySpans]
+    masked_text: Optional[str] = None
+    timings_ms: Optional[Dict[str, float]] = None
+    segments: Optional[Dict[str, int]] = None
+
+class MedicalNoteResponse(BaseModel):
+    status: str
+    data: MedicalNoteResult
+    processed_at: datetime
+
+class MedicalNoteBatchResponse(BaseModel):
+    status: str
+    count: int
+    data: List[MedicalNoteResult]
+    processed_at: datetime
@@ -0,0 +1,98 @@
+"""Production entry point: a gunicorn master with uvicorn workers.
+
+    python -m app.server
+
+The master imports the app, loads the spaCy models and gazetteers and
+freezes the garbage collector before forking, so workers start without
+loading anything and share those pages copy-on-write. Workers are recycled
+after ``SERVER_MAX_REQUESTS`` requests (plus jitter, so they do not all
+restart at once). ``kill -HUP <master>`` replaces every worker gracefully
+with one forked from the same preloaded image; deploying new code needs a
+new master (``kill -USR2`` then ``-WINCH`` / ``-QUIT`` the old one, or a
+container restart).
+
+With several workers, background jobs need ``JOB_BACKEND=database`` so
+that every worker sees them; with the in-memory backend the ``/jobs``
+routes answer 503 instead (a job status request reaching another worker
+would get a 404). The incremental segment store and the local result
+cache tier stay per worker.
+"""
+import gc
+import logging
+from typing import Dict
+from gunicorn.app.base import BaseApplication
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def warm_up() -> None:
+    """Load everything workers would otherwise load on their own."""
+    from app.database import engine, upgrade_schema
+    from app.services.nlp_processor import MODEL_NAMES, nlp_processor
+
+    upgrade_schema()
+    engine.dispose()
+    nlp_processor.preload(settings.NLP_PRELOAD_LANGUAGES or list(MODEL_NAMES))
+    gc.collect()
+    gc.freeze()
+
+
+def post_fork(server, worker) -> None:
+    from app.database import engine
+    # Connections opened by the master must not be shared with the workers.
+    engine.dispose(close=False)
+
+
+class ProductionServer(BaseApplication):
+
+    def __init__(self, options: Dict):
+        self.options = options
+        super().__init__()
+
+    def load_config(self) -> None:
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        from app.main import app
+        warm_up()
+        return app
+
+
+def check_workers(workers: int) -> None:
+    """Warn about the per-process state several workers do not share."""
+    if workers <= 1:
+        return
+    from app.services.job_queue import job_queue
+    if not job_queue.backend.shared:
+        logger.warning(f"SERVER_WORKERS={workers} with the in-memory job backend: the /jobs routes are "
+                       f"disabled, set JOB_BACKEND=database to share jobs between workers")
+    if settings.INCREMENTAL_ENABLED:
+        logger.warning("Incremental segments are kept per worker; edits reaching another worker are parsed in full")
+
+
+def server_options() -> Dict:
+    return {
+        "bind": f"{settings.SERVER_HOST}:{settings.SERVER_PORT}",
+        "workers": settings.SERVER_WORKERS,
+        "worker_class": "uvicorn.workers.UvicornWorker",
+        "preload_app": True,
+        "max_requests": settings.SERVER_MAX_REQUESTS,
+        "max_requests_jitter": settings.SERVER_MAX_REQUESTS_JITTER,
+        "timeout": settings.SERVER_TIMEOUT,
+        "graceful_timeout": settings.SERVER_GRACEFUL_TIMEOUT,
+        "keepalive": settings.SERVER_KEEPALIVE,
+        "loglevel": settings.LOG_LEVEL.lower(),
+        "accesslog": "-",
+        "post_fork": post_fork
+    }
+
+
+def main() -> None:
+    check_workers(settings.SERVER_WORKERS)
+    ProductionServer(server_options()).run()
+
+
+if __name__ == "__main__":
+    main()
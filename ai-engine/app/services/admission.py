@@ -0,0 +1,139 @@
+import math
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, Optional
+from app.config import settings
+
+
+class AdmissionRejected(Exception):
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class DeadlineExceeded(Exception):
+    pass
+
+
+class Overloaded(Exception):
+    """Raised by a downstream stage shedding load (e.g. a full executor
+    queue); the admission controller backs off on it."""
+
+
+def check_deadline(deadline: Optional[float], stage: str) -> None:
+    """Raise ``DeadlineExceeded`` once ``time.monotonic()`` passed ``deadline``."""
+    if deadline is not None and time.monotonic() > deadline:
+        raise DeadlineExceeded(f"Request deadline passed before {stage}")
+
+
+class AdmissionController:
+    """Adaptive concurrency limit (AIMD) for the requests of one worker.
+
+    A request is admitted while fewer than ``limit`` are in flight and
+    rejected right away otherwise, instead of queueing behind work that
+    already misses its latency target. Each completion adjusts the limit:
+    one slower than ``target_latency_ms``, dropped past its deadline or
+    shed downstream (``Overloaded``) multiplies it by ``backoff`` (at most
+    once per target latency, so a burst of slow completions counts as one
+    signal); a fast success while at least half the limit is in use adds
+    one. Any other failure leaves the limit alone.
+    """
+
+    def __init__(self, initial_limit: int = 16, min_limit: int = 2, max_limit: int = 256,
+                 target_latency_ms: float = 2000, backoff: float = 0.9, enabled: bool = True):
+        self.enabled = enabled
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.target_latency = target_latency_ms / 1000
+        self.backoff = backoff
+        self.in_flight = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.dropped = 0
+        self.overloaded = 0
+        self.latency_ewma: Optional[float] = None
+        self._last_decrease = 0.0
+
+    def retry_after(self) -> int:
+        """Seconds a rejected caller should wait: about one request's latency."""
+        latency = self.latency_ewma if self.latency_ewma is not None else self.target_latency
+        return max(1, min(30, math.ceil(latency)))
+
+    def acquire(self) -> None:
+        if self.enabled and self.in_flight >= int(self.limit):
+            self.rejected += 1
+            raise AdmissionRejected(
+                f"Server over capacity ({self.in_flight} requests in flight, limit {int(self.limit)})",
+                self.retry_after()
+            )
+        self.in_flight += 1
+        self.admitted += 1
+
+    def release(self, latency: float, outcome: str = "success") -> None:
+        """Free a slot; ``outcome`` is ``"success"``, ``"dropped"`` (past its
+        deadline), ``"overloaded"`` (shed downstream) or ``"failed"``."""
+        in_flight = self.in_flight
+        self.in_flight -= 1
+        self.dropped += outcome == "dropped"
+        self.overloaded += outcome == "overloaded"
+        self.latency_ewma = latency if self.latency_ewma is None else 0.8 * self.latency_ewma + 0.2 * latency
+
+        now = time.monotonic()
+        if outcome in ("dropped", "overloaded") or (outcome == "success" and latency > self.target_latency):
+            if now - self._last_decrease >= self.target_latency:
+                self.limit = max(self.min_limit, self.limit * self.backoff)
+                self._last_decrease = now
+        elif outcome == "success" and in_flight * 2 >= self.limit:
+            self.limit = min(self.max_limit, self.limit + 1)
+
+    @asynccontextmanager
+    async def admit(self):
+        """Hold a slot for the duration of the block; raises ``AdmissionRejected`` when none is free."""
+        self.acquire()
+        start_time = time.monotonic()
+        outcome = "success"
+        try:
+            yield
+        except DeadlineExceeded:
+            outcome = "dropped"
+            raise
+        except Overloaded:
+            outcome = "overloaded"
+            raise
+        except BaseException:
+            outcome = "failed"
+            raise
+        finally:
+            self.release(time.monotonic() - start_time, outcome)
+
+    def state(self) -> Dict:
+        return {
+            "enabled": self.enabled,
+            "limit": int(self.limit),
+            "in_flight": self.in_flight,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "dropped_past_deadline": self.dropped,
+            "overloaded": self.overloaded,
+            "latency_ewma_ms": round(self.latency_ewma * 1000, 1) if self.latency_ewma is not None else None,
+            "target_latency_ms": round(self.target_latency * 1000, 1)
+        }
+
+
+def request_deadline(timeout_ms: Optional[int]) -> Optional[float]:
+    """Monotonic deadline of a request arriving now with a budget of
+    ``timeout_ms`` (default ``ADMISSION_DEFAULT_TIMEOUT_MS``); None for no deadline."""
+    timeout_ms = timeout_ms or settings.ADMISSION_DEFAULT_TIMEOUT_MS
+    return time.monotonic() + timeout_ms / 1000 if timeout_ms else None
+
+
+admission_controller = AdmissionController(
+    initial_limit=settings.ADMISSION_INITIAL_LIMIT,
+    min_limit=settings.ADMISSION_MIN_LIMIT,
+    max_limit=settings.ADMISSION_MAX_LIMIT,
+    target_latency_ms=settings.ADMISSION_TARGET_LATENCY_MS,
+    backoff=settings.ADMISSION_BACKOFF,
+    enabled=settings.ADMISSION_ENABLED
+)
@@ -0,0 +1,119 @@
+import re
+from collections import namedtuple
+from typing import Iterable, List, Optional, Tuple
+
+PARAGRAPH_BREAK = re.compile(r"\n[ \t]*\n\s*")
+SENTENCE_BREAK = re.compile(r"(?<=[.!?;])\s+")
+WHITESPACE = re.compile(r"\s+")
+
+# Entity of a chunked note, with offsets into the original text. Mirrors the
+# spaCy ``Span`` attributes ``extract_entities`` reads.
+MergedEntity = namedtuple("MergedEntity", ["start_char", "end_char", "label_", "text"])
+
+
+class ChunkedDoc:
+    """Stand-in for the ``Doc`` of a note parsed in chunks: the original text
+    and the entities of every chunk, merged."""
+
+    def __init__(self, text: str, ents: List[MergedEntity]):
+        self.text = text
+        self.ents = ents
+
+
+def _last_break(pattern: re.Pattern, text: str, start: int, end: int) -> Optional[int]:
+    position = None
+    for match in pattern.finditer(text, start, end):
+        position = match.end()
+    return position
+
+
+def _first_break(pattern: re.Pattern, text: str, start: int, end: int) -> Optional[int]:
+    match = pattern.search(text, start, end)
+    return match.end() if match else None
+
+
+def split_text(text: str, max_chars: int, overlap: int = 0) -> List[Tuple[int, int]]:
+    """Split ``text`` into ``(start, end)`` windows of at most ``max_chars``.
+
+    Windows end at the last paragraph break in their second half, else the
+    last sentence break, else the last whitespace, else are cut hard. With
+    ``overlap`` every window after the first starts up to that many
+    characters early, at a sentence or word boundary, so entities crossing a
+    cut are seen whole by one of the two windows.
+    """
+    length = len(text)
+    if length <= max_chars:
+        return [(0, length)]
+    overlap = min(overlap, max_chars // 4)
+
+    spans = []
+    start = 0
+    while True:
+        end = start + max_chars
+        if end >= length:
+            spans.append((start, length))
+            return spans
+        floor = start + max_chars // 2
+        for pattern in (PARAGRAPH_BREAK, SENTENCE_BREAK, WHITESPACE):
+            cut = _last_break(pattern, text, floor, end)
+            if cut is not None:
+                end = cut
+                break
+        spans.append((start, end))
+
+        start = end
+        if overlap:
+            window = end - overlap
+            start = (_first_break(SENTENCE_BREAK, text, window, end)
+                     or _first_break(WHITESPACE, text, window, end)
+                     or end)
+
+
+def split_paragraphs(text: str) -> List[Tuple[int, int]]:
+    """``(start, end)`` of every paragraph of ``text``; the blank lines
+    between paragraphs belong to none of them."""
+    spans = []
+    start = 0
+    for match in PARAGRAPH_BREAK.finditer(text):
+        if match.start() > start:
+            spans.append((start, match.start()))
+        start = match.end()
+    if start < len(text):
+        spans.append((start, len(text)))
+    return spans
+
+
+def split_segments(text: str) -> List[Tuple[int, int]]:
+    """Paragraphs of ``text`` joined with the next one until one ends with a
+    full stop. Entity patterns capture up to a period or comma and may run
+    across a blank line ("reports headache\n\nand nausea"), so a paragraph
+    only stands on its own once its clause is closed; extracting segments
+    one by one then finds what a scan of the whole text finds."""
+    segments: List[Tuple[int, int]] = []
+    for start, end in split_paragraphs(text):
+        if segments and not text[segments[-1][0]:segments[-1][1]].rstrip().endswith("."):
+            segments[-1] = (segments[-1][0], end)
+        else:
+            segments.append((start, end))
+    return segments
+
+
+def merge_entities(chunks: Iterable[List[MergedEntity]]) -> List[MergedEntity]:
+    """Merge per-chunk entities (already shifted to original offsets).
+
+    Duplicates from overlapping windows collapse into one; of two
+    overlapping spans the one starting first wins, and of two starting
+    together the longer, so an entity cut at a window edge yields to its
+    complete copy from the neighbouring window.
+    """
+    candidates = sorted(
+        (entity for entities in chunks for entity in entities),
+        key=lambda entity: (entity.start_char, -entity.end_char)
+    )
+    merged: List[MergedEntity] = []
+    last_end = -1
+    for entity in candidates:
+        if entity.start_char >= last_end:
+            merged.append(entity)
+            last_end = entity.end_char
+    return merged
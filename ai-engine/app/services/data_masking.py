@@ -1,10 +1,29 @@
 import re
+from bisect import bisect_right
+from collections import defaultdict
 from typing import Dict, List, Tuple
 
 
+NAME_PATTERNS = [
+    r"(?:Paciente|Patient|Sr\.|Sra\.|Dr\.|Dra\.)\s+([A-ZÁÀÂÃÉÊÍÓÔÕÚÇ][a-záàâãéêíóôõúç]+\s+[A-ZÁÀÂÃÉÊÍÓÔÕÚÇ][a-záàâãéêíóôõúç]+)",
+    r"\b([A-ZÁÀÂÃÉÊÍÓÔÕÚÇ][a-záàâãéêíóôõúç]+\s+[A-ZÁÀÂÃÉÊÍÓÔÕÚÇ][a-záàâãéêíóôõúç]+)\s+(?:presenta|apresenta|reports)",
+]
+
+# Replacement token per PII pattern; dates are reported but left in the text.
+PII_TOKENS = {
+    "cpf_br": "[CPF]",
+    "ssn_us": "[SSN]",
+    "email": "[EMAIL]",
+    "phone_br": "[PHONE]",
+    "phone_us": "[PHONE]",
+    "date": None,
+}
+
+
 class DataMaskingService:
     
     def __init__(self):
+        # Ordered by precedence: where matches overlap, the earlier pattern wins.
         self.patterns = {
             "cpf_br": r"\d{3}\.?\d{3}\.?\d{3}-?\d{2}",
             "ssn_us": r"\d{3}-?\d{2}-?\d{4}",
@@ -13,65 +32,81 @@ class DataMaskingService:
             "phone_us": r"\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}",
             "date": r"\d{1,2}[/-]\d{1,2}[/-]\d{2,4}",
         }
+        self._priorities = {kind: priority for priority, kind in enumerate(self.patterns)}
+        # One scan over the note finds e-mails and runs of digit-like characters;
+        # every other pattern starts with a digit or "(" and only uses those
+        # characters, so it is matched inside the runs. The lookahead reports
+        # candidates at every position of a run, so overlapping matches of
+        # different patterns are all seen and resolved by precedence.
+        self._pii_scanner = re.compile(
+            f"(?P<email>(?i:{self.patterns['email']}))|(?P<run>[\\d(][\\d()./\\s-]*)"
+        )
+        self._run_scanner = re.compile("(?=" + "|".join(
+            f"(?P<{kind}>{pattern})" for kind, pattern in self.patterns.items() if kind != "email"
+        ) + ")")
+        self._name_scanner = re.compile("|".join(NAME_PATTERNS), re.IGNORECASE)
     
     def mask_names(self, text: str) -> Tuple[str, List[str]]:
-        name_patterns = [
-            r"(?:Paciente|Patient|Sr\.|Sra\.|Dr\.|Dra\.)\s+([A-ZÁÀÂÃÉÊÍÓÔÕÚÇ][a-záàâãéêíóôõúç]+\s+[A-ZÁÀÂÃÉÊÍÓÔÕÚÇ][a-záàâãéêíóôõúç]+)",
-            r"([A-ZÁÀÂÃÉÊÍÓÔÕÚÇ][a-záàâãéêíóôõúç]+\s+[A-ZÁÀÂÃÉÊÍÓÔÕÚÇ][a-záàâãéêíóôõúç]+)\s+(?:presenta|apresenta|reports)",
-        ]
+        names_by_pattern = [[] for _ in NAME_PATTERNS]
+        for match in self._name_scanner.finditer(text):
+            names_by_pattern[match.lastindex - 1].append(match.group(match.lastindex))
+        masked_names = list(dict.fromkeys(name for names in names_by_pattern for name in names))
         
-        masked_names = []
-        masked_text = text
+        if not masked_names:
+            return text, masked_names
         
-        for pattern in name_patterns:
-            matches = re.finditer(pattern, masked_text, re.IGNORECASE)
-            for match in matches:
-                name = match.group(1)
-                if name not in masked_names:
-                    masked_names.append(name)
-                masked_text = masked_text.replace(name, "[PATIENT_NAME]")
+        longest_first = sorted(masked_names, key=len, reverse=True)
+        names_pattern = re.compile("|".join(re.escape(name) for name in longest_first))
+        return names_pattern.sub("[PATIENT_NAME]", text), masked_names
+    
+    def _collect_pii_spans(self, text: str) -> List[Tuple[int, int, str]]:
+        """Scan once for every PII pattern and keep non-overlapping spans,
+        giving precedence to the earlier pattern in ``self.patterns``."""
+        candidates = []
+        for match in self._pii_scanner.finditer(text):
+            if match.lastgroup == "email":
+                candidates.append((self._priorities["email"], match.start(), match.end(), "email"))
+                continue
+            for run_match in self._run_scanner.finditer(text, match.start(), match.end()):
+                kind = run_match.lastgroup
+                start, end = run_match.span(kind)
+                candidates.append((self._priorities[kind], start, end, kind))
+        candidates.sort()
         
-        return masked_text, masked_names
+        starts: List[int] = []
+        spans: List[Tuple[int, int, str]] = []
+        for _, start, end, kind in candidates:
+            index = bisect_right(starts, start)
+            if index and spans[index - 1][1] > start:
+                continue
+            if index < len(spans) and spans[index][0] < end:
+                continue
+            starts.insert(index, start)
+            spans.insert(index, (start, end, kind))
+        return spans
     
     def mask_pii(self, text: str) -> Tuple[str, Dict[str, List[str]]]:
-        masked_text = text
+        found = defaultdict(list)
+        pieces = []
+        position = 0
+        for start, end, kind in self._collect_pii_spans(text):
+            found[kind].append(text[start:end])
+            token = PII_TOKENS[kind]
+            if token is not None:
+                pieces.append(text[position:start])
+                pieces.append(token)
+                position = end
+        pieces.append(text[position:])
+        
         removed_pii = {
-            "cpfs": [],
-            "ssns": [],
-            "emails": [],
-            "phones": [],
-            "dates": []
+            "cpfs": list(dict.fromkeys(found["cpf_br"])),
+            "ssns": list(dict.fromkeys(found["ssn_us"])),
+            "emails": list(dict.fromkeys(found["email"])),
+            "phones": found["phone_br"] + found["phone_us"],
+            "dates": found["date"][:3]
         }
         
-        cpfs = re.findall(self.patterns["cpf_br"], masked_text)
-        if cpfs:
-            removed_pii["cpfs"] = list(set(cpfs))
-            masked_text = re.sub(self.patterns["cpf_br"], "[CPF]", masked_text)
-        
-        ssns = re.findall(self.patterns["ssn_us"], masked_text)
-        if ssns:
-            removed_pii["ssns"] = list(set(ssns))
-            masked_text = re.sub(self.patterns["ssn_us"], "[SSN]", masked_text)
-        
-        emails = re.findall(self.patterns["email"], masked_text, re.IGNORECASE)
-        if emails:
-            removed_pii["emails"] = list(set(emails))
-            masked_text = re.sub(self.patterns["email"], "[EMAIL]", masked_text, flags=re.IGNORECASE)
-        
-        phones_br = re.findall(self.patterns["phone_br"], masked_text)
-        if phones_br:
-            removed_pii["phones"].extend(phones_br)
-            masked_text = re.sub(self.patterns["phone_br"], "[PHONE]", masked_text)
-        
-        phones_us = re.findall(self.patterns["phone_us"], masked_text)
-        if phones_us:
-            removed_pii["phones"].extend(phones_us)
-            masked_text = re.sub(self.patterns["phone_us"], "[PHONE]", masked_text)
-        
-        dates = re.findall(self.patterns["date"], masked_text)
-        removed_pii["dates"] = dates[:3]
-        
-        return masked_text, removed_pii
+        return "".join(pieces), removed_pii
     
     def de_identify(self, text: str) -> Dict:
         text_after_names, names_removed = self.mask_names(text)
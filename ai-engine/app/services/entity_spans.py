@@ -0,0 +1,77 @@
+from array import array
+from typing import Dict, Iterator, List, Tuple
+
+# Label of the spans produced for each entity type.
+SPAN_LABELS = {
+    "symptoms": "SYMPTOM",
+    "medications": "MEDICATION",
+    "diagnoses": "DIAGNOSIS",
+}
+
+
+class EntitySpans:
+    """Entity spans stored column-wise: parallel arrays of start offset, end
+    offset and label id, plus the table of label names.
+
+    ``to_compact`` gives the same columns as plain lists, which is what goes
+    into results, caches and the compact response format; ``to_list``
+    expands them into one ``Entity``-shaped dict per span.
+    """
+
+    def __init__(self, labels: List[str] = None):
+        self.labels: List[str] = list(labels or [])
+        self._label_ids = {label: index for index, label in enumerate(self.labels)}
+        self.starts = array("l")
+        self.ends = array("l")
+        self.label_ids = array("H")
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __iter__(self) -> Iterator[Tuple[int, int, str]]:
+        for start, end, label_id in zip(self.starts, self.ends, self.label_ids):
+            yield start, end, self.labels[label_id]
+
+    def add(self, start: int, end: int, label: str) -> None:
+        label_id = self._label_ids.get(label)
+        if label_id is None:
+            label_id = self._label_ids[label] = len(self.labels)
+            self.labels.append(label)
+        self.starts.append(start)
+        self.ends.append(end)
+        self.label_ids.append(label_id)
+
+    def sorted(self) -> "EntitySpans":
+        """Copy ordered by offsets, without duplicate spans."""
+        result = EntitySpans(self.labels)
+        previous = None
+        for index in sorted(range(len(self)), key=lambda i: (self.starts[i], self.ends[i], self.label_ids[i])):
+            span = (self.starts[index], self.ends[index], self.label_ids[index])
+            if span != previous:
+                result.starts.append(span[0])
+                result.ends.append(span[1])
+                result.label_ids.append(span[2])
+                previous = span
+        return result
+
+    def to_compact(self) -> Dict[str, List]:
+        return {
+            "labels": list(self.labels),
+            "start": self.starts.tolist(),
+            "end": self.ends.tolist(),
+            "label": self.label_ids.tolist()
+        }
+
+    @classmethod
+    def from_compact(cls, compact: Dict[str, List]) -> "EntitySpans":
+        spans = cls(compact["labels"])
+        spans.starts.extend(compact["start"])
+        spans.ends.extend(compact["end"])
+        spans.label_ids.extend(compact["label"])
+        return spans
+
+    def to_list(self, text: str) -> List[Dict]:
+        return [
+            {"text": text[start:end], "label": label, "start": start, "end": end}
+            for start, end, label in self
+        ]
@@ -0,0 +1,116 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Deque, Optional
+from app.config import settings
+from app.services.admission import Overloaded
+from app.services.pipeline import init_worker
+
+logger = logging.getLogger(__name__)
+
+
+class ExecutorSaturated(Overloaded):
+    pass
+
+
+class ProcessingExecutor:
+    """Runs CPU-bound NLP work off the event loop with a bounded backlog.
+
+    ``backend`` is ``"thread"`` or ``"process"``; process workers are spawned
+    fresh and load the spaCy models once in ``init_worker``. At most
+    ``max_workers + max_queue`` calls may be in flight, further calls raise
+    ``ExecutorSaturated``.
+    """
+
+    def __init__(self, backend: str = "thread", max_workers: Optional[int] = None, max_queue: int = 64):
+        if backend not in ("thread", "process"):
+            raise ValueError(f"Unknown executor backend: {backend}")
+        self.backend = backend
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_queue = max_queue
+        self.in_flight = 0
+        self._pool: Optional[Executor] = None
+        # Callers of run(..., wait=...) waiting for a slot, oldest first.
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    @property
+    def capacity(self) -> int:
+        return self.max_workers + self.max_queue
+
+    @property
+    def queue_depth(self) -> int:
+        return max(0, self.in_flight - self.max_workers)
+
+    def start(self) -> None:
+        if self._pool is not None:
+            return
+        if self.backend == "process":
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=init_worker
+            )
+        else:
+            self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="nlp")
+        logger.info(f"Started {self.backend} executor with {self.max_workers} workers")
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+    async def run(self, fn: Callable, *args: Any, wait: float = 0) -> Any:
+        """Run ``fn(*args)`` on the pool. When ``max_workers + max_queue`` calls
+        are in flight, wait up to ``wait`` seconds for one of them to finish,
+        then raise ``ExecutorSaturated``."""
+        if self.in_flight >= self.capacity and wait > 0:
+            await self._wait_for_slot(wait)
+        if self.in_flight >= self.capacity:
+            raise ExecutorSaturated(
+                f"Processing queue is full ({self.in_flight} requests in flight)"
+            )
+        self.start()
+        self.in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._pool, partial(fn, *args))
+        finally:
+            self.in_flight -= 1
+            self._wake_waiter()
+
+    async def _wait_for_slot(self, timeout: float) -> None:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while self.in_flight >= self.capacity and loop.time() < deadline:
+            waiter = loop.create_future()
+            self._waiters.append(waiter)
+            try:
+                await asyncio.wait_for(waiter, deadline - loop.time())
+            except asyncio.TimeoutError:
+                return
+            finally:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+
+    def _wake_waiter(self) -> None:
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.get_loop().call_soon_threadsafe(_resolve, waiter)
+                return
+
+
+def _resolve(waiter: asyncio.Future) -> None:
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+processing_executor = ProcessingExecutor(
+    backend=settings.EXECUTOR_BACKEND,
+    max_workers=settings.EXECUTOR_WORKERS,
+    max_queue=settings.EXECUTOR_MAX_QUEUE
+)
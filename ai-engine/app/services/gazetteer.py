@@ -0,0 +1,126 @@
+import hashlib
+import logging
+import os
+import pickle
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+import spacy
+from spacy.matcher import PhraseMatcher
+from spacy.util import filter_spans
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_GAZETTEER_DIR = Path(__file__).resolve().parents[2] / "data" / "gazetteers"
+
+
+def read_lexicon(path: Path) -> List[str]:
+    """One term per line; blank lines and lines starting with ``#`` are skipped."""
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip() and not line.lstrip().startswith("#")]
+
+
+class LanguageGazetteer:
+    """PhraseMatcher over the lexicons of one language, matching lowercased tokens.
+
+    The lexicons are the ``<entity_type>.txt`` files of ``<directory>/<language>``.
+    """
+
+    def __init__(self, language: str, vocab, matcher: PhraseMatcher, fingerprint: str):
+        self.language = language
+        self.fingerprint = fingerprint
+        self._tokenizer = spacy.blank(language, vocab=vocab).tokenizer
+        self._matcher = matcher
+
+    def scan(self, text: str) -> Iterator[Tuple[str, int, int]]:
+        """Yield ``(entity_type, start_char, end_char)`` of every term found in
+        one pass over ``text``; overlapping matches keep the longest term."""
+        doc = self._tokenizer(text)
+        for span in filter_spans(self._matcher(doc, as_spans=True)):
+            yield span.label_, span.start_char, span.end_char
+
+    @classmethod
+    def build(cls, language: str, lexicons: Dict[str, Path], fingerprint: str) -> "LanguageGazetteer":
+        nlp = spacy.blank(language)
+        matcher = PhraseMatcher(nlp.vocab, attr="LOWER")
+        for entity_type, path in sorted(lexicons.items()):
+            matcher.add(entity_type, list(nlp.tokenizer.pipe(read_lexicon(path), batch_size=1000)))
+        return cls(language, nlp.vocab, matcher, fingerprint)
+
+    def dump(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "wb") as f:
+            pickle.dump((self.fingerprint, self._tokenizer.vocab, self._matcher), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, language: str, path: Path, fingerprint: str) -> Optional["LanguageGazetteer"]:
+        """Load a dumped matcher, or None when it is missing or built from other lexicons."""
+        try:
+            with open(path, "rb") as f:
+                stored_fingerprint, vocab, matcher = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError):
+            return None
+        if stored_fingerprint != fingerprint:
+            return None
+        return cls(language, vocab, matcher, fingerprint)
+
+
+class Gazetteer:
+    """Per-language lexicon matchers, built on first use.
+
+    A built matcher is pickled to ``cache_dir`` and reloaded from there as long
+    as the lexicon files and the spaCy version are unchanged. The cache
+    directory must only be writable by the service.
+    """
+
+    def __init__(self, directory: Optional[str] = None, cache_dir: Optional[str] = None):
+        self.directory = Path(directory) if directory else DEFAULT_GAZETTEER_DIR
+        self.cache_dir = Path(cache_dir) if cache_dir else self.directory / ".cache"
+        self._matchers: Dict[str, LanguageGazetteer] = {}
+        self._lock = threading.Lock()
+
+    def lexicons(self, language: str) -> Dict[str, Path]:
+        language_dir = self.directory / language
+        if not language_dir.is_dir():
+            return {}
+        return {path.stem: path for path in sorted(language_dir.glob("*.txt"))}
+
+    def fingerprint(self, language: str) -> str:
+        digest = hashlib.sha256(f"spacy-{spacy.__version__}".encode())
+        for entity_type, path in self.lexicons(language).items():
+            digest.update(entity_type.encode())
+            digest.update(path.read_bytes())
+        return digest.hexdigest()[:16]
+
+    def get(self, language: str) -> LanguageGazetteer:
+        matcher = self._matchers.get(language)
+        if matcher is None:
+            with self._lock:
+                matcher = self._matchers.get(language)
+                if matcher is None:
+                    matcher = self._matchers[language] = self._load_or_build(language)
+        return matcher
+
+    def _load_or_build(self, language: str) -> LanguageGazetteer:
+        start_time = time.perf_counter()
+        fingerprint = self.fingerprint(language)
+        cache_path = self.cache_dir / f"{language}-{fingerprint}.pkl"
+        matcher = LanguageGazetteer.load(language, cache_path, fingerprint)
+        if matcher is not None:
+            logger.info(f"Gazetteer {language} loaded from {cache_path} in {(time.perf_counter() - start_time) * 1000:.1f} ms")
+            return matcher
+
+        lexicons = self.lexicons(language)
+        matcher = LanguageGazetteer.build(language, lexicons, fingerprint)
+        logger.info(f"Gazetteer {language} built from {len(lexicons)} lexicons in {(time.perf_counter() - start_time) * 1000:.1f} ms")
+        try:
+            matcher.dump(cache_path)
+        except OSError as e:
+            logger.warning(f"Could not cache gazetteer {language} at {cache_path}: {e}")
+        return matcher
+
+    def scan(self, text: str, language: str) -> Iterator[Tuple[str, int, int]]:
+        return self.get(language).scan(text)
@@ -0,0 +1,62 @@
+from typing import Dict, Optional
+from app.config import settings
+from app.services.nlp_processor import nlp_processor
+from app.services.result_cache import LRUCache
+
+
+class NoteSegmentStore:
+    """Per-paragraph results of the latest version of every note, by note id.
+
+    Only the paragraphs of the latest submission are kept, so an edited note
+    does not accumulate stale entries, and results of an older processor
+    version are ignored.
+
+    The store lives in the process that parses the note: with
+    ``EXECUTOR_BACKEND=process`` each pool worker (and each server worker)
+    has its own, and a new version of a note only reuses segments when it
+    reaches the worker that parsed the previous one. The ``processed`` and
+    ``reused`` counters are kept by the server process through ``count``.
+    """
+
+    def __init__(self, max_notes: int = 10000, ttl_seconds: float = 86400):
+        self._notes = LRUCache(max_notes, ttl_seconds)
+        self.processed = 0
+        self.reused = 0
+
+    def get(self, note_id: str, version: str) -> Dict[str, Dict]:
+        entry = self._notes.get(note_id)
+        if entry is None or entry["version"] != version:
+            return {}
+        return entry["segments"]
+
+    def set(self, note_id: str, version: str, segments: Dict[str, Dict]) -> None:
+        self._notes.set(note_id, {"version": version, "segments": segments})
+
+    def count(self, segments: Optional[Dict]) -> None:
+        """Count the ``nlp_result["segments"]`` of one incrementally processed note."""
+        if segments:
+            self.reused += segments["reused"]
+            self.processed += segments["total"] - segments["reused"]
+
+    def stats(self) -> Dict:
+        return {
+            "enabled": settings.INCREMENTAL_ENABLED,
+            "notes": len(self._notes),
+            "segments_processed": self.processed,
+            "segments_reused": self.reused
+        }
+
+
+def process_incremental(masked_text: str, note_id: str) -> Dict:
+    """``NLPProcessor.process`` for a new version of note ``note_id``, parsing
+    only the paragraphs that changed since its previous version."""
+    version = nlp_processor.version
+    nlp_result, segments = nlp_processor.process_segments(masked_text, segment_store.get(note_id, version))
+    segment_store.set(note_id, version, segments)
+    return nlp_result
+
+
+segment_store = NoteSegmentStore(
+    max_notes=settings.INCREMENTAL_MAX_NOTES,
+    ttl_seconds=settings.INCREMENTAL_TTL_SECONDS
+)
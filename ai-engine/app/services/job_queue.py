@@ -0,0 +1,398 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.database import SessionLocal
+from app.models.job import JobRecord
+from app.schemas import MedicalNoteRequest
+from app.services.executor import processing_executor, ExecutorSaturated
+from app.services.metrics import observe_analysis, stage_duration
+from app.services.ndjson_stream import analyze_requests
+from app.services.persistence import persist_records
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED = (COMPLETED, FAILED, CANCELLED)
+
+
+class JobQueueFull(Exception):
+    pass
+
+
+class Job:
+    """A batch of notes processed in the background, ``chunk_size`` notes at a time.
+
+    Plain data, so a backend can store it anywhere; it changes only through
+    ``JobBackend.update``.
+    """
+
+    def __init__(self, notes: List[MedicalNoteRequest], priority: int = 5, persist: bool = True,
+                 debug: bool = False, response_format: str = "default"):
+        self.id = uuid.uuid4().hex
+        self.priority = priority
+        self.notes = notes
+        self.persist = persist
+        self.debug = debug
+        self.response_format = response_format
+        self.status = QUEUED
+        self.total = len(notes)
+        self.processed = 0
+        self.results: List[Dict] = []
+        self.error: Optional[str] = None
+        self.cancel_requested = False
+        self.created_at = datetime.utcnow()
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED
+
+    def to_dict(self, include_results: bool = True) -> Dict:
+        data = {
+            "id": self.id,
+            "status": self.status,
+            "priority": self.priority,
+            "progress": {
+                "processed": self.processed,
+                "total": self.total,
+                "percent": round(100 * self.processed / self.total, 1) if self.total else 100.0
+            },
+            "error": self.error,
+            "created_at": self.created_at.isoformat(),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None
+        }
+        if include_results:
+            data["results"] = self.results
+        return data
+
+
+class InMemoryJobBackend:
+    """Jobs and their priority queue held in this process: higher priority
+    first, submission order within a priority.
+
+    The job queue reads and writes jobs only through ``put``, ``pop`` (which
+    claims the next queued job by marking it running), ``get``, ``update``
+    (sets the given fields of a stored job), ``pending`` and ``purge``, and
+    re-reads a job with ``get`` rather than relying on the instance it holds.
+    A backend over a shared store implementing them, with ``shared = True``,
+    lets several server processes drain one queue.
+    """
+
+    # Whether other server processes see these jobs.
+    shared = False
+
+    def __init__(self):
+        self._jobs: Dict[str, Job] = {}
+        self._heap: List = []
+        self._sequence = itertools.count()
+
+    def put(self, job: Job) -> None:
+        self._jobs[job.id] = job
+        heapq.heappush(self._heap, (-job.priority, next(self._sequence), job.id))
+
+    def pop(self) -> Optional[Job]:
+        while self._heap:
+            _, _, job_id = heapq.heappop(self._heap)
+            job = self._jobs.get(job_id)
+            if job is not None and job.status == QUEUED:
+                job.status = RUNNING
+                job.started_at = datetime.utcnow()
+                return job
+        return None
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def update(self, job_id: str, **fields) -> Optional[Job]:
+        job = self._jobs.get(job_id)
+        if job is not None:
+            for name, value in fields.items():
+                setattr(job, name, value)
+        return job
+
+    def pending(self) -> int:
+        return sum(1 for job in self._jobs.values() if job.status == QUEUED)
+
+    def purge(self, before: datetime) -> int:
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.finished and job.finished_at < before
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+        return len(expired)
+
+
+class DatabaseJobBackend:
+    """Jobs stored in the ``jobs`` table, so every server process sees and
+    drains the same queue (``JOB_BACKEND=database``).
+
+    ``pop`` claims a job with a conditional update from queued to running;
+    a process that loses the race to another one tries the next job.
+    """
+
+    shared = True
+
+    _FIELDS = ("status", "priority", "persist", "debug", "response_format", "total", "processed",
+               "results", "error", "cancel_requested", "created_at", "started_at", "finished_at")
+
+    def __init__(self, session_factory: Optional[Callable[[], Session]] = None):
+        self.session_factory = session_factory or SessionLocal
+
+    def put(self, job: Job) -> None:
+        with self.session_factory() as session:
+            session.add(JobRecord(id=job.id, notes=self._dump_notes(job.notes),
+                                  **{name: getattr(job, name) for name in self._FIELDS}))
+            session.commit()
+
+    def pop(self) -> Optional[Job]:
+        with self.session_factory() as session:
+            while True:
+                job_id = session.query(JobRecord.id).filter(JobRecord.status == QUEUED).order_by(
+                    JobRecord.priority.desc(), JobRecord.created_at
+                ).limit(1).scalar()
+                if job_id is None:
+                    return None
+                claimed = session.query(JobRecord).filter(
+                    JobRecord.id == job_id, JobRecord.status == QUEUED
+                ).update({"status": RUNNING, "started_at": datetime.utcnow()}, synchronize_session=False)
+                session.commit()
+                if claimed:
+                    return self._job(session.get(JobRecord, job_id))
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self.session_factory() as session:
+            record = session.get(JobRecord, job_id)
+            return self._job(record) if record is not None else None
+
+    def update(self, job_id: str, **fields) -> Optional[Job]:
+        if "notes" in fields:
+            fields["notes"] = self._dump_notes(fields["notes"])
+        with self.session_factory() as session:
+            session.query(JobRecord).filter(JobRecord.id == job_id).update(fields, synchronize_session=False)
+            session.commit()
+            record = session.get(JobRecord, job_id)
+            return self._job(record) if record is not None else None
+
+    def pending(self) -> int:
+        with self.session_factory() as session:
+            return session.query(JobRecord).filter(JobRecord.status == QUEUED).count()
+
+    def purge(self, before: datetime) -> int:
+        with self.session_factory() as session:
+            purged = session.query(JobRecord).filter(
+                JobRecord.status.in_(FINISHED), JobRecord.finished_at < before
+            ).delete(synchronize_session=False)
+            session.commit()
+            return purged
+
+    @staticmethod
+    def _dump_notes(notes: List[MedicalNoteRequest]) -> List[Dict]:
+        return [note.model_dump() for note in notes]
+
+    def _job(self, record: JobRecord) -> Job:
+        notes = [MedicalNoteRequest.model_validate(note) for note in record.notes or []]
+        job = Job(notes, record.priority, record.persist, record.debug, record.response_format)
+        job.id = record.id
+        for name in self._FIELDS:
+            setattr(job, name, getattr(record, name))
+        job.results = record.results or []
+        return job
+
+
+def job_backend(name: str):
+    if name == "database":
+        return DatabaseJobBackend()
+    if name == "memory":
+        return InMemoryJobBackend()
+    raise ValueError(f"Unknown job backend: {name}")
+
+
+# Processes one chunk of a job's notes and returns their result payloads.
+ChunkProcessor = Callable[[Job, List[MedicalNoteRequest]], Awaitable[List[Dict]]]
+
+
+class JobQueue:
+    """Background processing of note batches submitted through ``/jobs``.
+
+    ``workers`` asyncio tasks each run one job at a time, so at most that
+    many executor slots go to jobs and the rest stay free for synchronous
+    requests. A job is processed in chunks of ``chunk_size`` notes; its
+    progress and results grow after every chunk and cancelling a running job
+    takes effect at the next chunk.
+    """
+
+    def __init__(self, backend=None, workers: int = 2, chunk_size: int = 32, max_pending: int = 1000,
+                 retention_seconds: float = 3600, process_chunk: Optional[ChunkProcessor] = None,
+                 poll_interval: float = 0.5):
+        self.backend = backend if backend is not None else InMemoryJobBackend()
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.max_pending = max_pending
+        self.retention_seconds = retention_seconds
+        self.process_chunk = process_chunk or process_job_chunk
+        self.poll_interval = poll_interval
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        # Wakes the long-polls of jobs finished by this process; jobs finished
+        # by another one are noticed by re-reading them every poll_interval.
+        self._done: Dict[str, asyncio.Event] = {}
+
+    def start(self) -> None:
+        if self._tasks:
+            return
+        self._wakeup = asyncio.Event()
+        if self.backend.pending():
+            self._wakeup.set()
+        self._tasks = [asyncio.create_task(self._work(), name=f"job-worker-{i}") for i in range(self.workers)]
+        logger.info(f"Started job queue with {self.workers} workers")
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def submit(self, notes: List[MedicalNoteRequest], priority: int = 5, persist: bool = True,
+               debug: bool = False, response_format: str = "default") -> Job:
+        self.backend.purge(datetime.utcnow() - timedelta(seconds=self.retention_seconds))
+        pending = self.backend.pending()
+        if pending >= self.max_pending:
+            raise JobQueueFull(f"Job queue is full ({pending} jobs pending)")
+        job = Job(notes, priority, persist, debug, response_format)
+        self.backend.put(job)
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self.backend.get(job_id)
+
+    def cancel(self, job: Job) -> Job:
+        """Cancel a queued job now, a running one before its next chunk; returns the updated job."""
+        if job.status == QUEUED:
+            return self._finish(job.id, CANCELLED)
+        if job.status == RUNNING:
+            return self.backend.update(job.id, cancel_requested=True) or job
+        return job
+
+    async def wait(self, job: Job, timeout: float) -> Job:
+        """Long-poll: return the job once it finished or after ``timeout`` seconds."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while not job.finished and loop.time() < deadline:
+            done = self._done.setdefault(job.id, asyncio.Event())
+            try:
+                await asyncio.wait_for(done.wait(), min(self.poll_interval, deadline - loop.time()))
+            except asyncio.TimeoutError:
+                pass
+            job = self.backend.get(job.id) or job
+        if job.finished:
+            self._done.pop(job.id, None)
+        return job
+
+    def stats(self) -> Dict:
+        return {
+            "workers": self.workers,
+            "pending": self.backend.pending(),
+            "running": self.running,
+            "completed": self.completed,
+            "failed": self.failed
+        }
+
+    async def _work(self) -> None:
+        while True:
+            job = self.backend.pop()
+            if job is None:
+                self._wakeup.clear()
+                if self.backend.shared:
+                    # Jobs submitted to another process do not set our wakeup.
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                    except asyncio.TimeoutError:
+                        pass
+                else:
+                    await self._wakeup.wait()
+                continue
+            self.running += 1
+            try:
+                await self._run(job)
+            finally:
+                self.running -= 1
+
+    def _finish(self, job_id: str, status: str, error: Optional[str] = None) -> Optional[Job]:
+        job = self.backend.update(job_id, status=status, error=error, finished_at=datetime.utcnow(), notes=[])
+        done = self._done.pop(job_id, None)
+        if done is not None:
+            done.set()
+        return job
+
+    def _cancel_requested(self, job_id: str) -> bool:
+        stored = self.backend.get(job_id)
+        return stored is not None and stored.cancel_requested
+
+    async def _run(self, job: Job) -> None:
+        results: List[Dict] = []
+        try:
+            for start in range(0, job.total, self.chunk_size):
+                if self._cancel_requested(job.id):
+                    self._finish(job.id, CANCELLED)
+                    return
+                results.extend(await self.process_chunk(job, job.notes[start:start + self.chunk_size]))
+                self.backend.update(job.id, processed=len(results), results=results)
+        except asyncio.CancelledError:
+            self._finish(job.id, FAILED, "Job interrupted by shutdown")
+            raise
+        except Exception as e:
+            logger.error(f"Job {job.id} failed: {e}")
+            self.failed += 1
+            self._finish(job.id, FAILED, f"Error processing medical notes: {str(e)}")
+            return
+        self.completed += 1
+        self._finish(job.id, COMPLETED)
+
+
+async def process_job_chunk(job: Job, notes: List[MedicalNoteRequest]) -> List[Dict]:
+    # Background jobs wait out saturation; each attempt sleeps until a slot frees.
+    while True:
+        try:
+            data, records, samples = await processing_executor.run(
+                analyze_requests, notes, settings.NLP_BATCH_SIZE, job.debug, job.response_format,
+                wait=settings.STREAM_SLOT_WAIT_SECONDS
+            )
+            break
+        except ExecutorSaturated:
+            continue
+    for sample in samples:
+        observe_analysis(*sample)
+    if job.persist and records:
+        persist_start = time.perf_counter()
+        await run_in_threadpool(persist_records, records)
+        stage_duration.observe(time.perf_counter() - persist_start, "persistence")
+    return data
+
+
+job_queue = JobQueue(
+    backend=job_backend(settings.JOB_BACKEND),
+    workers=settings.JOB_WORKERS,
+    chunk_size=settings.JOB_CHUNK_SIZE,
+    max_pending=settings.JOB_MAX_PENDING,
+    retention_seconds=settings.JOB_RETENTION_SECONDS
+)
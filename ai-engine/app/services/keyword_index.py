@@ -0,0 +1,175 @@
+import re
+from collections import deque
+from typing import Dict, List, Tuple
+
+
+RISK_KEYWORDS = {
+    "critical": {
+        "en": ["cardiac arrest", "stroke", "seizure", "unconscious", "respiratory failure",
+               "severe pain", "chest pain", "difficulty breathing", "anaphylaxis"],
+        "pt": ["parada cardíaca", "avc", "convulsão", "inconsciente", "insuficiência respiratória",
+               "dor severa", "dor no peito", "dificuldade para respirar", "anafilaxia"]
+    },
+    "high": {
+        "en": ["high fever", "severe", "intense", "acute", "emergency", "urgent"],
+        "pt": ["febre alta", "severa", "intensa", "aguda", "emergência", "urgente"]
+    },
+    "moderate": {
+        "en": ["moderate", "persistent", "recurrent"],
+        "pt": ["moderada", "persistente", "recorrente"]
+    }
+}
+
+RISK_WEIGHTS = {
+    "critical": 0.3,
+    "high": 0.2,
+    "moderate": 0.15
+}
+
+# Lexicon size (per language) from which the automaton beats the regex
+# alternation; see benchmarks/bench_keyword_index.py.
+AUTOMATON_MIN_KEYWORDS = 5000
+
+# (start, end, tier, keyword)
+KeywordHit = Tuple[int, int, str, str]
+
+
+def _trie_pattern(keywords: List[str]) -> str:
+    """Regex alternation of ``keywords`` shaped as a prefix trie
+    (``s(?:evere(?: pain)?|troke)``): a failed branch is abandoned after
+    one character and the longest keyword at a position wins."""
+    trie: Dict = {}
+    for keyword in keywords:
+        node = trie
+        for ch in keyword:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node: Dict) -> str:
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return f"(?:{body})?" if "" in node else body
+
+    return build(trie)
+
+
+class _KeywordPattern:
+    """Case-insensitive keywords compiled into one regex alternation.
+
+    The lowercased text is searched again one character after every hit,
+    so overlapping keywords are all found. Of the keywords starting at one
+    position the regex reports the longest; the shorter ones it contains
+    (``severe`` in ``severe pain``) come from a table built with it.
+    """
+
+    def __init__(self, entries: List[Tuple[str, str]]):
+        self.tiers = {keyword.lower(): tier for tier, keyword in entries}
+        self.regex = re.compile(_trie_pattern(list(self.tiers)))
+        self._automaton = _Automaton(entries)
+        self.contained = {
+            keyword: [(start, other) for start, _, _, other in self._automaton.find(keyword) if other != keyword]
+            for keyword in self.tiers
+        }
+
+    def find(self, text: str) -> List[KeywordHit]:
+        lowered = text.lower()
+        if len(lowered) != len(text):
+            # Lowercasing changed the length (e.g. "İ"), offsets would not
+            # match the text: scan it as-is with the automaton instead.
+            return sorted(set(self._automaton.find(text)))
+        hits = set()
+        match = self.regex.search(lowered)
+        while match:
+            start = match.start()
+            keyword = match.group()
+            hits.add((start, match.end(), self.tiers[keyword], keyword))
+            for offset, other in self.contained[keyword]:
+                hits.add((start + offset, start + offset + len(other), self.tiers[other], other))
+            match = self.regex.search(lowered, start + 1)
+        return sorted(hits)
+
+
+class _Automaton:
+    """Aho-Corasick automaton over case-insensitive keywords.
+
+    Transitions exist for both the lower and upper case form of every
+    character, so the original text is scanned as-is and hit offsets
+    refer to it directly.
+    """
+
+    def __init__(self, entries: List[Tuple[str, str]]):
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.output: List[List[Tuple[int, str, str]]] = [[]]
+
+        for tier, keyword in entries:
+            keyword = keyword.lower()
+            state = 0
+            for ch in keyword:
+                if ch not in self.goto[state]:
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append([])
+                    self.goto[state][ch] = len(self.goto) - 1
+                state = self.goto[state][ch]
+            self.output[state].append((len(keyword), tier, keyword))
+
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, child in self.goto[state].items():
+                queue.append(child)
+                fallback = self.fail[state]
+                while fallback and ch not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                target = self.goto[fallback].get(ch, 0)
+                self.fail[child] = target if target != child else 0
+                self.output[child] = self.output[child] + self.output[self.fail[child]]
+
+        for transitions in self.goto:
+            for ch, child in list(transitions.items()):
+                upper = ch.upper()
+                if len(upper) == 1 and upper != ch:
+                    transitions[upper] = child
+
+    def find(self, text: str) -> List[KeywordHit]:
+        goto, fail, output = self.goto, self.fail, self.output
+        hits = []
+        state = 0
+        for position, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if output[state]:
+                end = position + 1
+                for length, tier, keyword in output[state]:
+                    hits.append((end - length, end, tier, keyword))
+        return hits
+
+
+class KeywordIndex:
+    """Risk keywords of every tier, indexed per language: a compiled regex
+    alternation, or an Aho-Corasick automaton for lexicons of at least
+    ``AUTOMATON_MIN_KEYWORDS`` terms, whose scan cost does not grow with
+    the lexicon but whose pure-Python loop is slower on small ones."""
+
+    def __init__(self, keywords: Dict[str, Dict[str, List[str]]] = RISK_KEYWORDS, default_language: str = "en",
+                 automaton_min_keywords: int = AUTOMATON_MIN_KEYWORDS):
+        self.default_language = default_language
+        languages = {language for by_language in keywords.values() for language in by_language}
+        self._scanners = {}
+        for language in languages:
+            entries = [
+                (tier, keyword)
+                for tier, by_language in keywords.items()
+                for keyword in by_language.get(language, by_language[default_language])
+            ]
+            scanner = _Automaton if len(entries) >= automaton_min_keywords else _KeywordPattern
+            self._scanners[language] = scanner(entries)
+
+    def find(self, text: str, language: str) -> List[KeywordHit]:
+        """Return every keyword occurrence as ``(start, end, tier, keyword)``, overlaps included."""
+        scanner = self._scanners.get(language, self._scanners[self.default_language])
+        return scanner.find(text)
@@ -0,0 +1,149 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+STAGE_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+NOTE_SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus text format."""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = STAGE_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series: Dict[Tuple[str, ...], List] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labelvalues: str) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                series = self._series[labelvalues] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def collect(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = [(labels, list(counts), total) for labels, (counts, total) in sorted(self._series.items())]
+        for labels, counts, total in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _format_value(bound)
+                bucket_labels = _format_labels(self.labelnames, labels, 'le="' + le + '"')
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+class Gauge:
+    """Gauge read from a callback at scrape time; the callback returns a
+    number, or a dict of label-value tuples to numbers."""
+
+    type = "gauge"
+
+    def __init__(self, name: str, documentation: str, callback: Callable, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.callback = callback
+        self.labelnames = tuple(labelnames)
+
+    def collect(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        value = self.callback()
+        samples = value.items() if isinstance(value, dict) else [((), value)]
+        for labels, sample in samples:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(sample)}")
+        return lines
+
+
+class Counter(Gauge):
+    """Monotonic total read from a callback at scrape time, like ``Gauge``,
+    exposed as ``<name>_total``."""
+
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, callback: Callable, labelnames: Sequence[str] = ()):
+        super().__init__(name if name.endswith("_total") else name + "_total", documentation, callback, labelnames)
+
+
+class MetricsRegistry:
+
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+
+    def register(self, metric):
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.collect())
+        return "\n".join(lines) + "\n"
+
+
+@contextmanager
+def stage_timer(timings: Dict[str, float], stage: str) -> Iterator[None]:
+    """Add the wall time of the block, in milliseconds, to ``timings[stage]``."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[stage] = timings.get(stage, 0.0) + (time.perf_counter() - start) * 1000
+
+
+registry = MetricsRegistry()
+
+stage_duration = registry.register(Histogram(
+    "ai_engine_stage_duration_seconds", "Time spent in each processing stage", ["stage"]
+))
+request_duration = registry.register(Histogram(
+    "ai_engine_request_duration_seconds", "Time to handle a request, response serialization included", ["route"]
+))
+note_size = registry.register(Histogram(
+    "ai_engine_note_size_bytes", "Size of the processed notes per detected language", ["language"],
+    NOTE_SIZE_BUCKETS
+))
+
+
+def observe_analysis(language: str, note_bytes: int, timings: Optional[Dict[str, float]],
+                     cache_lookup: Optional[str] = None, segments: Optional[Dict[str, int]] = None) -> None:
+    """Record the note size, stage timings, result cache lookup outcome
+    (``nlp_result["cache_lookup"]``) and incremental segment counts
+    (``nlp_result["segments"]``) of one analysed note, in the server process."""
+    from app.services.incremental import segment_store
+    from app.services.result_cache import result_cache
+    result_cache.count(cache_lookup)
+    segment_store.count(segments)
+    note_size.observe(note_bytes, language)
+    for stage, elapsed_ms in (timings or {}).items():
+        stage_duration.observe(elapsed_ms / 1000, stage)
+
+
+def rounded_timings(timings: Dict[str, float]) -> Dict[str, float]:
+    return {stage: round(elapsed_ms, 3) for stage, elapsed_ms in timings.items()}
@@ -0,0 +1,143 @@
+import logging
+from datetime import datetime
+from typing import AsyncIterator, Dict, Iterable, Iterator, List, Optional, Tuple
+from pydantic import ValidationError
+from app.schemas import MedicalNoteRequest
+from app.services.persistence import build_record
+from app.services.serialization import dumps
+from app.services.pipeline import analyze_batch, build_response_data, note_hash
+
+logger = logging.getLogger(__name__)
+
+# (line number, raw line); the line is None when it exceeded the size limit.
+NDJSONLine = Tuple[int, Optional[bytes]]
+
+
+def iter_line_chunks(lines: Iterable[bytes], chunk_size: int, max_line_bytes: int) -> Iterator[List[NDJSONLine]]:
+    """Group an iterable of NDJSON lines (e.g. a binary file) into chunks, skipping blank lines."""
+    chunk: List[NDJSONLine] = []
+    for line_number, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        chunk.append((line_number, line if len(line) <= max_line_bytes else None))
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+async def aiter_line_chunks(body: AsyncIterator[bytes], chunk_size: int,
+                            max_line_bytes: int) -> AsyncIterator[List[NDJSONLine]]:
+    """Split a streamed request body into NDJSON lines and group them into chunks.
+
+    Only the current partial line is buffered; a line longer than
+    ``max_line_bytes`` is dropped as it arrives and reported as oversized.
+    """
+    buffer = b""
+    oversized = False
+    line_number = 0
+    chunk: List[NDJSONLine] = []
+
+    def take(line: bytes) -> None:
+        nonlocal line_number, oversized
+        line_number += 1
+        if oversized:
+            chunk.append((line_number, None))
+            oversized = False
+        elif line.strip():
+            chunk.append((line_number, line.strip()))
+
+    async for data in body:
+        lines = (buffer + data).split(b"\n")
+        buffer = lines.pop()
+        for line in lines:
+            take(line)
+        if len(buffer) > max_line_bytes:
+            buffer = b""
+            oversized = True
+        while len(chunk) >= chunk_size:
+            yield chunk[:chunk_size]
+            del chunk[:chunk_size]
+    if buffer or oversized:
+        take(buffer)
+    if chunk:
+        yield chunk
+
+
+def process_ndjson_chunk(chunk: List[NDJSONLine], batch_size: int = 64, debug: bool = False,
+                         response_format: str = "default") -> Tuple[List[Dict], List[Dict], List[Tuple]]:
+    """Validate and process one chunk of NDJSON notes.
+
+    Returns ``(outputs, records, samples)``: one output line per input line,
+    in order, the ``MedicalNoteProcessing`` rows to persist and the
+    ``(language, note_bytes, timings_ms, cache_lookup, segments)`` of every processed
+    note for ``observe_analysis``.
+    """
+    outputs: List[Optional[Dict]] = [None] * len(chunk)
+    valid: List[Tuple[int, MedicalNoteRequest]] = []
+    for index, (line_number, line) in enumerate(chunk):
+        if line is None:
+            outputs[index] = _error(line_number, "Line exceeds the maximum note size")
+            continue
+        try:
+            valid.append((index, MedicalNoteRequest.model_validate_json(line)))
+        except ValidationError as e:
+            outputs[index] = _error(line_number, e.errors(include_url=False, include_context=False, include_input=False))
+
+    records: List[Dict] = []
+    samples: List[Tuple] = []
+    if valid:
+        try:
+            data, records, samples = analyze_requests([note for _, note in valid], batch_size, debug, response_format)
+        except Exception as e:
+            logger.error(f"Error processing NDJSON chunk: {e}")
+            for index, _ in valid:
+                outputs[index] = _error(chunk[index][0], f"Error processing medical note: {str(e)}")
+            return outputs, records, samples
+
+        processed_at = datetime.utcnow().isoformat()
+        for (index, _), note_data in zip(valid, data):
+            outputs[index] = {
+                "line": chunk[index][0],
+                "status": "success",
+                "data": note_data,
+                "processed_at": processed_at
+            }
+
+    return outputs, records, samples
+
+
+def analyze_requests(notes: List[MedicalNoteRequest], batch_size: int = 64, debug: bool = False,
+                     response_format: str = "default") -> Tuple[List[Dict], List[Dict], List[Tuple]]:
+    """Process validated notes as one batch. Returns ``(data, records, samples)``:
+    the response payload of every note, in order, plus the rows to persist and
+    the ``observe_analysis`` samples as in ``process_ndjson_chunk``."""
+    results = analyze_batch(
+        [(note.medical_note, note.skip_masking) for note in notes], batch_size, 1, [note.note_id for note in notes]
+    )
+    data: List[Dict] = []
+    records: List[Dict] = []
+    samples: List[Tuple] = []
+    for note, (de_identified, nlp_result) in zip(notes, results):
+        record_hash = note_hash(note.medical_note, note.note_hash)
+        data.append(build_response_data(
+            de_identified, nlp_result, record_hash, note.skip_masking, debug, response_format
+        ))
+        samples.append((nlp_result["language_detected"], len(note.medical_note.encode()), nlp_result["timings_ms"],
+                        nlp_result["cache_lookup"], nlp_result.get("segments")))
+        records.append(build_record(de_identified["masked_text"], nlp_result, record_hash))
+    return data, records, samples
+
+
+def encode_lines(outputs: List[Dict]) -> bytes:
+    return b"".join(dumps(output) + b"\n" for output in outputs)
+
+
+def error_lines(chunk: List[NDJSONLine], detail) -> List[Dict]:
+    return [_error(line_number, detail) for line_number, _ in chunk]
+
+
+def _error(line_number: int, detail) -> Dict:
+    return {"line": line_number, "status": "error", "detail": detail}
@@ -1,163 +1,240 @@
 import spacy
+import hashlib
 import re
 import time
-from typing import Dict, List, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
 from collections import defaultdict
 import logging
+import threading
+from app.config import settings
+from app.services.pattern_registry import PatternRegistry
+from app.services.keyword_index import KeywordIndex, RISK_WEIGHTS
+from app.services.metrics import stage_timer
+from app.services.chunking import ChunkedDoc, MergedEntity, merge_entities, split_segments, split_text
+from app.services.entity_spans import EntitySpans, SPAN_LABELS
+from app.services.language_id import LanguageGuess, LanguageIdentifier
+from app.services.gazetteer import Gazetteer
 
 logger = logging.getLogger(__name__)
 
+ENTITY_LABELS = {
+    "symptoms": ["SYMPTOM", "DISEASE", "CONDITION"],
+    "medications": ["DRUG", "MEDICATION"],
+    "diagnoses": ["DISEASE", "CONDITION", "DIAGNOSIS"],
+}
+
+# Most values of each entity type returned per note.
+ENTITY_LIMITS = {
+    "symptoms": 15,
+    "medications": 15,
+    "diagnoses": 10,
+}
+
+SYMPTOM_SEPARATORS = re.compile(r'[,;]|\s+e\s+|\s+and\s+', re.IGNORECASE)
+
+MODEL_NAMES = {
+    "en": "en_core_web_sm",
+    "pt": "pt_core_news_sm",
+}
+
+# Bump whenever extraction patterns, keywords or scoring change, so cached
+# results produced by an older ruleset are not reused.
+RULESET_VERSION = "3"
+
+
+def _strip_span(text: str, start: int, end: int) -> Tuple[int, int]:
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    return start, end
+
+
+def _split_symptoms(text: str, start: int, end: int) -> Iterator[Tuple[int, int]]:
+    """Yield the stripped, non-empty pieces of ``text[start:end]`` between symptom separators."""
+    position = start
+    for match in SYMPTOM_SEPARATORS.finditer(text, start, end):
+        yield _strip_span(text, position, match.start())
+        position = match.end()
+    yield _strip_span(text, position, end)
+
 
 class NLPProcessor:
     
     def __init__(self):
+        self.patterns = PatternRegistry()
+        self.keywords = KeywordIndex()
+        self.language_identifier = LanguageIdentifier()
+        self.extraction_backend = settings.NLP_EXTRACTION_BACKEND
+        self.use_patterns = self.extraction_backend in ("regex", "both")
+        self.use_gazetteer = self.extraction_backend in ("gazetteer", "both")
+        self.gazetteer = Gazetteer(settings.GAZETTEER_DIR, settings.GAZETTEER_CACHE_DIR)
+        self.version = f"{RULESET_VERSION}:{MODEL_NAMES['en']}:{MODEL_NAMES['pt']}:spacy-{spacy.__version__}"
+        if self.use_gazetteer:
+            fingerprints = "-".join(self.gazetteer.fingerprint(language) for language in MODEL_NAMES)
+            self.version += f":{self.extraction_backend}-{fingerprints}"
+        self._models = {}
+        self._load_times_ms: Dict[str, float] = {}
+        self._load_lock = threading.Lock()
+    
+    @property
+    def nlp_en(self):
+        return self.get_model("en")
+    
+    @property
+    def nlp_pt(self):
+        return self.get_model("pt")
+    
+    def get_model(self, language: str):
+        """Return the spaCy pipeline for ``language``, loading it on first use"""
+        language = language if language in MODEL_NAMES else "en"
+        model = self._models.get(language)
+        if model is None:
+            with self._load_lock:
+                model = self._models.get(language)
+                if model is None:
+                    model = self._load_model(language)
+        return model
+    
+    def _load_model(self, language: str):
+        name = MODEL_NAMES[language]
+        exclude = settings.NLP_EXCLUDED_COMPONENTS
+        start_time = time.perf_counter()
         try:
-            self.nlp_en = spacy.load("en_core_web_sm")
-            self.nlp_pt = spacy.load("pt_core_news_sm")
-            logger.info("NLP models loaded successfully")
+            model = spacy.load(name, exclude=exclude)
         except OSError as e:
-            logger.error(f"Error loading NLP models: {e}")
-            logger.info("Attempting to download models...")
+            logger.error(f"Error loading NLP model {name}: {e}")
+            logger.info(f"Attempting to download {name}...")
             import subprocess
-            subprocess.run(["python", "-m", "spacy", "download", "en_core_web_sm"])
-            subprocess.run(["python", "-m", "spacy", "download", "pt_core_news_sm"])
-            self.nlp_en = spacy.load("en_core_web_sm")
-            self.nlp_pt = spacy.load("pt_core_news_sm")
+            subprocess.run(["python", "-m", "spacy", "download", name])
+            model = spacy.load(name, exclude=exclude)
+        
+        self._load_times_ms[language] = round((time.perf_counter() - start_time) * 1000, 2)
+        self._models[language] = model
+        logger.info(f"NLP model {name} loaded in {self._load_times_ms[language]} ms with pipes {model.pipe_names}")
+        return model
+    
+    def preload(self, languages: Optional[List[str]] = None) -> None:
+        for language in languages if languages is not None else settings.NLP_PRELOAD_LANGUAGES:
+            self.get_model(language)
+            if self.use_gazetteer:
+                self.gazetteer.get(language)
+    
+    def model_status(self) -> Dict[str, Dict]:
+        status = {}
+        for language, name in MODEL_NAMES.items():
+            model = self._models.get(language)
+            status[language] = {
+                "model": name,
+                "loaded": model is not None,
+                "load_time_ms": self._load_times_ms.get(language),
+                "pipeline": model.pipe_names if model is not None else None
+            }
+        return status
+    
+    def identify_language(self, text: str) -> LanguageGuess:
+        """Identify the language of a note from a bounded prefix. Guesses below
+        ``LANGID_MIN_CONFIDENCE`` are resolved by ``LANGID_FALLBACK``: ``"default"``
+        uses ``LANGID_DEFAULT_LANGUAGE``, ``"best"`` keeps the guess and
+        ``"accents"`` picks Portuguese if the note has any accented character."""
+        guess = self.language_identifier.identify(text)
+        if guess.language in MODEL_NAMES and guess.confidence >= settings.LANGID_MIN_CONFIDENCE:
+            return guess
+        if settings.LANGID_FALLBACK == "best" and guess.language in MODEL_NAMES:
+            return guess
+        if settings.LANGID_FALLBACK == "accents":
+            return LanguageGuess(self._detect_by_accents(text), guess.confidence)
+        return LanguageGuess(settings.LANGID_DEFAULT_LANGUAGE, guess.confidence)
     
     def detect_language(self, text: str) -> str:
+        return self.identify_language(text).language
+    
+    def _detect_by_accents(self, text: str) -> str:
         portuguese_chars = re.search(r'[áàâãéêíóôõúçÁÀÂÃÉÊÍÓÔÕÚÇ]', text)
         if portuguese_chars:
             return "pt"
         return "en"
     
-    def extract_symptoms(self, doc, language: str) -> List[str]:
-        symptoms = []
-        
-        symptom_patterns = {
-            "en": [
-                r"presents?\s+with\s+([^.,]+)",
-                r"symptoms?\s+include[:\s]+([^.,]+)",
-                r"complains?\s+of\s+([^.,]+)",
-                r"reports?\s+([^.,]+)",
-            ],
-            "pt": [
-                r"apresenta\s+([^.,]+)",
-                r"sintomas?\s+incluem[:\s]+([^.,]+)",
-                r"queixa[-\s]?se\s+de\s+([^.,]+)",
-                r"relata\s+([^.,]+)",
-            ]
-        }
-        
-        text = doc.text.lower()
-        patterns = symptom_patterns.get(language, symptom_patterns["en"])
-        
-        for pattern in patterns:
-            matches = re.finditer(pattern, text, re.IGNORECASE)
-            for match in matches:
-                symptom_text = match.group(1).strip()
-                symptom_list = re.split(r'[,;]|\s+e\s+|\s+and\s+', symptom_text)
-                symptoms.extend([s.strip() for s in symptom_list if s.strip()])
-        
-        for ent in doc.ents:
-            if ent.label_ in ["SYMPTOM", "DISEASE", "CONDITION"]:
-                symptoms.append(ent.text)
-        
-        symptoms = list(set([s.lower() for s in symptoms if len(s) > 2]))
-    
-    def extract_medications(self, doc, language: str) -> List[str]:
-        medications = []
-        
-        medication_patterns = {
-            "en": [
-                r"prescribed?\s+([A-Z][a-z]+(?:\s+\d+\s*(?:mg|g|ml|tablets?|capsules?))?)",
-                r"medication[:\s]+([^.,]+)",
-                r"taking\s+([A-Z][a-z]+)",
-                r"([A-Z][a-z]+\s+\d+\s*(?:mg|g|ml))",
-            ],
-            "pt": [
-                r"prescrito\s+([A-ZÁÀÂÃÉÊÍÓÔÕÚÇ][a-záàâãéêíóôõúç]+(?:\s+\d+\s*(?:mg|g|ml|comprimidos?|cápsulas?))?)",
-                r"medica[çc][ãa]o[:\s]+([^.,]+)",
-                r"tomando\s+([A-ZÁÀÂÃÉÊÍÓÔÕÚÇ][a-záàâãéêíóôõúç]+)",
-                r"([A-ZÁÀÂÃÉÊÍÓÔÕÚÇ][a-záàâãéêíóôõúç]+\s+\d+\s*(?:mg|g|ml))",
-            ]
-        }
-        
-        text = doc.text
-        patterns = medication_patterns.get(language, medication_patterns["en"])
-        
-        for pattern in patterns:
-            matches = re.finditer(pattern, text)
-            for match in matches:
-                med = match.group(1).strip()
-                if len(med) > 2:
-                    medications.append(med)
-        
-        for ent in doc.ents:
-            if ent.label_ in ["DRUG", "MEDICATION"]:
-                medications.append(ent.text)
-        
-        medications = list(set(medications))
-        return medications[:15]
-    
-    def extract_diagnoses(self, doc, language: str) -> List[str]:
-        diagnoses = []
-        
-        diagnosis_patterns = {
-            "en": [
-                r"diagnosis[:\s]+([^.,]+)",
-                r"diagnosed?\s+with\s+([^.,]+)",
-                r"dx[:\s]+([^.,]+)",
-            ],
-            "pt": [
-                r"diagn[óo]stico[:\s]+([^.,]+)",
-                r"diagnosticado\s+com\s+([^.,]+)",
-                r"diagnosticada\s+com\s+([^.,]+)",
-            ]
-        }
-        
-        text = doc.text
-        patterns = diagnosis_patterns.get(language, diagnosis_patterns["en"])
-        
-        for pattern in patterns:
-            matches = re.finditer(pattern, text, re.IGNORECASE)
-            for match in matches:
-                diagnosis = match.group(1).strip()
-                diagnoses.append(diagnosis)
-        
-        for ent in doc.ents:
-            if ent.label_ in ["DISEASE", "CONDITION", "DIAGNOSIS"]:
-                diagnoses.append(ent.text)
-        
-        diagnoses = list(set(diagnoses))
-        return diagnoses[:10]
+    def parse(self, text: str, language: str):
+        """Run the spaCy pipeline of ``language`` over ``text``.
+        
+        Notes longer than ``NLP_CHUNK_MAX_CHARS`` are split at paragraph or
+        sentence boundaries into overlapping windows that go through
+        ``nlp.pipe`` one batch at a time, so memory and ``max_length`` stay
+        bounded; their entities come back merged, with offsets into ``text``,
+        on a ``ChunkedDoc``.
+        """
+        nlp = self.get_model(language)
+        spans = split_text(text, settings.NLP_CHUNK_MAX_CHARS, settings.NLP_CHUNK_OVERLAP_CHARS)
+        if len(spans) == 1:
+            return nlp(text)
+        
+        docs = nlp.pipe(
+            (text[start:end] for start, end in spans),
+            batch_size=settings.NLP_CHUNK_BATCH_SIZE,
+            n_process=settings.NLP_CHUNK_N_PROCESS
+        )
+        return ChunkedDoc(text, merge_entities(
+            [MergedEntity(ent.start_char + start, ent.end_char + start, ent.label_, ent.text) for ent in doc.ents]
+            for (start, _), doc in zip(spans, docs)
+        ))
     
-    def classify_risk(self, symptoms: List[str], diagnoses: List[str], text: str) -> Tuple[str, Dict[str, float]]:
-        
-        critical_keywords = {
-            "en": ["cardiac arrest", "stroke", "seizure", "unconscious", "respiratory failure", 
-                   "severe pain", "chest pain", "difficulty breathing", "anaphylaxis"],
-            "pt": ["parada cardíaca", "avc", "convulsão", "inconsciente", "insuficiência respiratória",
-                   "dor severa", "dor no peito", "dificuldade para respirar", "anafilaxia"]
-        }
-        
-        high_keywords = {
-            "en": ["high fever", "severe", "intense", "acute", "emergency", "urgent"],
-            "pt": ["febre alta", "severa", "intensa", "aguda", "emergência", "urgente"]
-        }
-        
-        moderate_keywords = {
-            "en": ["moderate", "persistent", "recurrent"],
-            "pt": ["moderada", "persistente", "recorrente"]
-        }
-        
-        text_lower = text.lower()
-        language = self.detect_language(text)
+    def extract_entities(self, doc, language: str, timings: Optional[Dict[str, float]] = None,
+                         spans: Optional[EntitySpans] = None) -> Dict[str, List[str]]:
+        """Extract symptoms, medications and diagnoses from a single pattern scan,
+        a gazetteer scan or both, per ``NLP_EXTRACTION_BACKEND``. Every extracted
+        value is also added to ``spans`` with its offsets."""
+        timings = timings if timings is not None else {}
+        spans = spans if spans is not None else EntitySpans()
+        text = doc.text
+        found = {entity_type: [] for entity_type in ENTITY_LABELS}
+        
+        with stage_timer(timings, "extract_patterns"):
+            matches = self.patterns.scan(text, language) if self.use_patterns else ()
+            for entity_type, start, end in matches:
+                start, end = _strip_span(text, start, end)
+                if entity_type == "symptoms":
+                    for piece_start, piece_end in _split_symptoms(text, start, end):
+                        if piece_end - piece_start > 2:
+                            found["symptoms"].append(text[piece_start:piece_end])
+                            spans.add(piece_start, piece_end, SPAN_LABELS["symptoms"])
+                elif entity_type == "medications":
+                    if end - start > 2:
+                        found["medications"].append(text[start:end])
+                        spans.add(start, end, SPAN_LABELS["medications"])
+                else:
+                    found[entity_type].append(text[start:end])
+                    if end > start:
+                        spans.add(start, end, SPAN_LABELS[entity_type])
+        
+        if self.use_gazetteer:
+            with stage_timer(timings, "extract_gazetteer"):
+                for entity_type, start, end in self.gazetteer.scan(text, language):
+                    if entity_type in found and end - start > 2:
+                        found[entity_type].append(text[start:end])
+                        spans.add(start, end, SPAN_LABELS[entity_type])
+        
+        with stage_timer(timings, "extract_model_entities"):
+            for ent in doc.ents:
+                for entity_type, labels in ENTITY_LABELS.items():
+                    if ent.label_ in labels:
+                        found[entity_type].append(ent.text)
+                        if entity_type != "symptoms" or len(ent.text) > 2:
+                            spans.add(ent.start_char, ent.end_char, SPAN_LABELS[entity_type])
+        
+        symptoms = list(set([s.lower() for s in found["symptoms"] if len(s) > 2]))
+        medications = list(set(found["medications"]))
+        diagnoses = list(set(found["diagnoses"]))
         
-        keywords_dict = {
-            "critical": critical_keywords.get(language, critical_keywords["en"]),
-            "high": high_keywords.get(language, high_keywords["en"]),
-            "moderate": moderate_keywords.get(language, moderate_keywords["en"])
+        return {
+            "symptoms": symptoms[:ENTITY_LIMITS["symptoms"]],
+            "medications": medications[:ENTITY_LIMITS["medications"]],
+            "diagnoses": diagnoses[:ENTITY_LIMITS["diagnoses"]]
         }
+    
+    def classify_risk(self, symptoms: List[str], diagnoses: List[str], text: str,
+                      language: Optional[str] = None) -> Tuple[str, Dict[str, float]]:
+        language = language or self.detect_language(text)
         
         scores = {
             "critical": 0.0,
@@ -166,17 +243,9 @@ class NLPProcessor:
             "low": 0.0
         }
         
-        for keyword in keywords_dict["critical"]:
-            if keyword.lower() in text_lower:
-                scores["critical"] += 0.3
-        
-        for keyword in keywords_dict["high"]:
-            if keyword.lower() in text_lower:
-                scores["high"] += 0.2
-        
-        for keyword in keywords_dict["moderate"]:
-            if keyword.lower() in text_lower:
-                scores["moderate"] += 0.15
+        matched_keywords = {(tier, keyword) for _, _, tier, keyword in self.keywords.find(text, language)}
+        for tier, _ in matched_keywords:
+            scores[tier] += RISK_WEIGHTS[tier]
         
         symptom_count = len(symptoms)
         diagnosis_count = len(diagnoses)
@@ -198,33 +267,141 @@ class NLPProcessor:
         
         return classification, scores
     
-    def process(self, text: str) -> Dict:
-        """Process medical note text and extract entities"""
-        start_time = time.time()
-        
-        language = self.detect_language(text)
-        nlp_model = self.nlp_pt if language == "pt" else self.nlp_en
-        
-        doc = nlp_model(text)
-        
-        symptoms = self.extract_symptoms(doc, language)
-        medications = self.extract_medications(doc, language)
-        diagnoses = self.extract_diagnoses(doc, language)
-        
-        risk_classification, confidence_scores = self.classify_risk(symptoms, diagnoses, text)
+    def _analyze(self, doc, text: str, guess: LanguageGuess, start_time: float, timings: Dict[str, float]) -> Dict:
+        spans = EntitySpans(list(SPAN_LABELS.values()))
+        entities = self.extract_entities(doc, guess.language, timings, spans)
+        return self._result(entities, spans, text, guess, start_time, timings)
+    
+    def _result(self, entities: Dict[str, List[str]], spans: EntitySpans, text: str, guess: LanguageGuess,
+                start_time: float, timings: Dict[str, float]) -> Dict:
+        language = guess.language
+        with stage_timer(timings, "classify_risk"):
+            risk_classification, confidence_scores = self.classify_risk(
+                entities["symptoms"], entities["diagnoses"], text, language
+            )
         
-        processing_time = (time.time() - start_time) * 1000
+        processing_time = (time.perf_counter() - start_time) * 1000
         
         return {
-            "entities": {
-                "symptoms": symptoms,
-                "medications": medications,
-                "diagnoses": diagnoses
-            },
+            "entities": entities,
+            "entity_spans": spans.sorted().to_compact(),
             "risk_classification": risk_classification,
             "confidence_score": confidence_scores,
             "processing_time_ms": round(processing_time, 2),
-            "language_detected": language
+            "language_detected": language,
+            "language_confidence": guess.confidence,
+            "timings_ms": timings
         }
+    
+    def process(self, text: str) -> Dict:
+        """Process medical note text and extract entities. ``timings_ms`` holds
+        the milliseconds spent in each stage."""
+        start_time = time.perf_counter()
+        timings: Dict[str, float] = {}
+        
+        with stage_timer(timings, "language_detection"):
+            guess = self.identify_language(text)
+        with stage_timer(timings, "spacy_parse"):
+            doc = self.parse(text, guess.language)
+        
+        return self._analyze(doc, text, guess, start_time, timings)
+    
+    @staticmethod
+    def segment_key(segment: str, language: str) -> str:
+        return hashlib.sha256(f"{language}:{segment}".encode()).hexdigest()[:32]
+    
+    def process_segments(self, text: str, cached: Dict[str, Dict]) -> Tuple[Dict, Dict[str, Dict]]:
+        """Process ``text`` segment by segment (paragraphs, see
+        ``split_segments``), reusing the results in ``cached`` (keyed by
+        ``segment_key``) of segments seen before.
+        
+        Only new or changed segments are parsed. Their entities and spans are
+        merged with the reused ones, and risk is classified on the merged
+        entities and the whole text. Pattern and gazetteer entities are those
+        ``process`` finds in the whole text; the statistical model sees less
+        context around a segment edge, so its entities can differ there.
+        Returns the result, shaped like ``process`` plus ``segments`` counts,
+        and the per-segment results of ``text`` to keep for its next version.
+        """
+        start_time = time.perf_counter()
+        timings: Dict[str, float] = {}
+        
+        with stage_timer(timings, "language_detection"):
+            guess = self.identify_language(text)
+        language = guess.language
+        bounds = split_segments(text)
+        keys = [self.segment_key(text[start:end], language) for start, end in bounds]
+        segments = {key: cached[key] for key in keys if key in cached}
+        reused = sum(1 for key in keys if key in segments)
+        missing = {key: text[start:end] for key, (start, end) in zip(keys, bounds) if key not in segments}
+        
+        with stage_timer(timings, "spacy_parse"):
+            short = [key for key, segment in missing.items() if len(segment) <= settings.NLP_CHUNK_MAX_CHARS]
+            docs = dict(zip(short, self.get_model(language).pipe(
+                (missing[key] for key in short), batch_size=settings.NLP_BATCH_SIZE
+            )))
+            for key in missing.keys() - docs.keys():
+                docs[key] = self.parse(missing[key], language)
+        for key, doc in docs.items():
+            segment_spans = EntitySpans(list(SPAN_LABELS.values()))
+            entities = self.extract_entities(doc, language, timings, segment_spans)
+            segments[key] = {"entities": entities, "entity_spans": segment_spans.sorted().to_compact()}
+        
+        spans = EntitySpans(list(SPAN_LABELS.values()))
+        found = {entity_type: {} for entity_type in ENTITY_LIMITS}
+        for (offset, _), key in zip(bounds, keys):
+            for start, end, label in EntitySpans.from_compact(segments[key]["entity_spans"]):
+                spans.add(offset + start, offset + end, label)
+            for entity_type, values in segments[key]["entities"].items():
+                found[entity_type].update(dict.fromkeys(values))
+        entities = {entity_type: list(values)[:ENTITY_LIMITS[entity_type]] for entity_type, values in found.items()}
+        
+        result = self._result(entities, spans, text, guess, start_time, timings)
+        result["segments"] = {"total": len(keys), "reused": reused}
+        return result, {key: segments[key] for key in keys}
+    
+    def process_batch(self, texts: List[str], batch_size: int = 64, n_process: int = 1) -> List[Dict]:
+        """Process many notes at once, grouping them by language and streaming
+        each group through ``nlp.pipe``. Results keep the order of ``texts``;
+        ``processing_time_ms`` and the ``spacy_parse`` timing are amortised per
+        note of its group. Notes that need chunking are parsed on their own."""
+        groups = defaultdict(list)
+        guesses: List[LanguageGuess] = []
+        timings: List[Dict[str, float]] = [{} for _ in texts]
+        for index, text in enumerate(texts):
+            with stage_timer(timings[index], "language_detection"):
+                guesses.append(self.identify_language(text))
+            groups[guesses[index].language].append(index)
+        
+        results: List[Dict] = [None] * len(texts)
+        for language, indexes in groups.items():
+            for index in [i for i in indexes if len(texts[i]) > settings.NLP_CHUNK_MAX_CHARS]:
+                start_time = time.perf_counter()
+                with stage_timer(timings[index], "spacy_parse"):
+                    doc = self.parse(texts[index], language)
+                results[index] = self._analyze(doc, texts[index], guesses[index], start_time, timings[index])
+            indexes = [i for i in indexes if results[i] is None]
+            if not indexes:
+                continue
+            
+            start_time = time.perf_counter()
+            docs = self.get_model(language).pipe(
+                (texts[i] for i in indexes),
+                batch_size=batch_size,
+                n_process=n_process
+            )
+            analysis_ms = 0.0
+            for index, doc in zip(indexes, docs):
+                analysis_start = time.perf_counter()
+                results[index] = self._analyze(doc, texts[index], guesses[index], analysis_start, timings[index])
+                analysis_ms += (time.perf_counter() - analysis_start) * 1000
+            
+            group_ms = (time.perf_counter() - start_time) * 1000
+            parse_ms = (group_ms - analysis_ms) / len(indexes)
+            for index in indexes:
+                results[index]["processing_time_ms"] = round(group_ms / len(indexes), 2)
+                timings[index]["spacy_parse"] = parse_ms
+        
+        return results
 
 nlp_processor = NLPProcessor()
\ No newline at end of file
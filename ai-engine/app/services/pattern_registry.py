@@ -0,0 +1,102 @@
+import re
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+ENTITY_PATTERNS = {
+    "symptoms": {
+        "en": [
+            r"presents?\s+with\s+([^.,]+)",
+            r"symptoms?\s+include[:\s]+([^.,]+)",
+            r"complains?\s+of\s+([^.,]+)",
+            r"reports?\s+([^.,]+)",
+        ],
+        "pt": [
+            r"apresenta\s+([^.,]+)",
+            r"sintomas?\s+incluem[:\s]+([^.,]+)",
+            r"queixa[-\s]?se\s+de\s+([^.,]+)",
+            r"relata\s+([^.,]+)",
+        ]
+    },
+    "medications": {
+        "en": [
+            r"prescribed?\s+([A-Z][a-z]+(?:\s+\d+\s*(?:mg|g|ml|tablets?|capsules?))?)",
+            r"medication[:\s]+([^.,]+)",
+            r"taking\s+([A-Z][a-z]+)",
+            r"([A-Z][a-z]+\s+\d+\s*(?:mg|g|ml))",
+        ],
+        "pt": [
+            r"prescrito\s+([A-ZÁÀÂÃÉÊÍÓÔÕÚÇ][a-záàâãéêíóôõúç]+(?:\s+\d+\s*(?:mg|g|ml|comprimidos?|cápsulas?))?)",
+            r"medica[çc][ãa]o[:\s]+([^.,]+)",
+            r"tomando\s+([A-ZÁÀÂÃÉÊÍÓÔÕÚÇ][a-záàâãéêíóôõúç]+)",
+            r"([A-ZÁÀÂÃÉÊÍÓÔÕÚÇ][a-záàâãéêíóôõúç]+\s+\d+\s*(?:mg|g|ml))",
+        ]
+    },
+    "diagnoses": {
+        "en": [
+            r"diagnosis[:\s]+([^.,]+)",
+            r"diagnosed?\s+with\s+([^.,]+)",
+            r"dx[:\s]+([^.,]+)",
+        ],
+        "pt": [
+            r"diagn[óo]stico[:\s]+([^.,]+)",
+            r"diagnosticado\s+com\s+([^.,]+)",
+            r"diagnosticada\s+com\s+([^.,]+)",
+        ]
+    }
+}
+
+# Medication patterns rely on capitalisation, the others are matched ignoring case.
+CASE_INSENSITIVE_TYPES = {"symptoms", "diagnoses"}
+
+
+class PatternRegistry:
+    """Per-language entity patterns, compiled once.
+
+    ``scan`` runs every pattern over the text with its own ``finditer``, in
+    ``ENTITY_PATTERNS`` order. Matches of different patterns may overlap (a
+    clause captured as a symptom can still hold a medication, ``taking
+    Ibuprofen 400 mg`` yields both ``Ibuprofen`` and ``Ibuprofen 400 mg``),
+    exactly as the former per-pattern loops of ``NLPProcessor``.
+
+    The case-insensitive patterns run without ``re.IGNORECASE`` over the
+    text lowercased once: ``re`` only uses its fast literal-prefix search
+    on case-sensitive patterns. Combining all patterns into one alternation
+    scanned in a single pass was measured slower than these separate passes
+    (see ``benchmarks/bench_pattern_engine.py``).
+    """
+
+    def __init__(self, patterns: Dict[str, Dict[str, List[str]]] = ENTITY_PATTERNS, default_language: str = "en"):
+        self.default_language = default_language
+        languages = {language for by_language in patterns.values() for language in by_language}
+        self._compiled = {language: self._compile(patterns, language) for language in languages}
+
+    def _compile(self, patterns: Dict[str, Dict[str, List[str]]],
+                 language: str) -> List[Tuple[str, re.Pattern, Optional[re.Pattern]]]:
+        """``(entity_type, pattern, ignorecase_pattern)``; ``ignorecase_pattern`` is set
+        for the case-insensitive types, whose ``pattern`` expects lowercased text."""
+        compiled = []
+        for entity_type, by_language in patterns.items():
+            for pattern in by_language.get(language, by_language[self.default_language]):
+                if entity_type in CASE_INSENSITIVE_TYPES:
+                    if pattern != pattern.lower():
+                        raise ValueError(f"Case-insensitive pattern must be lowercase: {pattern}")
+                    compiled.append((entity_type, re.compile(pattern), re.compile(pattern, re.IGNORECASE)))
+                else:
+                    compiled.append((entity_type, re.compile(pattern), None))
+        return compiled
+
+    def scan(self, text: str, language: str) -> Iterator[Tuple[str, int, int]]:
+        """Yield ``(entity_type, start, end)`` for the first group of every match of every pattern."""
+        lowered = text.lower()
+        # Lowercasing changed the length (e.g. "İ"): offsets would not match
+        # the text, so match it as-is with the IGNORECASE patterns instead.
+        same_offsets = len(lowered) == len(text)
+        for entity_type, regex, ignorecase in self._compiled.get(language, self._compiled[self.default_language]):
+            if ignorecase is None:
+                matches = regex.finditer(text)
+            elif same_offsets:
+                matches = regex.finditer(lowered)
+            else:
+                matches = ignorecase.finditer(text)
+            for match in matches:
+                yield entity_type, match.start(1), match.end(1)
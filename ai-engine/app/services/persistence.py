@@ -0,0 +1,232 @@
+import logging
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+from sqlalchemy.exc import DataError, IntegrityError
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.database import SessionLocal
+from app.models.entity_term import EntityTerm
+from app.models.medical_note import MedicalNoteProcessing
+from app.services.search import entity_term_rows
+from app.services.storage import insert_blobs, storage_rows
+from app.services.stats import increment_stats, record_counts
+
+logger = logging.getLogger(__name__)
+
+# Records lost to failed synchronous inserts since start.
+failed_records = 0
+
+
+def build_record(text: str, nlp_result: Dict, note_hash: str) -> Dict:
+    return {
+        "id": str(uuid.uuid4()),
+        "note_hash": note_hash,
+        "entities": nlp_result["entities"],
+        "risk_classification": nlp_result["risk_classification"],
+        "confidence_score": nlp_result["confidence_score"],
+        "raw_text": text,
+        "language_detected": nlp_result.get("language_detected"),
+        "processed_at": datetime.utcnow(),
+        "processing_time_ms": str(nlp_result["processing_time_ms"])
+    }
+
+
+def insert_records(session: Session, records: List[Dict], storage: Optional[str] = None) -> None:
+    """Bulk insert ``MedicalNoteProcessing`` rows, with their text stored per
+    ``storage`` (default ``RAW_TEXT_STORAGE``), and their entity terms, add
+    them to the stats buckets and commit; raises on failure."""
+    rows, blobs = storage_rows(records, storage or settings.RAW_TEXT_STORAGE)
+    insert_blobs(session, blobs)
+    session.bulk_insert_mappings(MedicalNoteProcessing, rows)
+    session.bulk_insert_mappings(EntityTerm, entity_term_rows(records))
+    increment_stats(session, record_counts(records))
+    session.commit()
+
+
+def store_records(records: List[Dict], db: Optional[Session] = None) -> None:
+    """Bulk insert ``MedicalNoteProcessing`` rows in one commit. Opens its own
+    session when ``db`` is not given. Failures are logged with their
+    traceback and counted in ``failed_records``, not raised: the request
+    still gets its result, but the records are lost."""
+    global failed_records
+    if not records:
+        return
+    session = db or SessionLocal()
+    try:
+        insert_records(session, records)
+    except Exception:
+        failed_records += len(records)
+        logger.exception(f"Failed to store {len(records)} processing records; they are lost "
+                         f"({failed_records} since start). If a column is missing, run "
+                         f"'python -m app.cli upgrade-schema'.")
+        session.rollback()
+    finally:
+        if db is None:
+            session.close()
+
+
+class WriteBehindBuffer:
+    """Buffers rows off the request path and bulk inserts them from a background thread.
+
+    A flush happens every ``flush_interval`` seconds or as soon as
+    ``max_batch`` rows are pending. Once ``max_pending`` rows are waiting,
+    ``enqueue`` flushes in the caller's thread, and drops the rows that still
+    do not fit (logged and counted) rather than growing further.
+
+    A batch the database refuses for its content (integrity or data error)
+    is split in halves until the offending rows are alone, so one bad row
+    does not hold back the others. Rows that failed are retried, with the
+    flush interval doubling after each failed flush, and dropped with an
+    error log after ``max_attempts`` attempts. Pending rows are only durable
+    after a flush, so they are lost if the process dies.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session] = SessionLocal, max_batch: int = 500,
+                 flush_interval: float = 1.0, max_pending: int = 10000, max_attempts: int = 8):
+        self.session_factory = session_factory
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.max_attempts = max_attempts
+        self.flushed = 0
+        self.failed_flushes = 0
+        self.dropped = 0
+        self._pending: List[Dict] = []
+        self._attempts: Dict[str, int] = {}
+        self._consecutive_failures = 0
+        self._retry_at = 0.0
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = False
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background thread and drain every pending row."""
+        if self._thread is not None:
+            self._stopping = True
+            self._wakeup.set()
+            self._thread.join()
+            self._thread = None
+        while self._pending and self.flush():
+            pass
+
+    def enqueue(self, records: List[Dict]) -> None:
+        if self.pending + len(records) > self.max_pending and time.monotonic() >= self._retry_at:
+            self.flush()
+        with self._lock:
+            room = max(0, self.max_pending - len(self._pending))
+            self._pending.extend(records[:room])
+            pending = len(self._pending)
+        if len(records) > room:
+            self.dropped += len(records) - room
+            logger.error(f"Write-behind buffer full ({self.max_pending} rows pending): "
+                         f"dropped {len(records) - room} records")
+        if pending >= self.max_batch:
+            self._wakeup.set()
+
+    def flush(self) -> int:
+        """Insert everything pending now. Returns the number of rows written."""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, []
+            if not batch:
+                return 0
+            written, retry = self._insert(batch)
+            if retry:
+                with self._lock:
+                    self._pending[:0] = retry
+                self._consecutive_failures += 1
+                self._retry_at = time.monotonic() + self.flush_interval * 2 ** min(self._consecutive_failures, 6)
+            else:
+                self._consecutive_failures = 0
+                self._retry_at = 0.0
+            self.flushed += written
+            return written
+
+    def _insert(self, batch: List[Dict]) -> Tuple[int, List[Dict]]:
+        """Insert ``batch``; returns the number of rows written and the rows to retry."""
+        session = self.session_factory()
+        try:
+            insert_records(session, batch)
+            if self._attempts:
+                for record in batch:
+                    self._attempts.pop(record["id"], None)
+            return len(batch), []
+        except Exception as e:
+            session.rollback()
+            error = e
+        finally:
+            session.close()
+
+        if isinstance(error, (IntegrityError, DataError)) and len(batch) > 1:
+            middle = len(batch) // 2
+            first_written, first_retry = self._insert(batch[:middle])
+            second_written, second_retry = self._insert(batch[middle:])
+            return first_written + second_written, first_retry + second_retry
+
+        logger.error(f"Write-behind flush of {len(batch)} records failed: {error}")
+        self.failed_flushes += 1
+        retry = []
+        for record in batch:
+            attempts = self._attempts.pop(record["id"], 0) + 1
+            if attempts < self.max_attempts:
+                self._attempts[record["id"]] = attempts
+                retry.append(record)
+            else:
+                self.dropped += 1
+                logger.error(f"Dropped write-behind record {record['id']} (note {record['note_hash']}) "
+                             f"after {attempts} failed attempts")
+        return 0, retry
+
+    def _run(self) -> None:
+        while not self._stopping:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            if time.monotonic() >= self._retry_at:
+                self.flush()
+
+    def stats(self) -> Dict:
+        return {
+            "pending": self.pending,
+            "flushed": self.flushed,
+            "failed_flushes": self.failed_flushes,
+            "dropped": self.dropped
+        }
+
+
+write_behind = WriteBehindBuffer(
+    max_batch=settings.WRITE_BEHIND_MAX_BATCH,
+    flush_interval=settings.WRITE_BEHIND_FLUSH_INTERVAL_SECONDS,
+    max_pending=settings.WRITE_BEHIND_MAX_PENDING,
+    max_attempts=settings.WRITE_BEHIND_MAX_ATTEMPTS
+)
+
+
+def persistence_stats() -> Dict:
+    return {"mode": settings.PERSISTENCE_MODE, "failed_records": failed_records, **write_behind.stats()}
+
+
+def persist_records(records: List[Dict], db: Optional[Session] = None) -> None:
+    """Persist rows according to ``PERSISTENCE_MODE``: ``"sync"`` commits them
+    now, ``"write_behind"`` hands them to the background buffer."""
+    if not records:
+        return
+    if settings.PERSISTENCE_MODE == "write_behind":
+        write_behind.enqueue(records)
+    else:
+        store_records(records, db)
@@ -0,0 +1,149 @@
+import hashlib
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+from app.services.nlp_processor import nlp_processor
+from app.services.data_masking import data_masking_service
+from app.services.result_cache import result_cache
+from app.services.metrics import rounded_timings, stage_timer
+from app.services.entity_spans import EntitySpans
+from app.services.incremental import process_incremental
+from app.services.admission import check_deadline
+from app.config import settings
+
+
+def init_worker() -> None:
+    """Process pool initializer: load the preloaded languages once per worker,
+    the others are loaded lazily on first use."""
+    nlp_processor.preload()
+
+
+def de_identify(medical_note: str, skip_masking: bool = False) -> Dict:
+    if not skip_masking:
+        de_identified = data_masking_service.de_identify(medical_note)
+        de_identified["text_changed"] = de_identified["masked_text"] != medical_note
+        return de_identified
+    return {"masked_text": medical_note, "removed_entities": {}, "text_changed": False}
+
+
+def note_hash(medical_note: str, provided: Optional[str] = None) -> str:
+    return provided or hashlib.sha256(medical_note.encode()).hexdigest()[:16]
+
+
+def build_response_data(de_identified: Dict, nlp_result: Dict, note_hash: str, skip_masking: bool,
+                        debug: bool = False, response_format: str = "default") -> Dict:
+    """Response payload of one note. ``entity_spans`` offsets index the
+    analysed text: ``masked_text`` when masking changed the note (it is then
+    included), the submitted note otherwise. The ``compact`` format returns
+    the spans as columns (``start``, ``end`` and ``label`` ids into
+    ``labels``) instead of one object per span."""
+    spans = nlp_result["entity_spans"]
+    data = {
+        "entities": nlp_result["entities"],
+        "risk_classification": nlp_result["risk_classification"],
+        "confidence_score": nlp_result["confidence_score"],
+        "processing_time_ms": nlp_result["processing_time_ms"],
+        "language_detected": nlp_result["language_detected"],
+        "language_confidence": nlp_result.get("language_confidence"),
+        "note_hash": note_hash,
+        "masking_applied": not skip_masking,
+        "removed_entities": de_identified.get("removed_entities", {}),
+        "cache_hit": nlp_result.get("cache_hit", False)
+    }
+    if response_format == "compact":
+        data["entity_spans"] = spans
+    else:
+        data["entity_spans"] = EntitySpans.from_compact(spans).to_list(de_identified["masked_text"])
+    if de_identified.get("text_changed"):
+        data["masked_text"] = de_identified["masked_text"]
+    if nlp_result.get("segments"):
+        data["segments"] = nlp_result["segments"]
+    if debug:
+        data["timings_ms"] = rounded_timings(nlp_result.get("timings_ms", {}))
+    return data
+
+
+def _process(masked_text: str, note_id: Optional[str]) -> Dict:
+    if note_id and settings.INCREMENTAL_ENABLED:
+        return process_incremental(masked_text, note_id)
+    return nlp_processor.process(masked_text)
+
+
+def analyze_note(medical_note: str, skip_masking: bool = False, note_id: Optional[str] = None,
+                 deadline: Optional[float] = None) -> Tuple[Dict, Dict]:
+    """Mask and process one note. Returns ``(de_identified, nlp_result)``;
+    ``nlp_result["cache_hit"]`` tells whether it came from the result cache,
+    ``nlp_result["cache_lookup"]`` the ``ResultCache.lookup`` outcome to
+    count, and ``nlp_result["timings_ms"]`` holds the per-stage timings.
+    
+    With a ``note_id`` only the paragraphs changed since the previous version
+    of that note are parsed. Masking always covers the whole note: a name
+    found in one paragraph is masked in all of them.
+    
+    Past ``deadline`` (a ``time.monotonic()`` value) the note is dropped with
+    ``DeadlineExceeded`` instead of being parsed; a cached result is still
+    returned."""
+    check_deadline(deadline, "de_identify")
+    timings: Dict[str, float] = {}
+    with stage_timer(timings, "de_identify"):
+        de_identified = de_identify(medical_note, skip_masking)
+    masked_text = de_identified["masked_text"]
+    
+    with stage_timer(timings, "cache_lookup"):
+        cache_key = result_cache.key(masked_text, nlp_processor.version)
+        cached, lookup = result_cache.lookup(cache_key)
+    if cached is not None:
+        return de_identified, {**cached, "cache_hit": True, "cache_lookup": lookup, "timings_ms": timings}
+    
+    check_deadline(deadline, "spacy_parse")
+    nlp_result = _process(masked_text, note_id)
+    timings.update(nlp_result.pop("timings_ms"))
+    segments = nlp_result.pop("segments", None)
+    result_cache.set(cache_key, nlp_result)
+    return de_identified, {**nlp_result, "cache_hit": False, "cache_lookup": lookup, "timings_ms": timings,
+                           "segments": segments}
+
+
+def analyze_batch(notes: List[Tuple[str, bool]], batch_size: int, n_process: int,
+                  note_ids: Optional[List[Optional[str]]] = None) -> List[Tuple[Dict, Dict]]:
+    """Mask and process ``(medical_note, skip_masking)`` pairs through ``nlp.pipe``.
+    Notes found in the result cache are not sent to spaCy; notes with an id
+    in ``note_ids`` are processed incrementally, one by one."""
+    timings: List[Dict[str, float]] = [{} for _ in notes]
+    de_identified = []
+    for index, (medical_note, skip_masking) in enumerate(notes):
+        with stage_timer(timings[index], "de_identify"):
+            de_identified.append(de_identify(medical_note, skip_masking))
+    
+    nlp_results: List[Dict] = [None] * len(notes)
+    lookups: List[Optional[str]] = [None] * len(notes)
+    misses = defaultdict(list)
+    for index, item in enumerate(de_identified):
+        with stage_timer(timings[index], "cache_lookup"):
+            cache_key = result_cache.key(item["masked_text"], nlp_processor.version)
+            cached, lookups[index] = result_cache.lookup(cache_key)
+        if cached is not None:
+            nlp_results[index] = {**cached, "cache_hit": True, "cache_lookup": lookups[index], "timings_ms": timings[index]}
+        elif note_ids and note_ids[index] and settings.INCREMENTAL_ENABLED:
+            nlp_result = process_incremental(item["masked_text"], note_ids[index])
+            timings[index].update(nlp_result.pop("timings_ms"))
+            segments = nlp_result.pop("segments")
+            result_cache.set(cache_key, nlp_result)
+            nlp_results[index] = {**nlp_result, "cache_hit": False, "cache_lookup": lookups[index],
+                                  "timings_ms": timings[index], "segments": segments}
+        else:
+            misses[cache_key].append(index)
+    
+    if misses:
+        processed = nlp_processor.process_batch(
+            [de_identified[indexes[0]]["masked_text"] for indexes in misses.values()],
+            batch_size=batch_size,
+            n_process=n_process
+        )
+        for (cache_key, indexes), nlp_result in zip(misses.items(), processed):
+            nlp_timings = nlp_result.pop("timings_ms")
+            result_cache.set(cache_key, nlp_result)
+            for index in indexes:
+                nlp_results[index] = {**nlp_result, "cache_hit": False, "cache_lookup": lookups[index],
+                                      "timings_ms": {**timings[index], **nlp_timings}}
+    
+    return list(zip(de_identified, nlp_results))
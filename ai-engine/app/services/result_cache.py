@@ -0,0 +1,195 @@
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class LRUCache:
+    """Thread-safe in-process LRU with a per-entry TTL."""
+
+    def __init__(self, max_entries: int = 10000, ttl_seconds: float = 3600):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Dict) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class SQLiteCacheBackend:
+    """Shared cache tier in a SQLite file, meant for tests and single-host setups."""
+
+    def __init__(self, path: str, ttl_seconds: float = 3600):
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS result_cache "
+            "(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM result_cache WHERE key = ? AND expires_at >= ?",
+                (key, time.time())
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set(self, key: str, value: Dict) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO result_cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value), time.time() + self.ttl_seconds)
+            )
+            self._conn.commit()
+
+
+class RedisCacheBackend:
+    """Shared cache tier in Redis; requires the optional ``redis`` package."""
+
+    def __init__(self, url: str, ttl_seconds: float = 3600, prefix: str = "nlp-result:"):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("The redis package is required for a redis:// RESULT_CACHE_URL") from e
+        self.ttl_seconds = ttl_seconds
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(url)
+
+    def get(self, key: str) -> Optional[Dict]:
+        value = self._client.get(self.prefix + key)
+        return json.loads(value) if value else None
+
+    def set(self, key: str, value: Dict) -> None:
+        self._client.set(self.prefix + key, json.dumps(value), ex=int(self.ttl_seconds))
+
+
+def build_shared_backend(url: Optional[str], ttl_seconds: float):
+    if not url:
+        return None
+    if url.startswith(("redis://", "rediss://")):
+        return RedisCacheBackend(url, ttl_seconds)
+    if url.startswith("sqlite:///"):
+        return SQLiteCacheBackend(url[len("sqlite:///"):], ttl_seconds)
+    raise ValueError(f"Unsupported result cache URL: {url}")
+
+
+class ResultCache:
+    """Content-addressed cache of ``NLPProcessor.process`` results.
+
+    Entries are keyed on the sha256 of the masked text plus the processor
+    version, looked up in the local LRU first and then in the optional
+    shared tier (hits there are promoted to the LRU). With the process
+    executor backend every worker keeps its own LRU; configure a shared
+    tier to share results between them.
+
+    Lookups do not count themselves: they may run in an executor worker
+    process, so the server process counts their outcome with ``count``.
+    """
+
+    def __init__(self, max_entries: int = 10000, ttl_seconds: float = 3600, shared=None, enabled: bool = True):
+        self.enabled = enabled
+        self.local = LRUCache(max_entries, ttl_seconds)
+        self.shared = shared
+        self.hits = 0
+        self.misses = 0
+        self.shared_hits = 0
+
+    @staticmethod
+    def key(masked_text: str, version: str) -> str:
+        digest = hashlib.sha256(masked_text.encode()).hexdigest()
+        return f"{version}:{digest}"
+
+    def lookup(self, key: str) -> Tuple[Optional[Dict], Optional[str]]:
+        """The cached value of ``key`` and the outcome of the lookup: "local",
+        "shared" or "miss"; ``(None, None)`` while the cache is disabled."""
+        if not self.enabled:
+            return None, None
+        value = self.local.get(key)
+        if value is not None:
+            return value, "local"
+        if self.shared is not None:
+            try:
+                value = self.shared.get(key)
+            except Exception as e:
+                logger.warning(f"Shared result cache lookup failed: {e}")
+            if value is not None:
+                self.local.set(key, value)
+                return value, "shared"
+        return None, "miss"
+
+    def get(self, key: str) -> Optional[Dict]:
+        return self.lookup(key)[0]
+
+    def count(self, outcome: Optional[str]) -> None:
+        """Count one lookup outcome returned by ``lookup``; None is not counted."""
+        if outcome is None:
+            return
+        if outcome == "miss":
+            self.misses += 1
+            return
+        self.hits += 1
+        if outcome == "shared":
+            self.shared_hits += 1
+
+    def set(self, key: str, value: Dict) -> None:
+        if not self.enabled:
+            return
+        self.local.set(key, value)
+        if self.shared is not None:
+            try:
+                self.shared.set(key, value)
+            except Exception as e:
+                logger.warning(f"Shared result cache write failed: {e}")
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "hits": self.hits,
+            "misses": self.misses,
+            "shared_hits": self.shared_hits,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "local_entries": len(self.local)
+        }
+
+
+result_cache = ResultCache(
+    max_entries=settings.RESULT_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.RESULT_CACHE_TTL_SECONDS,
+    shared=build_shared_backend(settings.RESULT_CACHE_URL, settings.RESULT_CACHE_TTL_SECONDS),
+    enabled=settings.RESULT_CACHE_ENABLED
+)
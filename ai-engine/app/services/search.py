@@ -0,0 +1,121 @@
+import base64
+import logging
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import select, tuple_
+from sqlalchemy.orm import Session
+from app.models.entity_term import EntityTerm
+from app.models.medical_note import MedicalNoteProcessing
+
+logger = logging.getLogger(__name__)
+
+MAX_TERM_LENGTH = 255
+
+
+def normalize_term(term: str) -> str:
+    return " ".join(term.lower().split())[:MAX_TERM_LENGTH]
+
+
+def entity_term_rows(records: Iterable[Dict]) -> List[Dict]:
+    """``EntityTerm`` rows of ``MedicalNoteProcessing`` records, one per distinct term."""
+    rows = []
+    for record in records:
+        seen = set()
+        for entity_type, values in (record.get("entities") or {}).items():
+            for value in values:
+                key = (normalize_term(value), entity_type)
+                if key[0] and key not in seen:
+                    seen.add(key)
+                    rows.append({"term": key[0], "entity_type": entity_type, "note_id": record["id"]})
+    return rows
+
+
+def encode_cursor(processed_at: datetime, note_id: str) -> str:
+    return base64.urlsafe_b64encode(f"{processed_at.isoformat()}|{note_id}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """Raises ``ValueError`` for a malformed cursor."""
+    try:
+        decoded = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        processed_at, note_id = decoded.split("|", 1)
+        return datetime.fromisoformat(processed_at), note_id
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def search_notes(session: Session, risk_classifications: Optional[List[str]] = None,
+                 languages: Optional[List[str]] = None, processed_from: Optional[datetime] = None,
+                 processed_to: Optional[datetime] = None, entities: Optional[List[str]] = None,
+                 entity_type: Optional[str] = None, limit: int = 50, cursor: Optional[str] = None) -> Dict:
+    """Stored processing results matching every given filter, newest first.
+
+    ``entities`` terms must all be present (case-insensitive, exact term),
+    optionally only as ``entity_type``. Pages are keyset-paginated on
+    ``(processed_at, id)``: pass the returned ``next_cursor`` to get the
+    following page. Raises ``ValueError`` for a malformed cursor.
+    """
+    query = session.query(MedicalNoteProcessing)
+    if risk_classifications:
+        query = query.filter(MedicalNoteProcessing.risk_classification.in_(risk_classifications))
+    if languages:
+        query = query.filter(MedicalNoteProcessing.language_detected.in_(languages))
+    if processed_from is not None:
+        query = query.filter(MedicalNoteProcessing.processed_at >= processed_from)
+    if processed_to is not None:
+        query = query.filter(MedicalNoteProcessing.processed_at < processed_to)
+    for term in entities or []:
+        matches = select(EntityTerm.note_id).where(EntityTerm.term == normalize_term(term))
+        if entity_type is not None:
+            matches = matches.where(EntityTerm.entity_type == entity_type)
+        query = query.filter(MedicalNoteProcessing.id.in_(matches))
+    if cursor:
+        query = query.filter(
+            tuple_(MedicalNoteProcessing.processed_at, MedicalNoteProcessing.id) < tuple_(*decode_cursor(cursor))
+        )
+
+    rows = query.order_by(
+        MedicalNoteProcessing.processed_at.desc(), MedicalNoteProcessing.id.desc()
+    ).limit(limit + 1).all()
+    page = rows[:limit]
+    return {
+        "items": [_item(row) for row in page],
+        "count": len(page),
+        "next_cursor": encode_cursor(page[-1].processed_at, page[-1].id) if len(rows) > limit else None
+    }
+
+
+def _item(row: MedicalNoteProcessing) -> Dict:
+    return {
+        "id": row.id,
+        "note_hash": row.note_hash,
+        "risk_classification": row.risk_classification,
+        "confidence_score": row.confidence_score,
+        "entities": row.entities,
+        "language_detected": row.language_detected,
+        "processed_at": row.processed_at.isoformat() if row.processed_at else None,
+        "processing_time_ms": float(row.processing_time_ms) if row.processing_time_ms else None
+    }
+
+
+def reindex(session: Session, batch_size: int = 10000) -> int:
+    """Rebuild ``entity_terms`` from ``medical_note_processings``. Returns the number of terms written."""
+    session.query(EntityTerm).delete()
+    rows = session.query(MedicalNoteProcessing.id, MedicalNoteProcessing.entities).yield_per(batch_size)
+    total = 0
+    batch: List[Dict] = []
+    for note_id, entities in rows:
+        batch.append({"id": note_id, "entities": entities})
+        if len(batch) >= batch_size:
+            total += _insert_terms(session, batch)
+            batch = []
+    total += _insert_terms(session, batch)
+    session.commit()
+    return total
+
+
+def _insert_terms(session: Session, records: List[Dict]) -> int:
+    terms = entity_term_rows(records)
+    if terms:
+        session.bulk_insert_mappings(EntityTerm, terms)
+    return len(terms)
@@ -0,0 +1,28 @@
+import json
+from typing import Any
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def dumps(content: Any) -> bytes:
+    """Encode ``content`` (plain dicts, lists and scalars) as compact UTF-8 JSON,
+    with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response that encodes its content directly with ``dumps``.
+
+    Returned straight from an endpoint it skips FastAPI's ``response_model``
+    validation and ``jsonable_encoder`` pass, so the content must already be
+    JSON-ready (datetimes as ISO strings) and shaped like the declared model.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,128 @@
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy.orm import Session
+from app.models.medical_note import MedicalNoteProcessing
+from app.models.processing_stats import ProcessingStatsBucket
+
+RISK_LEVELS = ["low", "moderate", "high", "critical"]
+GRANULARITIES = ["hour", "day", "all"]
+ALL_TIME = datetime(1970, 1, 1)
+UNKNOWN_LANGUAGE = "unknown"
+
+
+def bucket_start(moment: datetime, granularity: str) -> datetime:
+    if granularity == "hour":
+        return moment.replace(minute=0, second=0, microsecond=0)
+    if granularity == "day":
+        return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    return ALL_TIME
+
+
+def count_buckets(rows: Iterable[Tuple[datetime, Optional[str], str]]) -> Counter:
+    """Count ``(processed_at, language, risk_classification)`` rows into every bucket they belong to."""
+    counts: Counter = Counter()
+    for processed_at, language, risk_classification in rows:
+        language = language or UNKNOWN_LANGUAGE
+        for granularity in GRANULARITIES:
+            counts[(granularity, bucket_start(processed_at, granularity), language, risk_classification)] += 1
+    return counts
+
+
+def increment_stats(session: Session, counts: Counter) -> None:
+    """Add ``counts`` to the stored buckets in the caller's transaction."""
+    if not counts:
+        return
+    rows = [
+        {"granularity": granularity, "bucket_start": start, "language": language,
+         "risk_classification": risk_classification, "count": count}
+        for (granularity, start, language, risk_classification), count in counts.items()
+    ]
+    dialect = session.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+        statement = insert(ProcessingStatsBucket).values(rows)
+        statement = statement.on_conflict_do_update(
+            index_elements=["granularity", "bucket_start", "language", "risk_classification"],
+            set_={"count": ProcessingStatsBucket.count + statement.excluded["count"]}
+        )
+        session.execute(statement)
+        return
+
+    for row in rows:
+        bucket = session.get(
+            ProcessingStatsBucket,
+            (row["granularity"], row["bucket_start"], row["language"], row["risk_classification"]),
+            with_for_update=True
+        )
+        if bucket is None:
+            session.add(ProcessingStatsBucket(**row))
+        else:
+            bucket.count += row["count"]
+
+
+def record_counts(records: List[Dict]) -> Counter:
+    return count_buckets(
+        (record["processed_at"], record.get("language_detected"), record["risk_classification"])
+        for record in records
+    )
+
+
+def rebuild_stats(session: Session, batch_size: int = 10000) -> int:
+    """Recompute every bucket from ``medical_note_processings``. Returns the number of notes counted."""
+    rows = session.query(
+        MedicalNoteProcessing.processed_at,
+        MedicalNoteProcessing.language_detected,
+        MedicalNoteProcessing.risk_classification
+    ).yield_per(batch_size)
+    counts = count_buckets(rows)
+    total = sum(count for key, count in counts.items() if key[0] == "all")
+
+    session.query(ProcessingStatsBucket).delete()
+    increment_stats(session, counts)
+    session.commit()
+    return total
+
+
+def get_stats(session: Session, granularity: Optional[str] = None,
+              since: Optional[datetime] = None, until: Optional[datetime] = None) -> Dict:
+    """Totals from the ``"all"`` buckets and, with ``granularity``, the
+    ``hour``/``day`` series between ``since`` and ``until``."""
+    totals = session.query(ProcessingStatsBucket).filter(
+        ProcessingStatsBucket.granularity == "all"
+    ).all()
+    statistics = _summarize(totals)
+    if granularity is None:
+        return statistics
+
+    query = session.query(ProcessingStatsBucket).filter(ProcessingStatsBucket.granularity == granularity)
+    if since is not None:
+        query = query.filter(ProcessingStatsBucket.bucket_start >= bucket_start(since, granularity))
+    if until is not None:
+        query = query.filter(ProcessingStatsBucket.bucket_start <= until)
+
+    series: Dict[datetime, List[ProcessingStatsBucket]] = {}
+    for bucket in query.order_by(ProcessingStatsBucket.bucket_start):
+        series.setdefault(bucket.bucket_start, []).append(bucket)
+    statistics["granularity"] = granularity
+    statistics["buckets"] = [
+        {"bucket_start": start.isoformat(), **_summarize(buckets)}
+        for start, buckets in series.items()
+    ]
+    return statistics
+
+
+def _summarize(buckets: List[ProcessingStatsBucket]) -> Dict:
+    by_risk = {risk_level: 0 for risk_level in RISK_LEVELS}
+    by_language: Dict[str, int] = {}
+    for bucket in buckets:
+        by_risk[bucket.risk_classification] = by_risk.get(bucket.risk_classification, 0) + bucket.count
+        by_language[bucket.language] = by_language.get(bucket.language, 0) + bucket.count
+    return {
+        "total_processed": sum(by_risk.values()),
+        "by_risk_classification": by_risk,
+        "by_language": by_language
+    }
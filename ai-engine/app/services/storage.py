@@ -0,0 +1,167 @@
+import hashlib
+import zlib
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import or_, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.models.medical_note import MedicalNoteProcessing
+from app.models.note_blob import NoteBlob
+
+RAW_TEXT_MODES = ("full", "none", "compressed", "blob")
+COMPRESSION_LEVEL = 6
+
+_TEXT_COLUMNS = {
+    "full": MedicalNoteProcessing.raw_text,
+    "compressed": MedicalNoteProcessing.raw_text_compressed,
+    "blob": MedicalNoteProcessing.raw_text_sha256,
+}
+
+
+def compress_text(text: str) -> bytes:
+    return zlib.compress(text.encode("utf-8"), COMPRESSION_LEVEL)
+
+
+def decompress_text(data: bytes) -> str:
+    return zlib.decompress(data).decode("utf-8")
+
+
+def text_digest(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def storage_rows(records: Iterable[Dict], mode: str) -> Tuple[List[Dict], List[Dict]]:
+    """Split ``build_record`` records into ``MedicalNoteProcessing`` rows
+    holding their ``raw_text`` as ``mode`` asks and the ``NoteBlob`` rows
+    they reference (one per distinct text)."""
+    if mode not in RAW_TEXT_MODES:
+        raise ValueError(f"Unknown raw text storage mode: {mode}")
+    rows: List[Dict] = []
+    blobs: Dict[str, Dict] = {}
+    for record in records:
+        row = {**record, "raw_text": None, "raw_text_compressed": None, "raw_text_sha256": None}
+        text = record.get("raw_text")
+        if text is not None and mode == "full":
+            row["raw_text"] = text
+        elif text is not None and mode == "compressed":
+            row["raw_text_compressed"] = compress_text(text)
+        elif text is not None and mode == "blob":
+            digest = row["raw_text_sha256"] = text_digest(text)
+            if digest not in blobs:
+                blobs[digest] = {"sha256": digest, "data": compress_text(text), "size": len(text),
+                                 "created_at": datetime.utcnow()}
+        rows.append(row)
+    return rows, list(blobs.values())
+
+
+def insert_blobs(session: Session, blobs: List[Dict]) -> None:
+    """Insert ``NoteBlob`` rows in the caller's transaction. A text already
+    stored only gets its ``created_at`` moved forward: the row lock this takes
+    orders the insert with a concurrent ``compact``, which then either sees
+    the new time and keeps the blob or deletes it first, and the blob is
+    inserted again."""
+    if not blobs:
+        return
+    dialect = session.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+        statement = insert(NoteBlob).values(blobs)
+        session.execute(statement.on_conflict_do_update(
+            index_elements=["sha256"], set_={"created_at": statement.excluded.created_at}
+        ))
+        return
+
+    digests = [blob["sha256"] for blob in blobs]
+    stored = {digest for (digest,) in session.query(NoteBlob.sha256).filter(NoteBlob.sha256.in_(digests))}
+    if stored:
+        session.query(NoteBlob).filter(NoteBlob.sha256.in_(stored)).update(
+            {"created_at": blobs[0]["created_at"]}, synchronize_session=False
+        )
+    session.bulk_insert_mappings(NoteBlob, [blob for blob in blobs if blob["sha256"] not in stored])
+
+
+def raw_text_of(session: Session, row: MedicalNoteProcessing) -> Optional[str]:
+    """The masked text of a stored processing, whichever way it was stored; None once dropped."""
+    if row.raw_text is not None:
+        return row.raw_text
+    if row.raw_text_compressed is not None:
+        return decompress_text(row.raw_text_compressed)
+    if row.raw_text_sha256 is not None:
+        blob = session.get(NoteBlob, row.raw_text_sha256)
+        return decompress_text(blob.data) if blob is not None else None
+    return None
+
+
+def compact(session: Session, mode: str, ttl_days: Optional[int] = None, batch_size: int = 1000,
+            now: Optional[datetime] = None) -> Dict[str, int]:
+    """Apply the storage policy to stored rows, ``batch_size`` rows per commit.
+
+    Drops the text of rows processed more than ``ttl_days`` ago, rewrites the
+    remaining texts stored another way than ``mode`` and deletes blobs no row
+    references anymore. Only blobs last written before the run started are
+    deleted, so a concurrent insert that stores or reuses a blob keeps it.
+    The database reclaims the freed space on its own schedule (autovacuum)
+    or on ``VACUUM``.
+    """
+    if mode not in RAW_TEXT_MODES:
+        raise ValueError(f"Unknown raw text storage mode: {mode}")
+    started = datetime.utcnow()
+    stored_elsewhere = [column.isnot(None) for name, column in _TEXT_COLUMNS.items() if name != mode]
+    result = {"expired": 0, "converted": 0, "blobs_deleted": 0, "blobs_kept": 0}
+
+    if ttl_days is not None:
+        cutoff = (now or started) - timedelta(days=ttl_days)
+        while True:
+            ids = [note_id for (note_id,) in session.query(MedicalNoteProcessing.id).filter(
+                MedicalNoteProcessing.processed_at < cutoff,
+                or_(*[column.isnot(None) for column in _TEXT_COLUMNS.values()])
+            ).limit(batch_size)]
+            if not ids:
+                break
+            session.query(MedicalNoteProcessing).filter(MedicalNoteProcessing.id.in_(ids)).update(
+                {"raw_text": None, "raw_text_compressed": None, "raw_text_sha256": None},
+                synchronize_session=False
+            )
+            session.commit()
+            result["expired"] += len(ids)
+
+    while True:
+        rows = session.query(MedicalNoteProcessing).filter(or_(*stored_elsewhere)).limit(batch_size).all()
+        if not rows:
+            break
+        updates, blobs = storage_rows(
+            [{"id": row.id, "raw_text": raw_text_of(session, row)} for row in rows], mode
+        )
+        insert_blobs(session, blobs)
+        session.bulk_update_mappings(MedicalNoteProcessing, updates)
+        session.commit()
+        session.expire_all()
+        result["converted"] += len(rows)
+
+    referenced = select(MedicalNoteProcessing.raw_text_sha256).where(
+        MedicalNoteProcessing.raw_text_sha256.isnot(None)
+    )
+    orphaned = [NoteBlob.created_at < started, NoteBlob.sha256.notin_(referenced)]
+    after = ""
+    while True:
+        digests = [digest for (digest,) in session.query(NoteBlob.sha256).filter(
+            NoteBlob.sha256 > after, *orphaned
+        ).order_by(NoteBlob.sha256).limit(batch_size)]
+        if not digests:
+            break
+        after = digests[-1]
+        try:
+            deleted = session.query(NoteBlob).filter(NoteBlob.sha256.in_(digests), *orphaned).delete(
+                synchronize_session=False
+            )
+            session.commit()
+        except IntegrityError:
+            # A row committed meanwhile references one of them (foreign key).
+            session.rollback()
+            deleted = 0
+        result["blobs_deleted"] += deleted
+        result["blobs_kept"] += len(digests) - deleted
+    return result
@@ -0,0 +1,105 @@
+"""Benchmark: single-pass DataMaskingService vs. the former per-pattern masking.
+
+Run from the ai-engine directory:
+
+    python -m benchmarks.bench_data_masking --sizes 10 50 200 --repeat 10
+"""
+import argparse
+import random
+import re
+import timeit
+from typing import Dict, List, Tuple
+
+from app.services.data_masking import DataMaskingService
+from benchmarks.bench_pattern_engine import SENTENCES
+
+
+PII_FRAGMENTS = [
+    "Patient John Smith presents with pain.",
+    "Paciente Maria Silva apresenta febre.",
+    "CPF 123.456.789-09.",
+    "SSN 123-45-6789.",
+    "Contact (11) 98765-4321 or (555) 123-4567.",
+    "Email john.doe@example.com.",
+    "Seen on 12/05/2023.",
+]
+
+
+class LegacyDataMaskingService:
+    """The implementation DataMaskingService replaced: one findall + sub per pattern."""
+
+    def __init__(self):
+        self.patterns = DataMaskingService().patterns
+
+    def mask_names(self, text: str) -> Tuple[str, List[str]]:
+        name_patterns = [
+            r"(?:Paciente|Patient|Sr\.|Sra\.|Dr\.|Dra\.)\s+([A-ZÁÀÂÃÉÊÍÓÔÕÚÇ][a-záàâãéêíóôõúç]+\s+[A-ZÁÀÂÃÉÊÍÓÔÕÚÇ][a-záàâãéêíóôõúç]+)",
+            r"([A-ZÁÀÂÃÉÊÍÓÔÕÚÇ][a-záàâãéêíóôõúç]+\s+[A-ZÁÀÂÃÉÊÍÓÔÕÚÇ][a-záàâãéêíóôõúç]+)\s+(?:presenta|apresenta|reports)",
+        ]
+        masked_names = []
+        masked_text = text
+        for pattern in name_patterns:
+            for match in re.finditer(pattern, masked_text, re.IGNORECASE):
+                name = match.group(1)
+                if name not in masked_names:
+                    masked_names.append(name)
+                masked_text = masked_text.replace(name, "[PATIENT_NAME]")
+        return masked_text, masked_names
+
+    def mask_pii(self, text: str) -> Tuple[str, Dict[str, List[str]]]:
+        masked_text = text
+        removed_pii = {"cpfs": [], "ssns": [], "emails": [], "phones": [], "dates": []}
+        for kind, key, token, flags in (
+            ("cpf_br", "cpfs", "[CPF]", 0),
+            ("ssn_us", "ssns", "[SSN]", 0),
+            ("email", "emails", "[EMAIL]", re.IGNORECASE),
+        ):
+            found = re.findall(self.patterns[kind], masked_text, flags)
+            if found:
+                removed_pii[key] = list(set(found))
+                masked_text = re.sub(self.patterns[kind], token, masked_text, flags=flags)
+        for kind in ("phone_br", "phone_us"):
+            found = re.findall(self.patterns[kind], masked_text)
+            if found:
+                removed_pii["phones"].extend(found)
+                masked_text = re.sub(self.patterns[kind], "[PHONE]", masked_text)
+        removed_pii["dates"] = re.findall(self.patterns["date"], masked_text)[:3]
+        return masked_text, removed_pii
+
+    def de_identify(self, text: str) -> Dict:
+        text_after_names, names_removed = self.mask_names(text)
+        final_text, pii_removed = self.mask_pii(text_after_names)
+        return {"masked_text": final_text, "removed_entities": {"names": names_removed, "pii": pii_removed}}
+
+
+def make_note_with_pii(size_kb: int, pii_ratio: float = 0.1, seed: int = 7) -> str:
+    rng = random.Random(seed)
+    sentences = SENTENCES["en"] + SENTENCES["pt"]
+    parts: List[str] = []
+    length = 0
+    while length < size_kb * 1024:
+        sentence = rng.choice(PII_FRAGMENTS) if rng.random() < pii_ratio else rng.choice(sentences)
+        parts.append(sentence)
+        length += len(sentence) + 1
+    return " ".join(parts)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 50, 200], help="note sizes in KB")
+    parser.add_argument("--pii-ratio", type=float, default=0.1, help="share of sentences carrying PII")
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    legacy, current = LegacyDataMaskingService(), DataMaskingService()
+    print(f"{'size':>7}{'legacy ms':>12}{'single-pass ms':>16}{'speedup':>9}  same text")
+    for size_kb in args.sizes:
+        text = make_note_with_pii(size_kb, args.pii_ratio)
+        legacy_s = min(timeit.repeat(lambda: legacy.de_identify(text), number=1, repeat=args.repeat))
+        current_s = min(timeit.repeat(lambda: current.de_identify(text), number=1, repeat=args.repeat))
+        same = legacy.de_identify(text)["masked_text"] == current.de_identify(text)["masked_text"]
+        print(f"{size_kb:>5}KB{legacy_s * 1000:>12.2f}{current_s * 1000:>16.2f}{legacy_s / current_s:>8.2f}x  {same}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Micro-benchmark: risk keyword scans by lexicon size.
+
+Run from the ai-engine directory:
+
+    python -m benchmarks.bench_keyword_index --size-kb 50 --lexicon-sizes 18 1000 3000 6000 10000
+
+Pads the English risk lexicon with random two-word terms and times, on one
+synthetic note, the former per-keyword substring checks, the compiled
+regex alternation and the Aho-Corasick automaton ``KeywordIndex`` picks
+between at ``AUTOMATON_MIN_KEYWORDS``, plus the time to build each.
+"""
+import argparse
+import random
+import string
+import time
+import timeit
+from typing import List, Tuple
+
+from app.services.keyword_index import AUTOMATON_MIN_KEYWORDS, RISK_KEYWORDS, _Automaton, _KeywordPattern
+from benchmarks.bench_pattern_engine import make_long_note
+
+
+def lexicon(size: int, seed: int = 42) -> List[Tuple[str, str]]:
+    rng = random.Random(seed)
+    entries = [(tier, keyword) for tier, by_language in RISK_KEYWORDS.items() for keyword in by_language["en"]]
+    while len(entries) < size:
+        words = ("".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 10))) for _ in range(2))
+        entries.append(("moderate", " ".join(words)))
+    return entries
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size-kb", type=int, default=50)
+    parser.add_argument("--lexicon-sizes", type=int, nargs="+", default=[18, 1000, 3000, 6000, 10000])
+    parser.add_argument("--repeat", type=int, default=7)
+    args = parser.parse_args()
+
+    text = make_long_note(args.size_kb, "en")
+    print(f"{'terms':>6}{'substring ms':>14}{'regex ms':>10}{'automaton ms':>14}"
+          f"{'regex build ms':>16}{'automaton build ms':>20}  same  (automaton from {AUTOMATON_MIN_KEYWORDS})")
+    for size in args.lexicon_sizes:
+        entries = lexicon(size)
+        keywords = [keyword for _, keyword in entries]
+        started = time.perf_counter()
+        pattern = _KeywordPattern(entries)
+        pattern_build = (time.perf_counter() - started) * 1000
+        started = time.perf_counter()
+        automaton = _Automaton(entries)
+        automaton_build = (time.perf_counter() - started) * 1000
+
+        def substring():
+            lowered = text.lower()
+            return [keyword for keyword in keywords if keyword in lowered]
+
+        timings = [
+            min(timeit.repeat(scan, number=1, repeat=args.repeat)) * 1000
+            for scan in (substring, lambda: pattern.find(text), lambda: automaton.find(text))
+        ]
+        same = pattern.find(text) == sorted(automaton.find(text))
+        print(f"{size:>6}{timings[0]:>14.2f}{timings[1]:>10.2f}{timings[2]:>14.2f}"
+              f"{pattern_build:>16.1f}{automaton_build:>20.1f}  {same}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""Micro-benchmark: PatternRegistry vs. the former per-pattern loops.
+
+Run from the ai-engine directory:
+
+    python -m benchmarks.bench_pattern_engine --sizes 10 25 50 --repeat 20
+
+Also times ``single_pass_scan``: one alternation of every pattern's trigger
+prefix searched once, each pattern then matched where a trigger was found.
+It finds the same entities but is slower than separate passes in ``re``.
+"""
+import argparse
+import random
+import re
+import timeit
+from typing import Dict, List
+
+from app.services.pattern_registry import ENTITY_PATTERNS, PatternRegistry
+
+
+SENTENCES = {
+    "en": [
+        "Patient presents with chest pain and shortness of breath, worse on exertion.",
+        "Symptoms include: nausea; dizziness and headache.",
+        "She complains of abdominal pain since yesterday.",
+        "Reports intermittent fever and night sweats.",
+        "Prescribed Amoxicillin 500 mg three times a day.",
+        "Currently taking Metformin and Lisinopril 10 mg daily.",
+        "Patient reports headache since taking Ibuprofen 400 mg daily.",
+        "Medication: Atorvastatin 20 mg at night.",
+        "Diagnosis: community acquired pneumonia.",
+        "Diagnosed with type 2 diabetes mellitus, poorly controlled.",
+        "Dx: essential hypertension.",
+        "Vital signs stable overnight and the patient ambulated in the hallway.",
+        "Follow-up with cardiology in two weeks was arranged before discharge.",
+    ],
+    "pt": [
+        "Paciente apresenta dor torácica e falta de ar, pior aos esforços.",
+        "Sintomas incluem: náusea; tontura e cefaleia.",
+        "Queixa-se de dor abdominal desde ontem.",
+        "Relata febre intermitente e sudorese noturna.",
+        "Prescrito Amoxicilina 500 mg de 8 em 8 horas.",
+        "Tomando Metformina e Losartana 50 mg ao dia.",
+        "Relata cefaleia desde que começou tomando Dipirona 500 mg.",
+        "Medicação: Sinvastatina 20 mg à noite.",
+        "Diagnóstico: pneumonia adquirida na comunidade.",
+        "Diagnosticado com diabetes tipo 2, mal controlado.",
+        "Diagnosticada com hipertensão arterial sistêmica.",
+        "Sinais vitais estáveis durante a noite e paciente deambulou no corredor.",
+        "Retorno com a cardiologia em duas semanas agendado antes da alta.",
+    ],
+}
+
+
+def make_long_note(size_kb: int, language: str, seed: int = 42) -> str:
+    rng = random.Random(seed)
+    sentences = SENTENCES[language]
+    parts: List[str] = []
+    length = 0
+    while length < size_kb * 1024:
+        sentence = rng.choice(sentences)
+        parts.append(sentence)
+        length += len(sentence) + 1
+    return " ".join(parts)
+
+
+def legacy_scan(text: str, language: str) -> Dict[str, List[str]]:
+    """The per-pattern loops NLPProcessor used before the registry."""
+    found = {"symptoms": [], "medications": [], "diagnoses": []}
+    lowered = text.lower()
+    for pattern in ENTITY_PATTERNS["symptoms"][language]:
+        for match in re.finditer(pattern, lowered, re.IGNORECASE):
+            found["symptoms"].append(match.group(1).strip())
+    for pattern in ENTITY_PATTERNS["medications"][language]:
+        for match in re.finditer(pattern, text):
+            found["medications"].append(match.group(1).strip())
+    for pattern in ENTITY_PATTERNS["diagnoses"][language]:
+        for match in re.finditer(pattern, text, re.IGNORECASE):
+            found["diagnoses"].append(match.group(1).strip())
+    return found
+
+
+def registry_scan(registry: PatternRegistry, text: str, language: str) -> Dict[str, List[str]]:
+    found = {"symptoms": [], "medications": [], "diagnoses": []}
+    for entity_type, start, end in registry.scan(text, language):
+        value = text[start:end].strip()
+        found[entity_type].append(value.lower() if entity_type == "symptoms" else value)
+    return found
+
+
+def single_pass_scan(text: str, language: str) -> Dict[str, List[str]]:
+    """One pass of the combined trigger alternation; every pattern is tried
+    with ``match`` where a trigger matched, resuming after its last match
+    so that it yields what its own ``finditer`` would."""
+    compiled, triggers = [], []
+    for entity_type, by_language in ENTITY_PATTERNS.items():
+        flags = re.IGNORECASE if entity_type != "medications" else 0
+        for pattern in by_language[language]:
+            compiled.append((entity_type, re.compile(pattern, flags)))
+            trigger = pattern.split("(", 1)[0] or pattern
+            triggers.append(f"(?i:{trigger})" if flags else f"(?:{trigger})")
+    combined = re.compile("|".join(triggers))
+    found = {"symptoms": [], "medications": [], "diagnoses": []}
+    resume = [0] * len(compiled)
+    hit = combined.search(text)
+    while hit:
+        position = hit.start()
+        for index, (entity_type, regex) in enumerate(compiled):
+            match = regex.match(text, position) if position >= resume[index] else None
+            if match:
+                value = match.group(1).strip()
+                found[entity_type].append(value.lower() if entity_type == "symptoms" else value)
+                resume[index] = max(match.end(), position + 1)
+        hit = combined.search(text, position + 1)
+    return found
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 25, 50], help="note sizes in KB")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    registry = PatternRegistry()
+    print(f"{'lang':<5}{'size':>7}{'legacy ms':>12}{'registry ms':>13}{'single pass ms':>16}{'speedup':>9}  same")
+    for language in ("en", "pt"):
+        for size_kb in args.sizes:
+            text = make_long_note(size_kb, language)
+            scans = (lambda: legacy_scan(text, language), lambda: registry_scan(registry, text, language),
+                     lambda: single_pass_scan(text, language))
+            legacy, compiled, single = (min(timeit.repeat(scan, number=1, repeat=args.repeat)) for scan in scans)
+            expected = {k: sorted(v) for k, v in legacy_scan(text, language).items()}
+            same = all({k: sorted(v) for k, v in scan().items()} == expected for scan in scans[1:])
+            print(f"{language:<5}{size_kb:>5}KB{legacy * 1000:>12.2f}{compiled * 1000:>13.2f}{single * 1000:>16.2f}"
+                  f"{legacy / compiled:>8.2f}x  {same}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Benchmark: FastJSONResponse vs. the former pydantic response_model path.
+
+Run from the ai-engine directory:
+
+    python -m benchmarks.bench_serialization --batch-sizes 1 10 100 --repeat 20
+"""
+import argparse
+import json
+import timeit
+from datetime import datetime
+from typing import Dict, List
+
+from pydantic import BaseModel, TypeAdapter
+
+from app.services.pipeline import analyze_batch, build_response_data, note_hash
+from app.services.serialization import FastJSONResponse, orjson
+from benchmarks.corpus import generate_corpus
+
+
+class LegacyBatchResponse(BaseModel):
+    """The untyped model responses used to be validated against."""
+    status: str
+    count: int
+    data: List[dict]
+    processed_at: datetime
+
+
+def legacy_render(content: Dict) -> bytes:
+    # What FastAPI did with a returned model: validate against response_model,
+    # dump it to JSON-compatible python, then JSONResponse.render.
+    adapter = TypeAdapter(LegacyBatchResponse)
+    dumped = adapter.dump_python(adapter.validate_python(content), mode="json")
+    return json.dumps(dumped, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def fast_render(content: Dict) -> bytes:
+    return FastJSONResponse(content).body
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--size-kb", type=float, default=2)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    notes = [note["medical_note"] for note in generate_corpus(max(args.batch_sizes), size_kb=args.size_kb)]
+    results = analyze_batch([(note, False) for note in notes], 64, 1)
+    data = [
+        build_response_data(de_identified, nlp_result, note_hash(note), False)
+        for note, (de_identified, nlp_result) in zip(notes, results)
+    ]
+
+    print(f"encoder: {'orjson' if orjson is not None else 'json (orjson not installed)'}")
+    print(f"{'notes':>6}{'legacy ms':>12}{'fast ms':>10}{'speedup':>9}{'KB':>9}")
+    for batch_size in args.batch_sizes:
+        content = {"status": "success", "count": batch_size, "data": data[:batch_size],
+                   "processed_at": datetime.utcnow().isoformat()}
+        legacy_s = min(timeit.repeat(lambda: legacy_render(content), number=1, repeat=args.repeat))
+        fast_s = min(timeit.repeat(lambda: fast_render(content), number=1, repeat=args.repeat))
+        size_kb = len(fast_render(content)) / 1024
+        print(f"{batch_size:>6}{legacy_s * 1000:>12.3f}{fast_s * 1000:>10.3f}{legacy_s / fast_s:>8.1f}x{size_kb:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
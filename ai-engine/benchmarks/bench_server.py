@@ -0,0 +1,165 @@
+"""Benchmark: cold start and memory of the server modes (Linux only).
+
+Run from the ai-engine directory:
+
+    python -m benchmarks.bench_server --workers 4
+
+Compares the current single uvicorn process, uvicorn with ``--workers`` (every
+worker loads the models itself) and ``app.server`` (gunicorn master loads
+them once before forking). For each mode it reports the time from launch
+until every worker finished its startup, and after a few warm-up requests
+the RSS, PSS (shared pages split between the processes sharing them) and USS
+(private pages) of the master and every worker. Total PSS is what the
+server actually costs in memory.
+"""
+import argparse
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+from typing import Dict, List
+
+MODES = ["single", "uvicorn-workers", "preload"]
+STARTUP_COMPLETE = "Application startup complete"
+NOTE = b'{"medical_note": "Patient reports chest pain and shortness of breath, taking aspirin 100mg daily."}'
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def command(mode: str, port: int, workers: int) -> List[str]:
+    if mode == "single":
+        return [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port)]
+    if mode == "uvicorn-workers":
+        return [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--workers", str(workers)]
+    return [sys.executable, "-m", "app.server"]
+
+
+def children(pid: int) -> List[int]:
+    pids = []
+    for task in os.listdir(f"/proc/{pid}/task"):
+        with open(f"/proc/{pid}/task/{task}/children") as f:
+            pids.extend(int(child) for child in f.read().split())
+    return pids
+
+
+def memory_mb(pid: int) -> Dict[str, float]:
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                fields[parts[0].rstrip(":")] = int(parts[1]) / 1024
+    return {
+        "rss_mb": round(fields["Rss"], 1),
+        "pss_mb": round(fields["Pss"], 1),
+        "uss_mb": round(fields["Private_Clean"] + fields["Private_Dirty"], 1)
+    }
+
+
+def wait_until_listening(port: int, timeout: float) -> None:
+    # uvicorn binds its socket only after the application startup.
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.05)
+
+
+def run_mode(mode: str, workers: int, requests: int, timeout: float) -> Dict:
+    port = free_port()
+    expected = 1 if mode == "single" else workers
+    env = {
+        **os.environ,
+        "NLP_PRELOAD_LANGUAGES": '["en", "pt"]',
+        "SERVER_HOST": "127.0.0.1",
+        "SERVER_PORT": str(port),
+        "SERVER_WORKERS": str(workers),
+        "PYTHONUNBUFFERED": "1"
+    }
+    started = threading.Event()
+    completed = []
+
+    start_time = time.perf_counter()
+    server = subprocess.Popen(command(mode, port, workers), env=env, stdout=subprocess.DEVNULL,
+                              stderr=subprocess.PIPE, text=True)
+
+    def read_log():
+        for line in server.stderr:
+            if STARTUP_COMPLETE in line:
+                completed.append(time.perf_counter() - start_time)
+                if len(completed) >= expected:
+                    started.set()
+
+    threading.Thread(target=read_log, daemon=True).start()
+    try:
+        if not started.wait(timeout):
+            raise RuntimeError(f"{mode}: {len(completed)}/{expected} workers started within {timeout}s")
+        cold_start = completed[-1]
+        wait_until_listening(port, timeout)
+
+        for _ in range(requests):
+            request = urllib.request.Request(
+                f"http://127.0.0.1:{port}/api/v1/process", data=NOTE,
+                headers={"Content-Type": "application/json", "Connection": "close"}
+            )
+            urllib.request.urlopen(request, timeout=30).read()
+
+        master = memory_mb(server.pid)
+        worker_memory = [memory_mb(pid) for pid in children(server.pid)] if mode != "single" else []
+        processes = [master] + worker_memory
+        return {
+            "mode": mode,
+            "workers": expected,
+            "cold_start_s": round(cold_start, 2),
+            "first_worker_ready_s": round(completed[0], 2),
+            "master": master,
+            "workers_memory": worker_memory,
+            "total_pss_mb": round(sum(p["pss_mb"] for p in processes), 1),
+            "total_rss_mb": round(sum(p["rss_mb"] for p in processes), 1)
+        }
+    finally:
+        server.send_signal(signal.SIGTERM)
+        try:
+            server.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            server.kill()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--modes", nargs="+", default=MODES, choices=MODES)
+    parser.add_argument("--requests", type=int, default=20, help="warm-up requests before measuring memory")
+    parser.add_argument("--timeout", type=float, default=300, help="seconds to wait for startup")
+    parser.add_argument("-o", "--output", help="write the results to this JSON file")
+    args = parser.parse_args()
+
+    results = [run_mode(mode, args.workers, args.requests, args.timeout) for mode in args.modes]
+    for result in results:
+        per_worker = result["workers_memory"] or [result["master"]]
+        print(
+            f"{result['mode']:>16}: cold start {result['cold_start_s']:6.2f}s  "
+            f"total PSS {result['total_pss_mb']:7.1f} MB  total RSS {result['total_rss_mb']:7.1f} MB  "
+            f"worker RSS {max(p['rss_mb'] for p in per_worker):6.1f} MB  "
+            f"worker USS {max(p['uss_mb'] for p in per_worker):6.1f} MB"
+        )
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
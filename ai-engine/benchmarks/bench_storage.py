@@ -0,0 +1,93 @@
+"""Benchmark: database size of the RAW_TEXT_STORAGE modes.
+
+Run from the ai-engine directory:
+
+    python -m benchmarks.bench_storage --count 2000 --size-kb 2 --duplicates 0.2
+
+Masks and processes a synthetic corpus once, then stores the resulting
+``MedicalNoteProcessing`` records in a fresh SQLite database per mode and
+reports the vacuumed file size, the bytes per note and the saving against
+``full``. ``--duplicates`` stores that share of the notes a second time, as
+resubmissions that miss the result cache (another worker, a restart) are;
+only ``blob`` deduplicates them.
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+from typing import Dict, List
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.services.persistence import build_record, insert_records
+from app.services.pipeline import analyze_batch, note_hash
+from app.services.storage import RAW_TEXT_MODES
+from benchmarks.corpus import add_corpus_arguments, corpus_from_args
+
+
+def build_records(notes: List[Dict], duplicates: float, seed: int) -> List[Dict]:
+    results = analyze_batch([(note["medical_note"], False) for note in notes], 64, 1)
+    records = [
+        build_record(de_identified["masked_text"], nlp_result, note_hash(note["medical_note"]))
+        for note, (de_identified, nlp_result) in zip(notes, results)
+    ]
+    rng = random.Random(seed)
+    resubmitted = rng.sample(records, int(len(records) * duplicates))
+    return records + [{**record, "id": f"{record['id']}-again"} for record in resubmitted]
+
+
+def measure(records: List[Dict], mode: str, directory: str, batch_size: int) -> Dict:
+    path = os.path.join(directory, f"{mode}.db")
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    start_time = time.perf_counter()
+    with sessionmaker(bind=engine)() as session:
+        for start in range(0, len(records), batch_size):
+            insert_records(session, records[start:start + batch_size], mode)
+    insert_s = time.perf_counter() - start_time
+    with engine.connect() as connection:
+        connection.execute(text("VACUUM"))
+    engine.dispose()
+    size = os.path.getsize(path)
+    return {
+        "mode": mode,
+        "db_bytes": size,
+        "bytes_per_note": round(size / len(records)),
+        "insert_s": round(insert_s, 3)
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_corpus_arguments(parser)
+    parser.add_argument("--duplicates", type=float, default=0.2, help="share of notes stored twice")
+    parser.add_argument("--batch-size", type=int, default=500, help="records per insert transaction")
+    parser.add_argument("-o", "--output", help="write the results to this JSON file")
+    args = parser.parse_args()
+
+    records = build_records(corpus_from_args(args), args.duplicates, args.seed)
+    text_bytes = sum(len(record["raw_text"].encode()) for record in records)
+    json_bytes = sum(len(json.dumps(record["entities"])) + len(json.dumps(record["confidence_score"]))
+                     for record in records)
+    print(f"{len(records)} records, {text_bytes / len(records):.0f} B of masked text and "
+          f"{json_bytes / len(records):.0f} B of entity/score JSON per note")
+
+    with tempfile.TemporaryDirectory() as directory:
+        results = [measure(records, mode, directory, args.batch_size) for mode in RAW_TEXT_MODES]
+    full = results[0]["db_bytes"]
+    for result in results:
+        result["saving"] = round(1 - result["db_bytes"] / full, 3)
+        print(f"{result['mode']:>10}: {result['db_bytes'] / 1024 / 1024:8.2f} MB  "
+              f"{result['bytes_per_note']:6d} B/note  saving {result['saving']:6.1%}  "
+              f"insert {result['insert_s']:.2f}s")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
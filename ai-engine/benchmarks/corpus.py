@@ -0,0 +1,164 @@
+"""Deterministic synthetic clinical notes for benchmarks.
+
+The same arguments always produce the same notes. Write a corpus as NDJSON
+``MedicalNoteRequest`` lines, e.g. for ``/api/v1/process/stream``:
+
+    python -m benchmarks.corpus --count 1000 --size-kb 4 -o corpus.ndjson
+"""
+import argparse
+import json
+import random
+import sys
+from typing import Dict, List, Sequence
+
+from app.services.keyword_index import RISK_KEYWORDS
+
+
+FIRST_NAMES = {
+    "en": ["John", "Mary", "Robert", "Linda", "James", "Susan", "David", "Karen"],
+    "pt": ["João", "Maria", "José", "Ana", "Carlos", "Fernanda", "Paulo", "Juliana"],
+}
+LAST_NAMES = {
+    "en": ["Smith", "Johnson", "Brown", "Taylor", "Miller", "Wilson", "Moore", "Clark"],
+    "pt": ["Silva", "Santos", "Oliveira", "Souza", "Pereira", "Costa", "Almeida", "Ribeiro"],
+}
+SYMPTOMS = {
+    "en": ["headache", "nausea", "dizziness", "fatigue", "cough", "fever", "abdominal pain",
+           "shortness of breath", "back pain", "insomnia", "palpitations", "joint pain"],
+    "pt": ["cefaleia", "náusea", "tontura", "fadiga", "tosse", "febre", "dor abdominal",
+           "falta de ar", "dor lombar", "insônia", "palpitações", "dor articular"],
+}
+MEDICATIONS = ["Amoxicillin", "Metformin", "Lisinopril", "Atorvastatin", "Omeprazole",
+               "Losartan", "Dipyrone", "Ibuprofen", "Paracetamol", "Sertraline"]
+DIAGNOSES = {
+    "en": ["essential hypertension", "type 2 diabetes mellitus", "community acquired pneumonia",
+           "migraine", "gastroesophageal reflux"],
+    "pt": ["hipertensão arterial", "diabetes tipo 2", "pneumonia adquirida na comunidade",
+           "enxaqueca", "refluxo gastroesofágico"],
+}
+FILLER = {
+    "en": ["Vital signs stable overnight and the patient ambulated in the hallway.",
+           "Follow-up with cardiology in two weeks was arranged before discharge.",
+           "Family history is noncontributory.",
+           "Labs were drawn this morning and are pending review."],
+    "pt": ["Sinais vitais estáveis durante a noite e paciente deambulou no corredor.",
+           "Retorno com a cardiologia em duas semanas agendado antes da alta.",
+           "História familiar sem particularidades.",
+           "Exames coletados pela manhã, aguardando resultado."],
+}
+TEMPLATES = {
+    "en": {
+        "name": "Patient {name} was seen today.",
+        "symptoms": "Patient presents with {items}.",
+        "medication": "Prescribed {medication} {dose} mg.",
+        "diagnosis": "Diagnosis: {diagnosis}.",
+        "keyword": "Note of {keyword} reported by the family.",
+        "and": " and ",
+    },
+    "pt": {
+        "name": "Paciente {name} atendido hoje.",
+        "symptoms": "Paciente apresenta {items}.",
+        "medication": "Prescrito {medication} {dose} mg.",
+        "diagnosis": "Diagnóstico: {diagnosis}.",
+        "keyword": "Família relata quadro de {keyword}.",
+        "and": " e ",
+    },
+}
+
+
+def _pii_sentence(rng: random.Random, language: str) -> str:
+    kind = rng.choice(["cpf", "ssn", "email", "phone", "date"])
+    if kind == "cpf":
+        return f"CPF {rng.randint(100, 999)}.{rng.randint(100, 999)}.{rng.randint(100, 999)}-{rng.randint(10, 99)}."
+    if kind == "ssn":
+        return f"SSN {rng.randint(100, 899)}-{rng.randint(10, 99)}-{rng.randint(1000, 9999)}."
+    if kind == "email":
+        user = rng.choice(FIRST_NAMES[language]).lower() + str(rng.randint(1, 999))
+        return f"Email {user}@example.com."
+    if kind == "phone":
+        if language == "pt":
+            return f"Telefone ({rng.randint(11, 99)}) 9{rng.randint(1000, 9999)}-{rng.randint(1000, 9999)}."
+        return f"Phone ({rng.randint(200, 999)}) {rng.randint(200, 999)}-{rng.randint(1000, 9999)}."
+    return f"Seen on {rng.randint(1, 28):02d}/{rng.randint(1, 12):02d}/{rng.randint(2015, 2024)}."
+
+
+def generate_note(rng: random.Random, language: str, size_chars: int, pii_density: float = 0.1,
+                  symptoms: int = 4, medications: int = 2, keyword_tiers: Sequence[str] = ()) -> str:
+    """Build one note of roughly ``size_chars`` characters.
+
+    The note opens with a named patient, ``symptoms`` symptoms, ``medications``
+    prescriptions, a diagnosis and one risk keyword of each tier in
+    ``keyword_tiers``; the rest is filler where each sentence carries PII with
+    probability ``pii_density``.
+    """
+    template = TEMPLATES[language]
+    name = f"{rng.choice(FIRST_NAMES[language])} {rng.choice(LAST_NAMES[language])}"
+    parts = [template["name"].format(name=name)]
+    if symptoms:
+        chosen = rng.sample(SYMPTOMS[language], min(symptoms, len(SYMPTOMS[language])))
+        parts.append(template["symptoms"].format(items=template["and"].join(chosen)))
+    for _ in range(medications):
+        parts.append(template["medication"].format(medication=rng.choice(MEDICATIONS), dose=rng.choice([5, 10, 20, 50, 500])))
+    parts.append(template["diagnosis"].format(diagnosis=rng.choice(DIAGNOSES[language])))
+    for tier in keyword_tiers:
+        parts.append(template["keyword"].format(keyword=rng.choice(RISK_KEYWORDS[tier][language])))
+
+    length = sum(len(part) + 1 for part in parts)
+    while length < size_chars:
+        sentence = _pii_sentence(rng, language) if rng.random() < pii_density else rng.choice(FILLER[language])
+        parts.append(sentence)
+        length += len(sentence) + 1
+    return " ".join(parts)
+
+
+def generate_corpus(count: int, size_kb: float = 2, languages: Sequence[str] = ("en", "pt"),
+                    pii_density: float = 0.1, symptoms: int = 4, medications: int = 2,
+                    keyword_tiers: Sequence[str] = ("moderate",), seed: int = 42) -> List[Dict]:
+    """Return ``count`` notes as ``{"language", "medical_note"}``, alternating languages."""
+    rng = random.Random(seed)
+    return [
+        {
+            "language": languages[index % len(languages)],
+            "medical_note": generate_note(
+                rng, languages[index % len(languages)], int(size_kb * 1024),
+                pii_density, symptoms, medications, keyword_tiers
+            )
+        }
+        for index in range(count)
+    ]
+
+
+def add_corpus_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--count", type=int, default=200, help="number of notes")
+    parser.add_argument("--size-kb", type=float, default=2, help="approximate note size in KB")
+    parser.add_argument("--languages", nargs="+", default=["en", "pt"], choices=sorted(TEMPLATES))
+    parser.add_argument("--pii-density", type=float, default=0.1, help="share of filler sentences carrying PII")
+    parser.add_argument("--symptoms", type=int, default=4, help="symptoms per note")
+    parser.add_argument("--medications", type=int, default=2, help="prescriptions per note")
+    parser.add_argument("--tiers", nargs="*", default=["moderate"], choices=sorted(RISK_KEYWORDS),
+                        help="risk keyword tiers included in every note")
+    parser.add_argument("--seed", type=int, default=42)
+
+
+def corpus_from_args(args: argparse.Namespace) -> List[Dict]:
+    return generate_corpus(args.count, args.size_kb, args.languages, args.pii_density,
+                           args.symptoms, args.medications, args.tiers, args.seed)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_corpus_arguments(parser)
+    parser.add_argument("-o", "--output", default="-", help="NDJSON file, '-' for stdout")
+    args = parser.parse_args()
+
+    target = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    try:
+        for note in corpus_from_args(args):
+            target.write(json.dumps({"medical_note": note["medical_note"]}, ensure_ascii=False) + "\n")
+    finally:
+        if target is not sys.stdout:
+            target.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""Throughput and latency benchmark of the masking, NLP and HTTP paths.
+
+Run from the ai-engine directory:
+
+    python -m benchmarks.run --count 200 --size-kb 2 -o results.json
+    python -m benchmarks.run --count 200 --size-kb 2 --baseline results.json
+
+Each target processes the same synthetic corpus (see ``benchmarks.corpus``)
+one note at a time and reports notes/sec, p50/p95/p99 latency and the peak
+RSS of the process once the target finished. The route target posts to
+``/api/v1/process`` through TestClient against a throwaway SQLite database
+with the result cache disabled, unless DATABASE_URL / RESULT_CACHE_ENABLED
+are set. With ``--baseline`` the run exits with status 1 when a target's
+throughput drops, or its p95 grows, by more than ``--tolerance``.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Callable, Dict, List
+
+from benchmarks.corpus import add_corpus_arguments, corpus_from_args
+
+TARGETS = ["masking", "nlp", "route"]
+
+
+def peak_rss_mb() -> float:
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    index = min(len(sorted_values) - 1, max(0, round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def measure(fn: Callable[[str], object], notes: List[str], warmup: int) -> Dict:
+    for note in notes[:warmup]:
+        fn(note)
+    latencies = []
+    start = time.perf_counter()
+    for note in notes:
+        call_start = time.perf_counter()
+        fn(note)
+        latencies.append((time.perf_counter() - call_start) * 1000)
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "notes": len(notes),
+        "notes_per_sec": round(len(notes) / elapsed, 2),
+        "p50_ms": round(percentile(latencies, 0.50), 3),
+        "p95_ms": round(percentile(latencies, 0.95), 3),
+        "p99_ms": round(percentile(latencies, 0.99), 3),
+        "peak_rss_mb": peak_rss_mb()
+    }
+
+
+def masking_target() -> Callable[[str], object]:
+    from app.services.data_masking import data_masking_service
+    return data_masking_service.de_identify
+
+
+def nlp_target() -> Callable[[str], object]:
+    from app.services.nlp_processor import nlp_processor
+    return nlp_processor.process
+
+
+def route_target(stack: List) -> Callable[[str], object]:
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    client = TestClient(app)
+    client.__enter__()
+    stack.append(client)
+
+    def post(note: str):
+        response = client.post("/api/v1/process", json={"medical_note": note})
+        if response.status_code != 200:
+            raise RuntimeError(f"/api/v1/process returned {response.status_code}: {response.text[:200]}")
+        return response
+    return post
+
+
+def compare(results: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    regressions = []
+    for target, current in results.items():
+        previous = baseline.get("results", {}).get(target)
+        if previous is None:
+            continue
+        if current["notes_per_sec"] < previous["notes_per_sec"] * (1 - tolerance):
+            regressions.append(f"{target}: {current['notes_per_sec']} notes/sec vs {previous['notes_per_sec']} baseline")
+        if current["p95_ms"] > previous["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{target}: p95 {current['p95_ms']} ms vs {previous['p95_ms']} ms baseline")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_corpus_arguments(parser)
+    parser.add_argument("--targets", nargs="+", default=TARGETS, choices=TARGETS)
+    parser.add_argument("--warmup", type=int, default=5, help="notes run before measuring each target")
+    parser.add_argument("-o", "--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="JSON results of an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="allowed relative slowdown")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="ai-engine-bench-")
+    os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(workdir, 'bench.db')}")
+    os.environ.setdefault("RESULT_CACHE_ENABLED", "false")
+
+    notes = [note["medical_note"] for note in corpus_from_args(args)]
+    stack: List = []
+    results = {}
+    try:
+        for target in args.targets:
+            fn = {"masking": masking_target, "nlp": nlp_target, "route": lambda: route_target(stack)}[target]()
+            results[target] = measure(fn, notes, args.warmup)
+    finally:
+        for client in stack:
+            client.__exit__(None, None, None)
+
+    import spacy
+    report = {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "spacy": spacy.__version__,
+            "corpus": {key: value for key, value in vars(args).items()
+                       if key in ("count", "size_kb", "languages", "pii_density", "symptoms",
+                                  "medications", "tiers", "seed")}
+        },
+        "results": results
+    }
+
+    print(f"{'target':<10}{'notes/sec':>12}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'peak RSS MB':>13}")
+    for target, result in results.items():
+        print(f"{target:<10}{result['notes_per_sec']:>12}{result['p50_ms']:>10}{result['p95_ms']:>10}"
+              f"{result['p99_ms']:>10}{result['peak_rss_mb']:>13}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
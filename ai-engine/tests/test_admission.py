@@ -0,0 +1,84 @@
+import asyncio
+import time
+import pytest
+from app.services.admission import AdmissionController, AdmissionRejected, DeadlineExceeded
+from app.services.executor import ExecutorSaturated
+from app.services.pipeline import analyze_note
+
+
+def test_rejects_once_the_limit_is_in_flight():
+    controller = AdmissionController(initial_limit=2, target_latency_ms=1500)
+    controller.acquire()
+    controller.acquire()
+    with pytest.raises(AdmissionRejected) as error:
+        controller.acquire()
+    assert error.value.retry_after == 2
+    assert controller.state()["rejected"] == 1
+
+    controller.release(0.01)
+    controller.acquire()
+    assert controller.in_flight == 2
+
+
+def test_limit_grows_on_fast_completions_and_backs_off_on_slow_ones():
+    controller = AdmissionController(initial_limit=4, min_limit=2, max_limit=6, target_latency_ms=100, backoff=0.5)
+    for _ in range(4):
+        controller.acquire()
+    for _ in range(4):
+        controller.release(0.01)
+    assert controller.limit == 6
+
+    for _ in range(3):
+        controller.acquire()
+    for _ in range(3):
+        controller.release(0.5)
+    assert controller.limit == 3
+
+    controller._last_decrease = 0.0
+    controller.acquire()
+    controller.release(0.5)
+    assert controller.limit == 2
+
+
+def test_note_past_its_deadline_is_dropped_before_parsing():
+    controller = AdmissionController()
+
+    async def scenario():
+        async with controller.admit():
+            analyze_note("Patient reports fever.", deadline=time.monotonic() - 1)
+
+    with pytest.raises(DeadlineExceeded):
+        asyncio.run(scenario())
+    assert controller.state()["dropped_past_deadline"] == 1
+    assert controller.in_flight == 0
+
+    _, nlp_result = analyze_note("Patient reports fever.", deadline=time.monotonic() + 60)
+    assert nlp_result["risk_classification"]
+
+
+
+def test_saturated_executor_backs_off_and_failures_never_grow_the_limit():
+    controller = AdmissionController(initial_limit=4, min_limit=2, max_limit=256, target_latency_ms=2000)
+
+    async def request(error):
+        async with controller.admit():
+            await asyncio.sleep(0)
+            if error is not None:
+                raise error
+
+    async def rounds(error, count):
+        for _ in range(count):
+            await asyncio.gather(*(request(error) for _ in range(int(controller.limit))),
+                                 return_exceptions=True)
+
+    asyncio.run(rounds(ExecutorSaturated("Processing queue is full"), 50))
+    assert controller.limit < 4
+    assert controller.state()["overloaded"] > 0
+
+    limit = controller.limit
+    asyncio.run(rounds(ValueError("boom"), 50))
+    assert controller.limit == limit
+    assert controller.in_flight == 0
+
+    asyncio.run(rounds(None, 5))
+    assert controller.limit > limit
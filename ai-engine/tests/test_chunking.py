@@ -0,0 +1,41 @@
+from app.services.chunking import MergedEntity, merge_entities, split_text
+
+
+def test_short_text_is_one_window():
+    assert split_text("Patient reports fever.", 100) == [(0, 22)]
+
+
+def test_windows_cover_text_and_prefer_paragraph_breaks():
+    paragraph = "Patient presents with fever. Reports cough and headache today."
+    text = "\n\n".join([paragraph] * 20)
+    spans = split_text(text, 200)
+
+    assert spans[0][0] == 0 and spans[-1][1] == len(text)
+    assert all(end - start <= 200 for start, end in spans)
+    assert all(prev_end == start for (_, prev_end), (start, _) in zip(spans, spans[1:]))
+    assert all(text[start:end].rstrip().endswith("today.") for start, end in spans[:-1])
+
+
+def test_overlapping_windows_start_at_word_boundaries():
+    text = " ".join(["Sentence number %d ends here." % i for i in range(100)])
+    spans = split_text(text, 300, overlap=50)
+
+    assert spans[-1][1] == len(text)
+    for (_, prev_end), (start, _) in zip(spans, spans[1:]):
+        assert prev_end - 50 <= start < prev_end
+        assert text[start - 1].isspace()
+
+
+def test_hard_cut_without_boundaries():
+    assert split_text("x" * 250, 100) == [(0, 100), (100, 200), (200, 250)]
+
+
+def test_merge_drops_duplicates_and_truncated_copies():
+    first = [MergedEntity(10, 20, "DISEASE", "chest pain"), MergedEntity(95, 100, "DRUG", "Aspir")]
+    second = [MergedEntity(95, 102, "DRUG", "Aspirin"), MergedEntity(10, 20, "DISEASE", "chest pain"),
+              MergedEntity(120, 130, "DISEASE", "arrhythmia")]
+    assert merge_entities([first, second]) == [
+        MergedEntity(10, 20, "DISEASE", "chest pain"),
+        MergedEntity(95, 102, "DRUG", "Aspirin"),
+        MergedEntity(120, 130, "DISEASE", "arrhythmia"),
+    ]
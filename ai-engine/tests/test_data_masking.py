@@ -0,0 +1,72 @@
+import pytest
+from app.services.data_masking import DataMaskingService
+
+# Expected outputs recorded from the previous per-pattern findall/sub implementation.
+LEGACY_CASES = [
+    (
+        "Patient John Smith presents with chest pain. CPF 123.456.789-09, phone (11) 98765-4321.",
+        "Patient [PATIENT_NAME] presents with chest pain. CPF [CPF], phone (11) [SSN].",
+        ["John Smith"],
+        {"cpfs": ["123.456.789-09"], "ssns": ["98765-4321"], "emails": [], "phones": [], "dates": []},
+    ),
+    (
+        "Paciente Maria Silva apresenta febre. Contato: maria.silva@example.com, tel 11 3456-7890 em 12/05/2023.",
+        "Paciente [PATIENT_NAME] apresenta febre. Contato: [EMAIL], tel [PHONE] em 12/05/2023.",
+        ["Maria Silva"],
+        {"cpfs": [], "ssns": [], "emails": ["maria.silva@example.com"], "phones": ["11 3456-7890"], "dates": ["12/05/2023"]},
+    ),
+    (
+        "SSN 123-45-6789 recorded on 01/02/2024 and 3/4/24; call (555) 123-4567 or 555.123.4567.",
+        "SSN [SSN] recorded on 01/02/2024 and 3/4/24; call [PHONE] or [PHONE].",
+        [],
+        {"cpfs": [], "ssns": ["123-45-6789"], "emails": [], "phones": ["(555) 123-4567", "555.123.4567"],
+         "dates": ["01/02/2024", "3/4/24"]},
+    ),
+    (
+        "Dr. Ana Souza reviewed the case. Ana Souza reports that CPF 12345678909 was verified on 10-10-2023.",
+        "Dr. [PATIENT_NAME] reviewed the case. [PATIENT_NAME] reports that CPF [CPF] was verified on 10-10-2023.",
+        ["Ana Souza"],
+        {"cpfs": ["12345678909"], "ssns": [], "emails": [], "phones": [], "dates": ["10-10-2023"]},
+    ),
+    (
+        "No identifiers in this note, only vitals 120/80 and dose 500 mg.",
+        "No identifiers in this note, only vitals 120/80 and dose 500 mg.",
+        [],
+        {"cpfs": [], "ssns": [], "emails": [], "phones": [], "dates": []},
+    ),
+    (
+        "Email JOHN.DOE@HOSPITAL.ORG and backup jdoe@mail.com; dates 1/1/2020, 2/2/2021, 3/3/2022, 4/4/2023.",
+        "Email [EMAIL] and backup [EMAIL]; dates 1/1/2020, 2/2/2021, 3/3/2022, 4/4/2023.",
+        [],
+        {"cpfs": [], "ssns": [], "emails": ["JOHN.DOE@HOSPITAL.ORG", "jdoe@mail.com"], "phones": [],
+         "dates": ["1/1/2020", "2/2/2021", "3/3/2022"]},
+    ),
+    (
+        "Sra. Joana Prado apresenta dor. Joana Prado retorna em 15/08/2023. CPF 987.654.321-00.",
+        "Sra. [PATIENT_NAME] apresenta dor. [PATIENT_NAME] retorna em 15/08/2023. CPF [CPF].",
+        ["Joana Prado"],
+        {"cpfs": ["987.654.321-00"], "ssns": [], "emails": [], "phones": [], "dates": ["15/08/2023"]},
+    ),
+]
+
+
+@pytest.mark.parametrize("text, masked_text, names, pii", LEGACY_CASES)
+def test_de_identify_matches_previous_output(text, masked_text, names, pii):
+    result = DataMaskingService().de_identify(text)
+    removed = result["removed_entities"]
+
+    assert result["masked_text"] == masked_text
+    assert removed["names"] == names
+    for kind in ("cpfs", "ssns", "emails"):
+        assert sorted(removed["pii"][kind]) == sorted(pii[kind])
+    assert removed["pii"]["phones"] == pii["phones"]
+    assert removed["pii"]["dates"] == pii["dates"]
+
+
+def test_overlapping_matches_resolved_by_priority():
+    masked, removed = DataMaskingService().mask_pii("CPF 12345678909 and 123-45-6789")
+
+    assert masked == "CPF [CPF] and [SSN]"
+    assert removed["cpfs"] == ["12345678909"]
+    assert removed["ssns"] == ["123-45-6789"]
+    assert removed["phones"] == []
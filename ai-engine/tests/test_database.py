@@ -0,0 +1,34 @@
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.orm import sessionmaker
+from app.database import upgrade_schema
+from app.models.medical_note import MedicalNoteProcessing
+from app.services.persistence import build_record, insert_records
+
+NLP_RESULT = {
+    "entities": {"symptoms": ["fever"], "medications": [], "diagnoses": []},
+    "risk_classification": "low",
+    "confidence_score": {"low": 1.0},
+    "processing_time_ms": 1.0,
+    "language_detected": "en"
+}
+
+
+def test_upgrade_adds_missing_columns_to_an_existing_table(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'notes.db'}")
+    with engine.begin() as connection:
+        connection.execute(text(
+            "CREATE TABLE medical_note_processings (id VARCHAR PRIMARY KEY, note_hash VARCHAR, entities JSON, "
+            "risk_classification VARCHAR, confidence_score JSON, raw_text TEXT, processed_at DATETIME, "
+            "processing_time_ms VARCHAR)"
+        ))
+
+    statements = upgrade_schema(engine)
+
+    assert {ddl.split()[5] for ddl in statements} == {"language_detected", "raw_text_compressed", "raw_text_sha256"}
+    assert "REFERENCES note_blobs (sha256)" in next(ddl for ddl in statements if "raw_text_sha256" in ddl)
+    indexes = {index["name"] for index in inspect(engine).get_indexes("medical_note_processings")}
+    assert "ix_medical_note_processings_risk_processed_at_id" in indexes
+    with sessionmaker(bind=engine)() as session:
+        insert_records(session, [build_record("note", NLP_RESULT, "hash")], "blob")
+        assert session.query(MedicalNoteProcessing.language_detected).scalar() == "en"
+    assert upgrade_schema(engine) == []
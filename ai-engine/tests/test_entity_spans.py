@@ -0,0 +1,29 @@
+from app.services.entity_spans import EntitySpans
+
+
+def test_spans_are_stored_column_wise_and_round_trip():
+    spans = EntitySpans(["SYMPTOM", "MEDICATION"])
+    spans.add(30, 37, "MEDICATION")
+    spans.add(0, 5, "SYMPTOM")
+    spans.add(30, 37, "MEDICATION")
+    spans.add(10, 14, "DRUG")
+
+    compact = spans.sorted().to_compact()
+    assert compact == {
+        "labels": ["SYMPTOM", "MEDICATION", "DRUG"],
+        "start": [0, 10, 30],
+        "end": [5, 14, 37],
+        "label": [0, 2, 1]
+    }
+    assert EntitySpans.from_compact(compact).to_compact() == compact
+
+
+def test_to_list_expands_spans_with_their_text():
+    text = "Fever and cough, taking Aspirin"
+    spans = EntitySpans()
+    spans.add(0, 5, "SYMPTOM")
+    spans.add(24, 31, "MEDICATION")
+    assert spans.to_list(text) == [
+        {"text": "Fever", "label": "SYMPTOM", "start": 0, "end": 5},
+        {"text": "Aspirin", "label": "MEDICATION", "start": 24, "end": 31},
+    ]
@@ -0,0 +1,123 @@
+import asyncio
+import threading
+import time
+import orjson
+import pytest
+from fastapi.testclient import TestClient
+from app.config import settings
+from app.main import app
+from app.routers import medical_notes
+from app.services.executor import ExecutorSaturated, ProcessingExecutor
+from app.services.pipeline import analyze_note
+
+
+def hold(executor, gate, calls):
+    """Occupy ``calls`` slots of ``executor`` from another thread until ``gate`` is set."""
+    async def occupy():
+        await asyncio.gather(*(executor.run(gate.wait) for _ in range(calls)))
+
+    thread = threading.Thread(target=asyncio.run, args=(occupy(),))
+    thread.start()
+    while executor.in_flight < calls:
+        time.sleep(0.01)
+    return thread
+
+
+def test_saturated_executor_answers_429_with_retry_after(monkeypatch):
+    executor = ProcessingExecutor("thread", max_workers=2, max_queue=1)
+    monkeypatch.setattr(medical_notes, "processing_executor", executor)
+    gate = threading.Event()
+    thread = hold(executor, gate, executor.capacity)
+    try:
+        response = TestClient(app).post("/api/v1/process", json={"medical_note": "Patient reports fever."})
+        assert response.status_code == 429
+        assert response.headers["Retry-After"] == "1"
+        assert executor.in_flight == executor.capacity
+    finally:
+        gate.set()
+        thread.join()
+        executor.shutdown()
+    assert executor.in_flight == 0
+
+
+def test_slots_are_released_on_success_and_on_exception():
+    executor = ProcessingExecutor("thread", max_workers=1, max_queue=0)
+
+    def fail():
+        raise ValueError("boom")
+
+    async def scenario():
+        assert await executor.run(sum, [1, 2]) == 3
+        assert executor.in_flight == 0
+        with pytest.raises(ValueError):
+            await executor.run(fail)
+        assert executor.in_flight == 0
+        blocked = asyncio.ensure_future(executor.run(time.sleep, 0.2))
+        await asyncio.sleep(0.05)
+        with pytest.raises(ExecutorSaturated):
+            await executor.run(sum, [1])
+        assert executor.in_flight == 1
+        await blocked
+        assert executor.in_flight == 0
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        executor.shutdown()
+
+
+def test_waiting_call_runs_as_soon_as_a_slot_frees():
+    executor = ProcessingExecutor("thread", max_workers=1, max_queue=0)
+
+    async def scenario():
+        blocked = asyncio.ensure_future(executor.run(time.sleep, 0.2))
+        await asyncio.sleep(0.05)
+        start = time.perf_counter()
+        assert await executor.run(sum, [1, 2], wait=5) == 3
+        assert time.perf_counter() - start < 1
+        await blocked
+        blocked = asyncio.ensure_future(executor.run(time.sleep, 0.5))
+        await asyncio.sleep(0.05)
+        with pytest.raises(ExecutorSaturated):
+            await executor.run(sum, [1], wait=0.1)
+        await blocked
+        assert executor.in_flight == 0 and not executor._waiters
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        executor.shutdown()
+
+
+def test_stream_stops_with_error_lines_when_saturation_outlasts_the_wait(monkeypatch):
+    executor = ProcessingExecutor("thread", max_workers=1, max_queue=0)
+    monkeypatch.setattr(medical_notes, "processing_executor", executor)
+    monkeypatch.setattr(settings, "STREAM_CHUNK_SIZE", 2)
+    monkeypatch.setattr(settings, "STREAM_SLOT_WAIT_SECONDS", 0.1)
+    body = b"".join(orjson.dumps({"medical_note": f"Patient {i} reports fever."}) + b"\n" for i in range(6))
+    gate = threading.Event()
+    thread = hold(executor, gate, executor.capacity)
+    try:
+        response = TestClient(app).post("/api/v1/process/stream?persist=false", content=body)
+    finally:
+        gate.set()
+        thread.join()
+        executor.shutdown()
+    results = [orjson.loads(line) for line in response.content.splitlines()]
+    assert [result["line"] for result in results] == [1, 2]
+    assert all(result["status"] == "error" for result in results)
+    assert "over capacity" in results[0]["detail"]
+
+
+def test_process_backend_matches_in_process_analysis():
+    note = "Patient reports severe chest pain and fever, taking aspirin 100mg. Contact: john@example.com"
+    executor = ProcessingExecutor("process", max_workers=1, max_queue=0)
+    try:
+        de_identified, nlp_result = asyncio.run(executor.run(analyze_note, note))
+    finally:
+        executor.shutdown()
+    expected_de_identified, expected_result = analyze_note(note)
+    assert de_identified["masked_text"] == expected_de_identified["masked_text"]
+    for field in ("entities", "risk_classification", "confidence_score", "language_detected", "entity_spans"):
+        assert nlp_result[field] == expected_result[field]
+    assert executor.in_flight == 0
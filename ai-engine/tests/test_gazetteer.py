@@ -0,0 +1,43 @@
+from app.services.gazetteer import Gazetteer, read_lexicon
+
+
+def _write_lexicons(directory):
+    en = directory / "en"
+    en.mkdir()
+    (en / "medications.txt").write_text("# drugs\nmetformin\ninsulin\ninsulin glargine\n", encoding="utf-8")
+    (en / "symptoms.txt").write_text("chest pain\n\nshortness of breath\n", encoding="utf-8")
+
+
+def test_read_lexicon_skips_comments_and_blank_lines(tmp_path):
+    _write_lexicons(tmp_path)
+    assert read_lexicon(tmp_path / "en" / "medications.txt") == ["metformin", "insulin", "insulin glargine"]
+
+
+def test_scan_matches_case_insensitive_longest_terms(tmp_path):
+    _write_lexicons(tmp_path)
+    gazetteer = Gazetteer(str(tmp_path), str(tmp_path / "cache"))
+    text = "Chest Pain and shortness of breath; started Insulin Glargine and metformin."
+
+    matches = [(label, text[start:end]) for label, start, end in gazetteer.scan(text, "en")]
+
+    assert matches == [
+        ("symptoms", "Chest Pain"),
+        ("symptoms", "shortness of breath"),
+        ("medications", "Insulin Glargine"),
+        ("medications", "metformin"),
+    ]
+
+
+def test_built_matcher_is_reloaded_from_cache(tmp_path):
+    _write_lexicons(tmp_path)
+    cache_dir = tmp_path / "cache"
+    Gazetteer(str(tmp_path), str(cache_dir)).get("en")
+    assert len(list(cache_dir.glob("en-*.pkl"))) == 1
+
+    reloaded = Gazetteer(str(tmp_path), str(cache_dir))
+    assert list(reloaded.scan("on metformin", "en")) == [("medications", 3, 12)]
+
+    (tmp_path / "en" / "medications.txt").write_text("aspirin\n", encoding="utf-8")
+    changed = Gazetteer(str(tmp_path), str(cache_dir))
+    assert list(changed.scan("on metformin", "en")) == []
+    assert len(list(cache_dir.glob("en-*.pkl"))) == 2
@@ -0,0 +1,90 @@
+import asyncio
+import uuid
+import pytest
+from app.services.chunking import split_paragraphs, split_segments
+from app.services.entity_spans import EntitySpans
+from app.services.executor import ProcessingExecutor
+from app.services.incremental import NoteSegmentStore, segment_store
+from app.services.metrics import observe_analysis
+from app.services.pipeline import analyze_note
+from app.services.nlp_processor import nlp_processor
+
+PARAGRAPHS = [
+    "Patient reports symptoms: fever, cough and headache since Monday.",
+    "Prescribed amoxicillin 500mg every eight hours.",
+    "Diagnosis: community acquired pneumonia.",
+]
+
+
+def span_texts(text, result):
+    return sorted(text[start:end] for start, end, _ in EntitySpans.from_compact(result["entity_spans"]))
+
+
+def assert_same_analysis(text, result):
+    full = nlp_processor.process(text)
+    assert span_texts(text, result) == span_texts(text, full)
+    assert {key: sorted(values) for key, values in result["entities"].items()} == \
+        {key: sorted(values) for key, values in full["entities"].items()}
+    assert result["risk_classification"] == full["risk_classification"]
+
+
+def test_split_paragraphs_skips_blank_lines():
+    text = "first\n\n  \nsecond line\nstill second\n\n"
+    assert [text[start:end] for start, end in split_paragraphs(text)] == ["first", "second line\nstill second"]
+
+
+def test_segments_close_with_a_full_stop():
+    text = "Reports headache\n\nand nausea.\n\nTaking Ibuprofen.\n\n"
+    assert [text[start:end] for start, end in split_segments(text)] == \
+        ["Reports headache\n\nand nausea.", "Taking Ibuprofen."]
+
+
+@pytest.mark.parametrize("text", [
+    "Patient reports headache\n\nand nausea since Monday. Taking Ibuprofen 400 mg.",
+    "Paciente relata dor de cabeça\n\ne febre há dois dias.\n\nTomando Dipirona 500 mg.",
+    "Medication: Ibuprofen\n\n400 mg daily\n\nDiagnosis: migraine.",
+])
+def test_first_submission_matches_whole_note_processing(text):
+    result, _ = nlp_processor.process_segments(text, {})
+    assert_same_analysis(text, result)
+
+
+def test_only_changed_paragraphs_are_processed():
+    text = "\n\n".join(PARAGRAPHS)
+    first, segments = nlp_processor.process_segments(text, {})
+    assert first["segments"] == {"total": 3, "reused": 0}
+
+    edited = "\n\n".join(PARAGRAPHS[:2] + ["Diagnosis: pneumonia. Patient has chest pain and shortness of breath."])
+    second, _ = nlp_processor.process_segments(edited, segments)
+
+    assert second["segments"] == {"total": 3, "reused": 2}
+    assert_same_analysis(edited, second)
+
+
+def test_store_ignores_results_of_another_version():
+    store = NoteSegmentStore(max_notes=10)
+    store.set("note-1", "v1", {"key": {"entities": {}}})
+    assert store.get("note-1", "v1") == {"key": {"entities": {}}}
+    assert store.get("note-1", "v2") == {}
+    assert store.get("note-2", "v1") == {}
+
+
+def test_segments_parsed_in_a_process_worker_are_counted_by_the_server():
+    note_id = f"note-{uuid.uuid4().hex}"
+    first = "\n\n".join(PARAGRAPHS)
+    edited = "\n\n".join(PARAGRAPHS[:2] + ["Diagnosis: pneumonia with pleural effusion."])
+    processed, reused = segment_store.processed, segment_store.reused
+    executor = ProcessingExecutor("process", max_workers=1, max_queue=0)
+
+    async def submit(text):
+        _, nlp_result = await executor.run(analyze_note, text, True, note_id)
+        observe_analysis(nlp_result["language_detected"], len(text), nlp_result["timings_ms"],
+                         nlp_result["cache_lookup"], nlp_result.get("segments"))
+        return nlp_result["segments"]
+
+    try:
+        assert asyncio.run(submit(first)) == {"total": 3, "reused": 0}
+        assert asyncio.run(submit(edited)) == {"total": 3, "reused": 2}
+    finally:
+        executor.shutdown()
+    assert (segment_store.processed - processed, segment_store.reused - reused) == (4, 2)
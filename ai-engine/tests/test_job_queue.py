@@ -0,0 +1,199 @@
+import asyncio
+import copy
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.database import Base
+from app.schemas import MedicalNoteRequest
+from app.services.job_queue import (
+    CANCELLED, COMPLETED, FAILED, DatabaseJobBackend, InMemoryJobBackend, JobQueue, JobQueueFull
+)
+
+
+def make_notes(count, prefix="note"):
+    return [MedicalNoteRequest(medical_note=f"{prefix} number {i}") for i in range(count)]
+
+
+class RecordingProcessor:
+    """Stand-in for the NLP pipeline: echoes every note and records the call order."""
+
+    def __init__(self, delay=0.0, fail_on=None):
+        self.delay = delay
+        self.fail_on = fail_on
+        self.calls = []
+
+    async def __call__(self, job, notes):
+        self.calls.append((job.id, len(notes)))
+        await asyncio.sleep(self.delay)
+        if self.fail_on and any(self.fail_on in note.medical_note for note in notes):
+            raise ValueError("boom")
+        return [{"text": note.medical_note} for note in notes]
+
+
+def test_job_is_processed_in_chunks_with_progress():
+    async def scenario():
+        processor = RecordingProcessor()
+        queue = JobQueue(InMemoryJobBackend(), workers=1, chunk_size=4, process_chunk=processor)
+        queue.start()
+        try:
+            job = queue.submit(make_notes(10))
+            await queue.wait(job, timeout=2)
+        finally:
+            await queue.stop()
+        return job, processor
+
+    job, processor = asyncio.run(scenario())
+    assert job.status == COMPLETED
+    assert [size for _, size in processor.calls] == [4, 4, 2]
+    assert job.to_dict()["progress"] == {"processed": 10, "total": 10, "percent": 100.0}
+    assert [result["text"] for result in job.results] == [f"note number {i}" for i in range(10)]
+
+
+def test_higher_priority_jobs_start_first():
+    async def scenario():
+        processor = RecordingProcessor()
+        queue = JobQueue(InMemoryJobBackend(), workers=1, chunk_size=10, process_chunk=processor)
+        low = queue.submit(make_notes(1), priority=1)
+        first_normal = queue.submit(make_notes(1), priority=5)
+        high = queue.submit(make_notes(1), priority=9)
+        second_normal = queue.submit(make_notes(1), priority=5)
+        queue.start()
+        try:
+            await queue.wait(low, timeout=2)
+        finally:
+            await queue.stop()
+        return [job_id for job_id, _ in processor.calls], [high.id, first_normal.id, second_normal.id, low.id]
+
+    order, expected = asyncio.run(scenario())
+    assert order == expected
+
+
+def test_workers_bound_concurrent_jobs():
+    async def scenario():
+        active = 0
+        peak = 0
+
+        async def processor(job, notes):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+            return [{} for _ in notes]
+
+        queue = JobQueue(InMemoryJobBackend(), workers=2, chunk_size=1, process_chunk=processor)
+        queue.start()
+        try:
+            jobs = [queue.submit(make_notes(3)) for _ in range(6)]
+            await asyncio.gather(*(queue.wait(job, timeout=2) for job in jobs))
+        finally:
+            await queue.stop()
+        return jobs, peak
+
+    jobs, peak = asyncio.run(scenario())
+    assert all(job.status == COMPLETED for job in jobs)
+    assert peak == 2
+
+
+def test_failed_chunk_fails_the_job_and_keeps_earlier_results():
+    async def scenario():
+        queue = JobQueue(InMemoryJobBackend(), workers=1, chunk_size=2,
+                         process_chunk=RecordingProcessor(fail_on="number 3"))
+        queue.start()
+        try:
+            job = queue.submit(make_notes(6))
+            await queue.wait(job, timeout=2)
+        finally:
+            await queue.stop()
+        return job, queue.stats()
+
+    job, stats = asyncio.run(scenario())
+    assert job.status == FAILED
+    assert "boom" in job.error
+    assert job.processed == 2
+    assert stats["failed"] == 1
+
+
+def test_cancel_and_queue_limit():
+    async def scenario():
+        queue = JobQueue(InMemoryJobBackend(), workers=1, max_pending=2, process_chunk=RecordingProcessor())
+        first = queue.submit(make_notes(1))
+        queue.submit(make_notes(1))
+        with pytest.raises(JobQueueFull):
+            queue.submit(make_notes(1))
+        return queue.cancel(first), queue.submit(make_notes(1))
+
+    cancelled, accepted = asyncio.run(scenario())
+    assert cancelled.status == CANCELLED
+    assert cancelled.finished_at is not None
+    assert accepted.status == "queued"
+
+
+class CopyingBackend(InMemoryJobBackend):
+    """Hands out copies, as a backend over a shared store would: changes only
+    reach the stored job through ``update``."""
+
+    def pop(self):
+        job = super().pop()
+        return copy.deepcopy(job) if job is not None else None
+
+    def get(self, job_id):
+        job = super().get(job_id)
+        return copy.deepcopy(job) if job is not None else None
+
+
+def test_progress_and_cancellation_go_through_the_backend():
+    async def scenario():
+        backend = CopyingBackend()
+        queue = JobQueue(backend, workers=1, chunk_size=1, process_chunk=RecordingProcessor(delay=0.02),
+                         poll_interval=0.01)
+        queue.start()
+        try:
+            finished = queue.submit(make_notes(3))
+            finished = await queue.wait(finished, timeout=2)
+            cancelled = queue.submit(make_notes(50))
+            while backend.get(cancelled.id).processed < 2:
+                await asyncio.sleep(0.01)
+            queue.cancel(backend.get(cancelled.id))
+            cancelled = await queue.wait(cancelled, timeout=2)
+        finally:
+            await queue.stop()
+        return finished, cancelled
+
+    finished, cancelled = asyncio.run(scenario())
+    assert finished.status == COMPLETED
+    assert [result["text"] for result in finished.results] == [f"note number {i}" for i in range(3)]
+    assert cancelled.status == CANCELLED
+    assert 2 <= cancelled.processed < 50
+    assert len(cancelled.results) == cancelled.processed
+
+
+def test_database_backend_is_shared_between_queues(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'jobs.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    backend = DatabaseJobBackend(sessionmaker(bind=engine))
+
+    async def scenario():
+        # Two queues over one table stand for two server workers.
+        accepting = JobQueue(backend, workers=0, poll_interval=0.01)
+        draining = JobQueue(backend, workers=1, chunk_size=2, process_chunk=RecordingProcessor(),
+                            poll_interval=0.01)
+        accepting.start()
+        draining.start()
+        try:
+            low = accepting.submit(make_notes(1), priority=1)
+            job = accepting.submit(make_notes(5), priority=9)
+            job = await accepting.wait(job, timeout=2)
+            low = await accepting.wait(low, timeout=2)
+            queued = accepting.submit(make_notes(1))
+        finally:
+            await draining.stop()
+        return job, low, accepting.cancel(queued), backend.pending()
+
+    job, low, cancelled, pending = asyncio.run(scenario())
+    assert job.status == COMPLETED and job.started_at <= low.started_at
+    assert [result["text"] for result in job.results] == [f"note number {i}" for i in range(5)]
+    assert job.to_dict()["progress"]["processed"] == 5 and job.notes == []
+    assert (cancelled.status, pending) == (CANCELLED, 0)
+    assert backend.purge(datetime.utcnow() + timedelta(seconds=1)) == 3
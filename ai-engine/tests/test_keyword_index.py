@@ -0,0 +1,60 @@
+import pytest
+from app.services.keyword_index import RISK_KEYWORDS, RISK_WEIGHTS, KeywordIndex, _Automaton, _KeywordPattern
+from app.services.nlp_processor import nlp_processor
+
+
+def legacy_risk_scores(symptoms, diagnoses, text, language):
+    """Scoring of the per-keyword substring checks the index replaced."""
+    text_lower = text.lower()
+    scores = {"critical": 0.0, "high": 0.0, "moderate": 0.0, "low": 0.0}
+    for tier, by_language in RISK_KEYWORDS.items():
+        for keyword in by_language.get(language, by_language["en"]):
+            if keyword in text_lower:
+                scores[tier] += RISK_WEIGHTS[tier]
+    if len(symptoms) > 5 or len(diagnoses) > 2:
+        scores["high"] += 0.1
+    elif len(symptoms) > 3 or len(diagnoses) > 1:
+        scores["moderate"] += 0.1
+    else:
+        scores["low"] += 0.1
+    total_score = sum(scores.values())
+    scores = {k: v / total_score for k, v in scores.items()}
+    return max(scores, key=scores.get), scores
+
+
+NOTES = [
+    ("Patient has SEVERE PAIN and Chest pain, severe pain again after the seizure.", "en"),
+    ("Persistent recurrent moderate headache, no emergency.", "en"),
+    ("Routine follow-up, patient feels well.", "en"),
+    ("Paciente com dor severa e DOR NO PEITO, febre alta persistente.", "pt"),
+    ("Convulsão recorrente; encaminhado à emergência com insuficiência respiratória.", "pt"),
+]
+
+
+@pytest.mark.parametrize("automaton_min_keywords", [1, 10_000])
+def test_overlapping_and_case_variant_hits(automaton_min_keywords):
+    index = KeywordIndex(automaton_min_keywords=automaton_min_keywords)
+    text = "Severe Pain in the CHEST PAIN region"
+    assert sorted(index.find(text, "en")) == [
+        (0, 6, "high", "severe"),
+        (0, 11, "critical", "severe pain"),
+        (19, 29, "critical", "chest pain"),
+    ]
+    assert {keyword for _, _, _, keyword in index.find("DOR SEVERA e dor severa", "pt")} == {"dor severa", "severa"}
+
+
+def test_regex_and_automaton_find_the_same_hits():
+    entries = [(tier, keyword) for tier, by_language in RISK_KEYWORDS.items()
+               for language in ("en", "pt") for keyword in by_language[language]]
+    pattern, automaton = _KeywordPattern(entries), _Automaton(entries)
+    for text, _ in NOTES + [("İstanbul: severe pain, AVC.", "en")]:
+        assert pattern.find(text) == sorted(automaton.find(text))
+
+
+@pytest.mark.parametrize("text,language", NOTES)
+def test_risk_scores_match_the_substring_scorer(text, language):
+    for symptoms, diagnoses in (([], []), (["a", "b", "c", "d"], []), (["a"], ["x", "y", "z"])):
+        classification, scores = nlp_processor.classify_risk(symptoms, diagnoses, text, language)
+        expected_classification, expected_scores = legacy_risk_scores(symptoms, diagnoses, text, language)
+        assert classification == expected_classification
+        assert scores == pytest.approx(expected_scores)
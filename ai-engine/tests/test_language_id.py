@@ -0,0 +1,47 @@
+from app.config import settings
+from app.services.language_id import LanguageIdentifier
+from app.services.nlp_processor import NLPProcessor
+
+identifier = LanguageIdentifier()
+
+
+def test_identifies_portuguese_without_accents():
+    guess = identifier.identify("Paciente relata dor de cabeca e febre alta desde ontem, nega tosse.")
+    assert guess.language == "pt"
+    assert guess.confidence > 0.9
+
+
+def test_english_note_with_portuguese_drug_names():
+    guess = identifier.identify("Patient reports severe headache since yesterday. Prescribed Dipirona 500 mg.")
+    assert guess.language == "en"
+    assert guess.confidence > 0.9
+
+
+def test_short_notes_are_not_confident():
+    assert identifier.identify("Aspirin 100 mg").confidence < 0.8
+    assert identifier.identify("HAS DM2").confidence < 0.8
+    assert identifier.identify("123 456").language is None
+
+
+def test_short_notes_of_distinctive_words_are_confident():
+    assert identifier.identify("Chest pain") == ("en", 1.0)
+    assert identifier.identify("Febre alta").language == "pt"
+    assert identifier.identify("Febre alta").confidence >= settings.LANGID_MIN_CONFIDENCE
+
+
+def test_prefix_length_comes_from_settings(monkeypatch):
+    assert identifier.prefix_chars == settings.LANGID_PREFIX_CHARS
+    monkeypatch.setattr(settings, "LANGID_PREFIX_CHARS", 32)
+    assert LanguageIdentifier().prefix_chars == 32
+
+
+def test_low_confidence_uses_fallback_policy(monkeypatch):
+    processor = NLPProcessor()
+    monkeypatch.setattr(settings, "LANGID_FALLBACK", "default")
+    monkeypatch.setattr(settings, "LANGID_DEFAULT_LANGUAGE", "pt")
+    assert processor.detect_language("Aspirin 100 mg") == "pt"
+
+    monkeypatch.setattr(settings, "LANGID_FALLBACK", "accents")
+    assert processor.detect_language("Dx: HTN") == "en"
+    assert processor.detect_language("Dx: AVC") == "en"
+    assert processor.detect_language("Dx: convulsão") == "pt"
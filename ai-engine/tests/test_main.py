@@ -6,4 +6,9 @@ client = TestClient(app)
 def test_read_root():
     response = client.get("/")
     assert response.status_code == 200
-    assert response.json() == {"status": "online", "service": "medical-notes-ai"}
\ No newline at end of file
+    assert response.json() == {
+        "service": "Medical Notes NLP API - AI Engine",
+        "version": "1.0.0",
+        "status": "operational",
+        "docs": "/docs"
+    }
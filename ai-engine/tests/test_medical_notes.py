@@ -0,0 +1,87 @@
+import uuid
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.config import settings
+from app.database import Base, get_db
+from app.main import app
+from app.models.medical_note import MedicalNoteProcessing
+from app.services.nlp_processor import nlp_processor
+from app.services.result_cache import result_cache
+
+
+@pytest.fixture
+def client(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'notes.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(bind=engine)
+
+    def override_get_db():
+        with session_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = override_get_db
+    try:
+        yield TestClient(app), session_factory
+    finally:
+        app.dependency_overrides.pop(get_db, None)
+
+
+def unique_note(text="Patient reports fever and cough."):
+    return f"{text} Visit {uuid.uuid4().hex}."
+
+
+def test_cache_hits_are_persisted_and_counted(client):
+    client, session_factory = client
+    note = unique_note()
+    hits, misses = result_cache.hits, result_cache.misses
+
+    first = client.post("/api/v1/process", json={"medical_note": note, "note_hash": "first"}).json()["data"]
+    second = client.post("/api/v1/process", json={"medical_note": note, "note_hash": "second"}).json()["data"]
+
+    assert (first["cache_hit"], second["cache_hit"]) == (False, True)
+    assert (result_cache.hits - hits, result_cache.misses - misses) == (1, 1)
+    with session_factory() as session:
+        assert sorted(hash for (hash,) in session.query(MedicalNoteProcessing.note_hash)) == ["first", "second"]
+
+
+def test_batch_returns_the_single_note_results_in_order(client, monkeypatch):
+    client, session_factory = client
+    monkeypatch.setattr(result_cache, "enabled", False)
+    notes = [
+        {"medical_note": unique_note("Patient John Smith reports severe chest pain, taking aspirin 100mg."),
+         "note_hash": "chest"},
+        {"medical_note": unique_note("Routine follow-up, no complaints."), "skip_masking": True},
+        {"medical_note": unique_note("Paciente com febre alta e tosse persistente, em uso de dipirona.")},
+    ]
+
+    response = client.post("/api/v1/process/batch", json={"notes": notes, "batch_size": 2})
+    assert response.status_code == 200
+    batch = response.json()
+    assert batch["count"] == len(notes)
+
+    volatile = ("processing_time_ms",)
+    for note, item in zip(notes, batch["data"]):
+        single = client.post("/api/v1/process", json=note).json()["data"]
+        assert {k: v for k, v in item.items() if k not in volatile} == \
+               {k: v for k, v in single.items() if k not in volatile}
+    assert batch["data"][0]["note_hash"] == "chest"
+    assert batch["data"][2]["language_detected"] == "pt"
+    with session_factory() as session:
+        assert session.query(MedicalNoteProcessing).count() == 2 * len(notes)
+
+
+def test_batch_ignores_a_client_supplied_process_count(client, monkeypatch):
+    client, _ = client
+    calls = []
+    process_batch = nlp_processor.process_batch
+
+    def recording_process_batch(texts, batch_size=64, n_process=1):
+        calls.append(n_process)
+        return process_batch(texts, batch_size, n_process)
+
+    monkeypatch.setattr(nlp_processor, "process_batch", recording_process_batch)
+    response = client.post("/api/v1/process/batch", json={"notes": [{"medical_note": unique_note()}], "n_process": 32})
+    assert response.status_code == 200
+    assert calls == [settings.NLP_N_PROCESS]
@@ -0,0 +1,57 @@
+from fastapi.testclient import TestClient
+from app.main import app
+from app.services.metrics import Counter, Gauge, Histogram, MetricsRegistry, stage_timer
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry()
+    histogram = registry.register(Histogram("stage_seconds", "Stage time", ["stage"], buckets=(0.1, 1.0)))
+    histogram.observe(0.05, "parse")
+    histogram.observe(0.5, "parse")
+    histogram.observe(5, "parse")
+
+    lines = registry.render().splitlines()
+    assert 'stage_seconds_bucket{stage="parse",le="0.1"} 1' in lines
+    assert 'stage_seconds_bucket{stage="parse",le="1"} 2' in lines
+    assert 'stage_seconds_bucket{stage="parse",le="+Inf"} 3' in lines
+    assert 'stage_seconds_sum{stage="parse"} 5.55' in lines
+    assert 'stage_seconds_count{stage="parse"} 3' in lines
+
+
+def test_gauge_reads_callback_at_render_time():
+    registry = MetricsRegistry()
+    depth = [3]
+    registry.register(Gauge("queue_depth", "Queued jobs", lambda: depth[0]))
+    depth[0] = 7
+    assert "queue_depth 7" in registry.render().splitlines()
+
+
+def test_counter_renders_total_with_counter_type():
+    registry = MetricsRegistry()
+    totals = {("hit",): 2, ("miss",): 1}
+    registry.register(Counter("cache_lookups", "Cache lookups", lambda: totals, ["result"]))
+    assert registry.render().splitlines() == [
+        "# HELP cache_lookups_total Cache lookups",
+        "# TYPE cache_lookups_total counter",
+        'cache_lookups_total{result="hit"} 2',
+        'cache_lookups_total{result="miss"} 1',
+    ]
+
+
+def test_monotonic_totals_are_exposed_as_counters():
+    lines = TestClient(app).get("/metrics").text.splitlines()
+    for name in ("ai_engine_result_cache_lookups_total", "ai_engine_admission_requests_total",
+                 "ai_engine_jobs_finished_total", "ai_engine_write_behind_records_total",
+                 "ai_engine_persistence_failed_records_total"):
+        assert f"# TYPE {name} counter" in lines
+    assert "# TYPE ai_engine_admission_in_flight gauge" in lines
+
+
+def test_stage_timer_accumulates_milliseconds():
+    timings = {}
+    with stage_timer(timings, "parse"):
+        pass
+    first = timings["parse"]
+    with stage_timer(timings, "parse"):
+        pass
+    assert timings["parse"] >= first >= 0
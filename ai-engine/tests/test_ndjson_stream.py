@@ -0,0 +1,90 @@
+import asyncio
+import orjson
+from fastapi.testclient import TestClient
+from starlette.background import BackgroundTask
+from app.config import settings
+from app.main import app
+from app.routers.medical_notes import _DuplexStreamingResponse
+from app.services.ndjson_stream import aiter_line_chunks, iter_line_chunks, process_ndjson_chunk
+
+
+def collect(pieces, chunk_size=2, max_line_bytes=1024):
+    async def body():
+        for piece in pieces:
+            yield piece
+
+    async def run():
+        return [chunk async for chunk in aiter_line_chunks(body(), chunk_size, max_line_bytes)]
+
+    return asyncio.run(run())
+
+
+def test_lines_split_across_body_chunks():
+    pieces = [b'{"a": 1}\n{"b"', b': 2}\n\n{"c": 3', b'}\n{"d": 4}']
+    expected = [[(1, b'{"a": 1}'), (2, b'{"b": 2}')], [(4, b'{"c": 3}'), (5, b'{"d": 4}')]]
+    assert collect(pieces) == expected
+    assert list(iter_line_chunks(b"".join(pieces).splitlines(keepends=True), 2, 1024)) == expected
+
+
+def test_last_line_without_newline_and_oversized_lines():
+    assert collect([b"one\n", b"two"], chunk_size=10) == [[(1, b"one"), (2, b"two")]]
+    pieces = [b"short\n" + b"x" * 8, b"x" * 8, b"x\nafter"]
+    assert collect(pieces, chunk_size=10, max_line_bytes=10) == [[(1, b"short"), (2, None), (3, b"after")]]
+    assert list(iter_line_chunks([b"short\n", b"x" * 17 + b"\n", b"after"], 10, 10)) == [
+        [(1, b"short"), (2, None), (3, b"after")]
+    ]
+
+
+def test_malformed_lines_get_their_own_error():
+    chunk = [(1, b'{"medical_note": "Patient reports fever."}'), (2, b"{not json"),
+             (3, b'{"note": "missing field"}'), (4, None), (5, b'{"medical_note": "Severe chest pain."}')]
+    outputs, records, samples = process_ndjson_chunk(chunk)
+    assert [(output["line"], output["status"]) for output in outputs] == [
+        (1, "success"), (2, "error"), (3, "error"), (4, "error"), (5, "success")
+    ]
+    assert outputs[3]["detail"] == "Line exceeds the maximum note size"
+    assert len(records) == len(samples) == 2
+
+
+def test_stream_endpoint_answers_in_input_order(monkeypatch):
+    monkeypatch.setattr(settings, "STREAM_CHUNK_SIZE", 2)
+    notes = [f"Patient {i} reports fever." for i in range(5)]
+    lines = [orjson.dumps({"medical_note": note, "skip_masking": True}) for note in notes]
+    lines.insert(2, b"not json")
+
+    def body():
+        for line in lines:
+            yield line[:5]
+            yield line[5:] + b"\n"
+
+    response = TestClient(app).post("/api/v1/process/stream?persist=false", content=body())
+    assert response.status_code == 200
+    results = [orjson.loads(line) for line in response.content.splitlines()]
+    assert [result["line"] for result in results] == list(range(1, 7))
+    assert [result["status"] for result in results] == ["success", "success", "error", "success", "success", "success"]
+    assert results[0]["data"]["note_hash"] != results[1]["data"]["note_hash"]
+
+
+def test_duplex_response_leaves_the_request_body_to_the_generator():
+    messages = [{"type": "http.request", "body": b"a\n", "more_body": True},
+                {"type": "http.request", "body": b"b\n", "more_body": False}]
+    sent, background = [], []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    async def echo():
+        while messages:
+            message = await receive()
+            yield message["body"].upper()
+
+    response = _DuplexStreamingResponse(echo(), media_type="application/x-ndjson",
+                                        background=BackgroundTask(background.append, "done"))
+    asyncio.run(response({"type": "http"}, receive, send))
+    assert [message.get("body") for message in sent if message["type"] == "http.response.body"] == [
+        b"A\n", b"B\n", b""
+    ]
+    assert background == ["done"]
@@ -0,0 +1,50 @@
+import re
+import pytest
+from app.services.nlp_processor import nlp_processor
+from app.services.pattern_registry import ENTITY_PATTERNS, PatternRegistry
+
+SENTENCES = [
+    ("en", "Patient reports headache since taking Ibuprofen 400 mg daily."),
+    ("en", "Complains of dizziness after taking Lisinopril 10 mg, diagnosed with hypertension."),
+    ("en", "Presents with chest pain. Prescribed Aspirin 100 mg. Dx: angina."),
+    ("pt", "Paciente relata dor de cabeça desde que começou tomando Dipirona 500 mg."),
+    ("pt", "Apresenta febre, diagnosticada com pneumonia. Prescrito Amoxicilina 500 mg."),
+    ("en", "PATIENT REPORTS CHEST PAIN. DIAGNOSED WITH Angina, taking Nitroglycerin 5 mg."),
+    ("en", "İbrahim reports nausea, Dx: gastritis. Taking Omeprazole 20 mg."),
+]
+
+
+def legacy_scan(text, language):
+    """The per-pattern loops of the former extract_symptoms/medications/diagnoses."""
+    found = {"symptoms": [], "medications": [], "diagnoses": []}
+    for pattern in ENTITY_PATTERNS["symptoms"][language]:
+        found["symptoms"] += [m.group(1) for m in re.finditer(pattern, text.lower(), re.IGNORECASE)]
+    for pattern in ENTITY_PATTERNS["medications"][language]:
+        found["medications"] += [m.group(1) for m in re.finditer(pattern, text)]
+    for pattern in ENTITY_PATTERNS["diagnoses"][language]:
+        found["diagnoses"] += [m.group(1) for m in re.finditer(pattern, text, re.IGNORECASE)]
+    return found
+
+
+def scan_values(text, language):
+    found = {"symptoms": [], "medications": [], "diagnoses": []}
+    for entity_type, start, end in PatternRegistry().scan(text, language):
+        value = text[start:end]
+        found[entity_type].append(value.lower() if entity_type == "symptoms" else value)
+    return {k: sorted(v) for k, v in found.items()}
+
+
+@pytest.mark.parametrize("language,text", SENTENCES)
+def test_scan_matches_legacy_extractors(language, text):
+    assert scan_values(text, language) == {k: sorted(v) for k, v in legacy_scan(text, language).items()}
+
+
+@pytest.mark.parametrize("language", ["en", "pt"])
+def test_long_note_matches_legacy_extractors(language):
+    text = " ".join(sentence for sentence_language, sentence in SENTENCES if sentence_language == language) * 50
+    assert scan_values(text, language) == {k: sorted(v) for k, v in legacy_scan(text, language).items()}
+
+
+def test_medications_inside_symptom_clauses_survive():
+    result = nlp_processor.process("Patient reports headache since taking Ibuprofen 400 mg daily.")
+    assert {"Ibuprofen", "Ibuprofen 400 mg"} <= set(result["entities"]["medications"])
@@ -0,0 +1,50 @@
+import time
+from app.services.result_cache import LRUCache, ResultCache, SQLiteCacheBackend
+
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(max_entries=2, ttl_seconds=60)
+    cache.set("a", {"v": 1})
+    cache.set("b", {"v": 2})
+    cache.get("a")
+    cache.set("c", {"v": 3})
+    assert cache.get("b") is None
+    assert cache.get("a") == {"v": 1}
+    assert cache.get("c") == {"v": 3}
+
+
+def test_lru_expires_entries():
+    cache = LRUCache(max_entries=10, ttl_seconds=0.01)
+    cache.set("a", {"v": 1})
+    time.sleep(0.02)
+    assert cache.get("a") is None
+
+
+def test_key_depends_on_text_and_version():
+    assert ResultCache.key("note", "1") == ResultCache.key("note", "1")
+    assert ResultCache.key("note", "1") != ResultCache.key("note", "2")
+    assert ResultCache.key("note", "1") != ResultCache.key("other note", "1")
+
+
+def test_shared_sqlite_tier_is_promoted_to_local(tmp_path):
+    shared = SQLiteCacheBackend(str(tmp_path / "cache.db"), ttl_seconds=60)
+    writer = ResultCache(shared=shared)
+    reader = ResultCache(shared=shared)
+    key = ResultCache.key("note", "1")
+
+    writer.set(key, {"risk_classification": "low"})
+    assert reader.lookup(key) == ({"risk_classification": "low"}, "shared")
+    assert len(reader.local) == 1
+    assert reader.lookup(key) == ({"risk_classification": "low"}, "local")
+    assert reader.lookup(ResultCache.key("missing", "1")) == (None, "miss")
+
+
+def test_lookups_are_counted_by_the_caller():
+    cache = ResultCache()
+    cache.set("key", {"risk_classification": "low"})
+    for outcome in (cache.lookup("key")[1], "shared", cache.lookup("missing")[1]):
+        cache.count(outcome)
+    cache.count(ResultCache(enabled=False).lookup("key")[1])
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["shared_hits"]) == (2, 1, 1)
+    assert stats["hit_rate"] == round(2 / 3, 4)
@@ -0,0 +1,81 @@
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.database import Base
+from app.models.entity_term import EntityTerm
+from app.services.persistence import build_record, insert_records
+from app.services.search import reindex, search_notes
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'notes.db'}")
+    Base.metadata.create_all(bind=engine)
+    with sessionmaker(bind=engine)() as session:
+        yield session
+
+
+def make_record(index, risk, language, symptoms=(), medications=()):
+    nlp_result = {
+        "entities": {"symptoms": list(symptoms), "medications": list(medications), "diagnoses": []},
+        "risk_classification": risk, "confidence_score": {}, "processing_time_ms": 1.5,
+        "language_detected": language
+    }
+    record = build_record(f"note {index}", nlp_result, f"hash{index}")
+    record["processed_at"] = datetime(2024, 3, 1) + timedelta(hours=index)
+    return record
+
+
+@pytest.fixture
+def notes(db):
+    records = [
+        make_record(0, "low", "en", ["cough"]),
+        make_record(1, "critical", "en", ["Chest Pain", "fever"], ["aspirin"]),
+        make_record(2, "high", "pt", ["febre"], ["dipirona"]),
+        make_record(3, "critical", "pt", ["dor no peito", "febre"]),
+        make_record(4, "critical", "en", ["chest pain"], ["Aspirin"]),
+    ]
+    insert_records(db, records)
+    return records
+
+
+def hashes(page):
+    return [item["note_hash"] for item in page["items"]]
+
+
+def test_filters_combine(db, notes):
+    assert hashes(search_notes(db, risk_classifications=["critical"])) == ["hash4", "hash3", "hash1"]
+    assert hashes(search_notes(db, risk_classifications=["critical"], languages=["en"])) == ["hash4", "hash1"]
+    assert hashes(search_notes(db, processed_from=datetime(2024, 3, 1, 1), processed_to=datetime(2024, 3, 1, 3))) == \
+        ["hash2", "hash1"]
+
+
+def test_entity_terms_are_case_insensitive_and_all_required(db, notes):
+    assert hashes(search_notes(db, entities=["CHEST PAIN"])) == ["hash4", "hash1"]
+    assert hashes(search_notes(db, entities=["chest pain", "fever"])) == ["hash1"]
+    assert hashes(search_notes(db, entities=["aspirin"], entity_type="symptoms")) == []
+    assert hashes(search_notes(db, entities=["aspirin"], entity_type="medications")) == ["hash4", "hash1"]
+
+
+def test_keyset_pagination_walks_every_row_once(db, notes):
+    seen = []
+    page = search_notes(db, limit=2)
+    while True:
+        seen.extend(hashes(page))
+        if page["next_cursor"] is None:
+            break
+        page = search_notes(db, limit=2, cursor=page["next_cursor"])
+    assert seen == ["hash4", "hash3", "hash2", "hash1", "hash0"]
+
+    with pytest.raises(ValueError):
+        search_notes(db, cursor="not-a-cursor")
+
+
+def test_reindex_rebuilds_terms(db, notes):
+    db.query(EntityTerm).delete()
+    db.commit()
+    assert hashes(search_notes(db, entities=["febre"])) == []
+
+    assert reindex(db, batch_size=2) == 10
+    assert hashes(search_notes(db, entities=["febre"])) == ["hash3", "hash2"]
@@ -0,0 +1,36 @@
+import json
+from app.schemas import MedicalNoteResponse
+from app.services.pipeline import build_response_data
+from app.services.serialization import FastJSONResponse
+
+NLP_RESULT = {
+    "entities": {"symptoms": ["fever"], "medications": ["Aspirin 100 mg"], "diagnoses": []},
+    "entity_spans": {"labels": ["SYMPTOM", "MEDICATION", "DIAGNOSIS"], "start": [21, 40], "end": [26, 54], "label": [0, 1]},
+    "risk_classification": "low",
+    "confidence_score": {"critical": 0.0, "high": 0.0, "moderate": 0.0, "low": 1.0},
+    "processing_time_ms": 1.5,
+    "language_detected": "en",
+    "language_confidence": 0.97,
+    "cache_hit": False,
+    "timings_ms": {"spacy_parse": 1.2}
+}
+DE_IDENTIFIED = {
+    "masked_text": "[PATIENT_NAME] reports fever today. Took Aspirin 100 mg.",
+    "removed_entities": {"names": ["John Smith"], "pii": {"cpfs": [], "ssns": [], "emails": [], "phones": [], "dates": []}},
+    "text_changed": True
+}
+
+
+def test_fast_response_matches_typed_model():
+    for response_format in ("default", "compact"):
+        data = build_response_data(DE_IDENTIFIED, NLP_RESULT, "abc123", False, True, response_format)
+        content = {"status": "success", "data": data, "processed_at": "2026-01-15T10:30:00"}
+        body = json.loads(FastJSONResponse(content).body)
+
+        assert body == content
+        MedicalNoteResponse.model_validate(body)
+
+
+def test_non_ascii_text_is_written_as_utf8():
+    body = FastJSONResponse({"text": "convulsão"}).body
+    assert "convulsão".encode("utf-8") in body
@@ -0,0 +1,66 @@
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+import pytest
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="gunicorn runs on POSIX only")
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def request(url, body=None):
+    data = json.dumps(body).encode() if body is not None else None
+    headers = {"Content-Type": "application/json"} if data else {}
+    with urllib.request.urlopen(urllib.request.Request(url, data, headers), timeout=10) as response:
+        return json.loads(response.read())
+
+
+def test_two_workers_boot_and_share_jobs(tmp_path):
+    port = free_port()
+    env = {**os.environ, "SERVER_HOST": "127.0.0.1", "SERVER_PORT": str(port), "SERVER_WORKERS": "2",
+           "JOB_BACKEND": "database", "DATABASE_URL": f"sqlite:///{tmp_path / 'notes.db'}"}
+    server = subprocess.Popen([sys.executable, "-m", "app.server"], env=env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    base = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.monotonic() + 60
+        while True:
+            assert server.poll() is None, "server exited during startup"
+            try:
+                request(f"{base}/health/")
+                break
+            except OSError:
+                assert time.monotonic() < deadline, "server did not start"
+                time.sleep(0.2)
+
+        notes = [{"medical_note": f"Patient {i} reports fever and cough."} for i in range(3)]
+        job_id = request(f"{base}/api/v1/jobs", {"notes": notes, "persist": False})["job"]["id"]
+        # Successive requests may reach either worker; each must find the job.
+        for _ in range(20):
+            job = request(f"{base}/api/v1/jobs/{job_id}?wait=1")["job"]
+            if job["status"] == "completed":
+                break
+        assert job["status"] == "completed"
+        assert len(job["results"]) == 3
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+def test_job_routes_are_disabled_for_several_workers_without_a_shared_backend(monkeypatch):
+    from fastapi.testclient import TestClient
+    from app.config import settings
+    from app.main import app
+
+    monkeypatch.setattr(settings, "SERVER_WORKERS", 2)
+    response = TestClient(app).get("/api/v1/jobs/missing")
+    assert response.status_code == 503
+    assert "JOB_BACKEND=database" in response.json()["detail"]
@@ -0,0 +1,59 @@
+from datetime import datetime
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.database import Base
+from app.models.processing_stats import ProcessingStatsBucket
+from app.services.persistence import build_record, insert_records
+from app.services.stats import get_stats, rebuild_stats
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'notes.db'}")
+    Base.metadata.create_all(bind=engine)
+    with sessionmaker(bind=engine)() as session:
+        yield session
+
+
+def make_record(risk, language, processed_at):
+    nlp_result = {
+        "entities": {}, "risk_classification": risk, "confidence_score": {},
+        "processing_time_ms": 1.0, "language_detected": language
+    }
+    record = build_record("note", nlp_result, "hash")
+    record["processed_at"] = processed_at
+    return record
+
+
+RECORDS = [
+    ("low", "en", datetime(2024, 3, 1, 9, 15)),
+    ("critical", "en", datetime(2024, 3, 1, 9, 45)),
+    ("low", "pt", datetime(2024, 3, 1, 10, 5)),
+    ("high", "pt", datetime(2024, 3, 2, 8, 0)),
+]
+
+
+def test_inserts_update_buckets_incrementally(db):
+    insert_records(db, [make_record(*row) for row in RECORDS[:2]])
+    insert_records(db, [make_record(*row) for row in RECORDS[2:]])
+
+    stats = get_stats(db, "hour", since=datetime(2024, 3, 1, 9, 30), until=datetime(2024, 3, 1, 23))
+    assert stats["total_processed"] == 4
+    assert stats["by_risk_classification"] == {"low": 2, "moderate": 0, "high": 1, "critical": 1}
+    assert stats["by_language"] == {"en": 2, "pt": 2}
+    assert [bucket["bucket_start"] for bucket in stats["buckets"]] == ["2024-03-01T09:00:00", "2024-03-01T10:00:00"]
+    assert stats["buckets"][0]["total_processed"] == 2
+
+    days = get_stats(db, "day")["buckets"]
+    assert [day["total_processed"] for day in days] == [3, 1]
+
+
+def test_rebuild_matches_incremental_counts(db):
+    insert_records(db, [make_record(*row) for row in RECORDS])
+    before = get_stats(db, "hour")
+    db.query(ProcessingStatsBucket).delete()
+    db.commit()
+
+    assert rebuild_stats(db) == 4
+    assert get_stats(db, "hour") == before
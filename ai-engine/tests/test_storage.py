@@ -0,0 +1,88 @@
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.database import Base
+from app.models.medical_note import MedicalNoteProcessing
+from app.models.note_blob import NoteBlob
+from app.services.persistence import build_record, insert_records
+from app.services.storage import compact, raw_text_of
+
+NLP_RESULT = {
+    "entities": {"symptoms": ["fever"], "medications": [], "diagnoses": []},
+    "risk_classification": "low",
+    "confidence_score": {"low": 1.0},
+    "processing_time_ms": 1.0,
+    "language_detected": "en"
+}
+TEXT = "Patient [PATIENT_NAME] reports fever since yesterday. " * 20
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'notes.db'}")
+    Base.metadata.create_all(bind=engine)
+    with sessionmaker(bind=engine)() as session:
+        yield session
+
+
+def stored_texts(db):
+    rows = db.query(MedicalNoteProcessing).order_by(MedicalNoteProcessing.note_hash).all()
+    return [raw_text_of(db, row) for row in rows]
+
+
+@pytest.mark.parametrize("mode", ["full", "compressed", "blob"])
+def test_text_round_trips(db, mode):
+    insert_records(db, [build_record(TEXT, NLP_RESULT, "a"), build_record("other note", NLP_RESULT, "b")], mode)
+    assert stored_texts(db) == [TEXT, "other note"]
+
+
+def test_none_stores_no_text(db):
+    insert_records(db, [build_record(TEXT, NLP_RESULT, "a")], "none")
+    row = db.query(MedicalNoteProcessing).one()
+    assert (row.raw_text, row.raw_text_compressed, row.raw_text_sha256) == (None, None, None)
+
+
+def test_blobs_are_shared_by_identical_texts(db):
+    insert_records(db, [build_record(TEXT, NLP_RESULT, "a"), build_record(TEXT, NLP_RESULT, "b")], "blob")
+    insert_records(db, [build_record(TEXT, NLP_RESULT, "c")], "blob")
+    assert db.query(NoteBlob).count() == 1
+    assert db.query(NoteBlob).one().size == len(TEXT)
+    assert stored_texts(db) == [TEXT, TEXT, TEXT]
+
+
+def test_compact_expires_converts_and_drops_orphan_blobs(db):
+    old = build_record("old note", NLP_RESULT, "a")
+    old["processed_at"] = datetime.utcnow() - timedelta(days=40)
+    insert_records(db, [old], "blob")
+    insert_records(db, [build_record(TEXT, NLP_RESULT, "b")], "full")
+    insert_records(db, [build_record("compressed note", NLP_RESULT, "c")], "compressed")
+
+    result = compact(db, "blob", ttl_days=30, batch_size=1)
+
+    assert result == {"expired": 1, "converted": 2, "blobs_deleted": 1, "blobs_kept": 0}
+    assert stored_texts(db) == [None, TEXT, "compressed note"]
+    assert db.query(MedicalNoteProcessing).filter(MedicalNoteProcessing.raw_text.isnot(None)).count() == 0
+    assert db.query(NoteBlob).count() == 2
+
+
+
+def test_storing_a_text_again_refreshes_its_blob(db):
+    insert_records(db, [build_record(TEXT, NLP_RESULT, "a")], "blob")
+    db.query(NoteBlob).update({"created_at": datetime.utcnow() - timedelta(days=1)})
+    db.commit()
+    insert_records(db, [build_record(TEXT, NLP_RESULT, "b")], "blob")
+    assert db.query(NoteBlob.created_at).scalar() > datetime.utcnow() - timedelta(minutes=1)
+
+
+def test_compact_keeps_orphan_blobs_written_after_it_started(db):
+    insert_records(db, [build_record("old orphan", NLP_RESULT, "a")], "blob")
+    insert_records(db, [build_record("newer orphan", NLP_RESULT, "b")], "blob")
+    db.query(MedicalNoteProcessing).update({"raw_text_sha256": None})
+    db.query(NoteBlob).filter(NoteBlob.size == len("newer orphan")).update(
+        {"created_at": datetime.utcnow() + timedelta(minutes=1)}
+    )
+    db.commit()
+
+    assert compact(db, "blob", batch_size=1)["blobs_deleted"] == 1
+    assert db.query(NoteBlob.size).scalar() == len("newer orphan")
@@ -0,0 +1,94 @@
+import time
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.database import Base
+from app.models.medical_note import MedicalNoteProcessing
+from app.services.persistence import WriteBehindBuffer, build_record
+
+
+NLP_RESULT = {
+    "entities": {"symptoms": ["fever"], "medications": [], "diagnoses": []},
+    "risk_classification": "low",
+    "confidence_score": {"low": 0.7},
+    "processing_time_ms": 1.0
+}
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'notes.db'}")
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine)
+
+
+def make_records(count):
+    return [build_record(f"note {i}", NLP_RESULT, f"hash{i}") for i in range(count)]
+
+
+def count_rows(session_factory):
+    with session_factory() as session:
+        return session.query(MedicalNoteProcessing).count()
+
+
+def test_flushes_when_batch_is_full(session_factory):
+    buffer = WriteBehindBuffer(session_factory, max_batch=5, flush_interval=60)
+    buffer.start()
+    try:
+        buffer.enqueue(make_records(5))
+        deadline = time.monotonic() + 2
+        while count_rows(session_factory) < 5 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert count_rows(session_factory) == 5
+    finally:
+        buffer.stop()
+
+
+def test_flushes_after_interval(session_factory):
+    buffer = WriteBehindBuffer(session_factory, max_batch=100, flush_interval=0.05)
+    buffer.start()
+    try:
+        buffer.enqueue(make_records(3))
+        time.sleep(0.3)
+        assert count_rows(session_factory) == 3
+    finally:
+        buffer.stop()
+
+
+def test_stop_drains_pending_rows(session_factory):
+    buffer = WriteBehindBuffer(session_factory, max_batch=100, flush_interval=60)
+    buffer.start()
+    buffer.enqueue(make_records(7))
+    buffer.stop()
+    assert buffer.pending == 0
+    assert count_rows(session_factory) == 7
+
+
+def test_failed_flush_isolates_bad_rows_and_drops_them_after_max_attempts(session_factory):
+    buffer = WriteBehindBuffer(session_factory, max_batch=100, flush_interval=0, max_attempts=2)
+    records = make_records(4)
+    buffer.enqueue(records + [dict(records[0])])
+
+    assert buffer.flush() == 4
+    assert buffer.pending == 1
+    assert buffer.failed_flushes == 1
+
+    assert buffer.flush() == 0
+    assert buffer.pending == 0
+    assert buffer.dropped == 1
+    assert count_rows(session_factory) == 4
+
+
+def test_pending_rows_are_capped_while_the_database_is_down(tmp_path):
+    unreachable = sessionmaker(bind=create_engine(f"sqlite:///{tmp_path / 'missing' / 'notes.db'}"))
+    buffer = WriteBehindBuffer(unreachable, max_batch=100, flush_interval=60, max_pending=5)
+    buffer.enqueue(make_records(4))
+    buffer.enqueue(make_records(4))
+    assert buffer.pending == 5
+    assert buffer.dropped == 3
+    assert buffer.failed_flushes == 1
+
+    # Backing off: no inline flush attempt on the request thread.
+    buffer.enqueue(make_records(2))
+    assert buffer.failed_flushes == 1
+    assert buffer.dropped == 5